@@ -34,12 +34,20 @@ if config.config_file_name is not None:
 # Ini penting agar Alembic bisa mendeteksi perubahan tabel
 target_metadata = Base.metadata
 
+def include_object(object, name, type_, reflected, compare_to):
+    # Index full-text search (app/search.py) sengaja tidak ada di models.py;
+    # di SQLite FTS5 juga membuat tabel bayangan event_search_data, _idx, dst.
+    if type_ == 'table' and reflected and compare_to is None and name.startswith('event_search'):
+        return False
+    return True
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode."""
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -57,7 +65,8 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata,
+            include_object=include_object
         )
 
         with context.begin_transaction():
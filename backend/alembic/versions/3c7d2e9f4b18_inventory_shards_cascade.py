@@ -0,0 +1,39 @@
+"""INVENTORY SHARDS ON DELETE CASCADE
+
+Revision ID: 3c7d2e9f4b18
+Revises: b6e41d9a7c05
+Create Date: 2026-10-18 21:05:47.402913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c7d2e9f4b18'
+down_revision: Union[str, Sequence[str], None] = 'b6e41d9a7c05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Database yang sudah di-upgrade melewati 5b1e7c2d9a40 sebelum FK-nya diberi ON DELETE CASCADE:
+# menghapus event yang di-shard gagal karena FK violation. SQLite tidak menegakkan FK
+# (PRAGMA foreign_keys tidak dinyalakan), jadi hanya Postgres yang perlu diubah.
+FK_NAME = 'event_inventory_shards_event_id_fkey'
+
+
+def _recreate_fk(ondelete):
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_constraint(FK_NAME, 'event_inventory_shards', type_='foreignkey')
+    op.create_foreign_key(FK_NAME, 'event_inventory_shards', 'events', ['event_id'], ['id'], ondelete=ondelete)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _recreate_fk('CASCADE')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    _recreate_fk(None)
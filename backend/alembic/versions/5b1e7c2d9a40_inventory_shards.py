@@ -0,0 +1,37 @@
+"""INVENTORY SHARDS
+
+Revision ID: 5b1e7c2d9a40
+Revises: cc9ad8cf3f29
+Create Date: 2026-10-18 09:12:04.118230
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5b1e7c2d9a40'
+down_revision: Union[str, Sequence[str], None] = 'cc9ad8cf3f29'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('events', sa.Column('inventory_shards', sa.Integer(), server_default='0', nullable=False))
+    op.create_table('event_inventory_shards',
+    sa.Column('event_id', sa.String(), nullable=False),
+    sa.Column('shard_no', sa.Integer(), nullable=False),
+    sa.Column('remaining', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['event_id'], ['events.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('event_id', 'shard_no')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('event_inventory_shards')
+    with op.batch_alter_table('events') as batch_op:
+        batch_op.drop_column('inventory_shards')
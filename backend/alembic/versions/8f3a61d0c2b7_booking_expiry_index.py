@@ -0,0 +1,28 @@
+"""BOOKING EXPIRY INDEX
+
+Revision ID: 8f3a61d0c2b7
+Revises: 5b1e7c2d9a40
+Create Date: 2026-10-18 10:03:27.540912
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8f3a61d0c2b7'
+down_revision: Union[str, Sequence[str], None] = '5b1e7c2d9a40'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_bookings_status_booking_date', 'bookings', ['status', 'booking_date'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_bookings_status_booking_date', table_name='bookings')
@@ -0,0 +1,44 @@
+"""STORED FILES
+
+Revision ID: a93d4e6b1f52
+Revises: e7b20f5c8d13
+Create Date: 2026-10-18 15:02:47.310284
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a93d4e6b1f52'
+down_revision: Union[str, Sequence[str], None] = 'e7b20f5c8d13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('stored_files',
+    sa.Column('path', sa.String(), nullable=False),
+    sa.Column('ref_count', sa.Integer(), nullable=False),
+    sa.Column('size', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('path')
+    )
+    # File lama (nama uuid di folder uploads) tetap dipakai: hitung referensinya sekarang
+    op.execute("""
+        INSERT INTO stored_files (path, ref_count, created_at)
+        SELECT path, COUNT(*), CURRENT_TIMESTAMP FROM (
+            SELECT image_filename AS path FROM events WHERE image_filename IS NOT NULL
+            UNION ALL
+            SELECT profile_picture AS path FROM users WHERE profile_picture IS NOT NULL
+        ) refs
+        GROUP BY path
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('stored_files')
@@ -0,0 +1,77 @@
+"""EVENT SALES ROLLUPS
+
+Revision ID: b6e41d9a7c05
+Revises: f5c3b8e1a276
+Create Date: 2026-10-18 19:42:37.158340
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b6e41d9a7c05'
+down_revision: Union[str, Sequence[str], None] = 'f5c3b8e1a276'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COUNTERS = ('bookings_pending', 'tickets_pending', 'bookings_confirmed',
+            'tickets_sold', 'revenue', 'tickets_expired')
+
+
+def _counter_columns():
+    return [
+        sa.Column(name, sa.BigInteger() if name == 'revenue' else sa.Integer(), server_default='0', nullable=False)
+        for name in COUNTERS
+    ]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'event_sales',
+        sa.Column('event_id', sa.String(length=16), nullable=False),
+        sa.Column('slot', sa.Integer(), autoincrement=False, nullable=False),
+        *_counter_columns(),
+        sa.ForeignKeyConstraint(['event_id'], ['events.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('event_id', 'slot')
+    )
+    op.create_table(
+        'event_sales_hourly',
+        sa.Column('event_id', sa.String(length=16), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(), nullable=False),
+        sa.Column('slot', sa.Integer(), autoincrement=False, nullable=False),
+        *_counter_columns(),
+        sa.ForeignKeyConstraint(['event_id'], ['events.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('event_id', 'bucket_start', 'slot')
+    )
+
+    # Isi awal dari booking yang sudah ada (sama dengan rebuild_sales di app/sales.py)
+    if op.get_bind().dialect.name == 'postgresql':
+        hour = "date_trunc('hour', b.booking_date)"
+    else:
+        hour = "strftime('%Y-%m-%d %H:00:00.000000', b.booking_date)"
+    op.execute(
+        "INSERT INTO event_sales_hourly (event_id, bucket_start, slot, " + ', '.join(COUNTERS) + ") "
+        f"SELECT b.event_id, {hour}, 0, "
+        "SUM(CASE WHEN b.status = 'pending' THEN 1 ELSE 0 END), "
+        "SUM(CASE WHEN b.status = 'pending' THEN b.quantity ELSE 0 END), "
+        "SUM(CASE WHEN b.status = 'confirmed' THEN 1 ELSE 0 END), "
+        "SUM(CASE WHEN b.status = 'confirmed' THEN b.quantity ELSE 0 END), "
+        "SUM(CASE WHEN b.status = 'confirmed' THEN b.total_price ELSE 0 END), "
+        "SUM(CASE WHEN b.status = 'expired' THEN b.quantity ELSE 0 END) "
+        f"FROM bookings b JOIN events e ON e.id = b.event_id GROUP BY b.event_id, {hour}"
+    )
+    op.execute(
+        "INSERT INTO event_sales (event_id, slot, " + ', '.join(COUNTERS) + ") "
+        "SELECT event_id, 0, " + ', '.join(f'SUM({name})' for name in COUNTERS) + " "
+        "FROM event_sales_hourly GROUP BY event_id"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('event_sales_hourly')
+    op.drop_table('event_sales')
@@ -0,0 +1,44 @@
+"""HOT PATH INDEXES
+
+Revision ID: c41d9e7f2a18
+Revises: 8f3a61d0c2b7
+Create Date: 2026-10-18 11:20:45.302117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41d9e7f2a18'
+down_revision: Union[str, Sequence[str], None] = '8f3a61d0c2b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (nama index, tabel, kolom) -> disesuaikan dengan bentuk query di views
+INDEXES = [
+    ('ix_bookings_attendee_booking_date', 'bookings', ['attendee_id', sa.text('booking_date DESC')]),
+    ('ix_bookings_event_booking_date', 'bookings', ['event_id', 'booking_date']),
+    ('ix_bookings_booking_date', 'bookings', [sa.text('booking_date DESC')]),
+    ('ix_events_date_id', 'events', ['date', 'id']),
+    ('ix_users_name', 'users', ['name']),
+    ('ix_users_role_name', 'users', ['role', 'name']),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Di Postgres pakai CREATE INDEX CONCURRENTLY agar tabel tidak terkunci
+    # (tidak boleh di dalam transaksi -> autocommit_block)
+    with op.get_context().autocommit_block():
+        for name, table, columns in INDEXES:
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
@@ -0,0 +1,30 @@
+"""BOOKING GROUPS
+
+Revision ID: d2f8a0c4b931
+Revises: a93d4e6b1f52
+Create Date: 2026-10-18 16:20:41.318207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2f8a0c4b931'
+down_revision: Union[str, Sequence[str], None] = 'a93d4e6b1f52'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('bookings', sa.Column('group_id', sa.String(length=16), nullable=True))
+    op.create_index('ix_bookings_group_id', 'bookings', ['group_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_bookings_group_id', table_name='bookings')
+    op.drop_column('bookings', 'group_id')
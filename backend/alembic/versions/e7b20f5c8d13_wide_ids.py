@@ -0,0 +1,42 @@
+"""WIDE IDS
+
+Revision ID: e7b20f5c8d13
+Revises: c41d9e7f2a18
+Create Date: 2026-10-18 12:41:09.771635
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b20f5c8d13'
+down_revision: Union[str, Sequence[str], None] = 'c41d9e7f2a18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # ID baru 13 karakter (app/ids.py) -> kolom bookings yang masih String(4) diperlebar.
+    # SQLite tidak membatasi panjang VARCHAR, jadi cukup di Postgres (tanpa copy tabel).
+    if op.get_context().dialect.name != 'sqlite':
+        for column in ('id', 'event_id', 'attendee_id'):
+            op.alter_column('bookings', column, existing_type=sa.String(length=4), type_=sa.String(length=16), existing_nullable=False)
+    op.create_table('id_workers',
+    sa.Column('worker_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('owner', sa.String(), nullable=False),
+    sa.Column('heartbeat_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('worker_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('id_workers')
+    # Hanya aman jika semua ID booking masih 4 karakter
+    if op.get_context().dialect.name != 'sqlite':
+        for column in ('attendee_id', 'event_id', 'id'):
+            op.alter_column('bookings', column, existing_type=sa.String(length=16), type_=sa.String(length=4), existing_nullable=False)
@@ -0,0 +1,60 @@
+"""EVENT SEARCH
+
+Revision ID: f5c3b8e1a276
+Revises: d2f8a0c4b931
+Create Date: 2026-10-18 18:05:12.604931
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f5c3b8e1a276'
+down_revision: Union[str, Sequence[str], None] = 'd2f8a0c4b931'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Index full-text search event (lihat app/search.py). Tabel ini tidak ada di models.py
+# karena bentuknya beda per database. Konfigurasi Postgres 'simple' = default
+# search.postgres_config; jika setting diubah jalankan `rebuild_search_index <ini>`.
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE event_search USING fts5("
+            "event_id, title, description, location, tokenize='unicode61 remove_diacritics 2')"
+        )
+        op.execute(
+            "INSERT INTO event_search (event_id, title, description, location) "
+            "SELECT id, title, coalesce(description, ''), location FROM events"
+        )
+    elif dialect == 'postgresql':
+        op.create_table(
+            'event_search',
+            sa.Column('event_id', sa.String(length=16), sa.ForeignKey('events.id', ondelete='CASCADE'), primary_key=True),
+            sa.Column('document', postgresql.TSVECTOR(), nullable=False),
+        )
+        op.create_index('ix_event_search_document', 'event_search', ['document'], postgresql_using='gin')
+        op.execute(
+            "INSERT INTO event_search (event_id, document) SELECT id, "
+            "setweight(to_tsvector('simple', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('simple', coalesce(location, '')), 'B') || "
+            "setweight(to_tsvector('simple', coalesce(description, '')), 'C') FROM events"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute("DROP TABLE IF EXISTS event_search")
+    elif dialect == 'postgresql':
+        op.drop_index('ix_event_search_document', table_name='event_search')
+        op.drop_table('event_search')
@@ -1,17 +1,36 @@
 from pyramid.config import Configurator
-from sqlalchemy import engine_from_config
-from sqlalchemy.orm import sessionmaker
+from app.cache import build_event_cache
+from app.sweeper import start_sweeper_thread
+from app.ids import configure_id_allocator
+from app.security import configure_token_cache
+from app.hashing import PasswordHasher
+from app.email_utils import configure_mailer
+from app.images import ImageProcessor
+from app.db_pool import create_engine_with_metrics
+from app.db_routing import SessionRouter, READ_ONLY_METHODS
+from app.metrics import RequestMetrics
+from app.query_stats import install_query_stats
+from app.search import build_search_index, ensure_search_index
 import os
 
+def is_read_only(request):
+    return request.method in READ_ONLY_METHODS
+
 def get_db(request):
-    maker = request.registry.dbmaker
-    session = maker()
-    def cleanup(request):
-        if request.exception is not None:
-            session.rollback()
-        else:
-            session.commit()
-        session.close()
+    router = request.registry.db_router
+    if request.is_read_only:
+        # GET/HEAD: session read-only (bisa diarahkan ke replica), tanpa COMMIT di akhir
+        session = router.read_session()
+        def cleanup(request):
+            session.close()
+    else:
+        session = router.write_session()
+        def cleanup(request):
+            if request.exception is not None:
+                session.rollback()
+            else:
+                session.commit()
+            session.close()
     request.add_finished_callback(cleanup)
     return session
 
@@ -42,7 +61,9 @@ def cors_tween_factory(handler, registry):
 
         if allow_origin:
             response.headers['Access-Control-Allow-Origin'] = allow_origin
-            response.headers['Vary'] = 'Origin'
+            # Tambahkan, jangan timpa: response upload sudah bisa membawa Vary: Accept-Encoding
+            if 'Origin' not in (response.vary or ()):
+                response.vary = (response.vary or ()) + ('Origin',)
             response.headers['Access-Control-Allow-Methods'] = 'GET, POST, PUT, DELETE, OPTIONS'
             response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization'
             response.headers['Access-Control-Max-Age'] = '3600'
@@ -61,10 +82,30 @@ def _apply_database_url(settings):
         settings['sqlalchemy.url'] = db_url
     return db_url
 
+def _apply_replica_url(settings):
+    replica_url = settings.get('sqlalchemy.replica.url') or os.getenv('DATABASE_REPLICA_URL', '')
+    if replica_url.startswith('postgres://'):
+        replica_url = replica_url.replace('postgres://', 'postgresql://', 1)
+    if replica_url:
+        settings['sqlalchemy.replica.url'] = replica_url
+    else:
+        settings.pop('sqlalchemy.replica.url', None)
+    return replica_url
+
 def main(global_config, **settings):
     # Setup Database
     _apply_database_url(settings)
-    engine = engine_from_config(settings, 'sqlalchemy.')
+    # Pool koneksi dari setting sqlalchemy.pool_* + metrik checkout (app/db_pool.py)
+    engine, pool_metrics = create_engine_with_metrics(settings)
+    # Read replica opsional untuk request GET (app/db_routing.py)
+    replica_engine, replica_pool_metrics = None, None
+    if _apply_replica_url(settings):
+        replica_engine, replica_pool_metrics = create_engine_with_metrics(settings, 'sqlalchemy.replica.')
+    # Hitung query SQL per request (header X-SQL-* di mode dev, app/query_stats.py)
+    for db_engine in filter(None, (engine, replica_engine)):
+        install_query_stats(db_engine)
+    # worker_id unik per proses untuk generator ID (app/ids.py)
+    configure_id_allocator(engine, settings)
 
     base_dir = os.path.dirname(os.path.abspath(__file__)) 
     upload_dir = os.path.join(base_dir, 'static', 'uploads')
@@ -76,9 +117,40 @@ def main(global_config, **settings):
     settings['upload_dir'] = upload_dir
     
     with Configurator(settings=settings) as config:
-        config.registry.dbmaker = sessionmaker(bind=engine)
+        config.registry.db_engine = engine
+        config.registry.pool_metrics = pool_metrics
+        config.registry.replica_pool_metrics = replica_pool_metrics
+        config.registry.db_router = SessionRouter(
+            engine, replica_engine,
+            retry_interval=float(settings.get('db.replica.retry_interval', 30))
+        )
+        # Session tulis ke primary (dipakai sweeper, purge file upload, dll.)
+        config.registry.dbmaker = config.registry.db_router.write_maker
+        config.add_request_method(is_read_only, 'is_read_only', reify=True)
         config.add_request_method(get_db, 'dbsession', reify=True)
 
+        # Latency / jumlah request per route, dibaca lewat /api/metrics (app/metrics.py)
+        config.registry.request_metrics = RequestMetrics()
+
+        # Index full-text search event (FTS5 / tsvector, app/search.py)
+        config.registry.search_index = build_search_index(engine, settings)
+        ensure_search_index(engine, config.registry.search_index)
+
+        # Cache katalog event (dipakai bersama oleh semua thread waitress)
+        config.registry.event_cache = build_event_cache(settings)
+        # Cache payload JWT yang sudah diverifikasi (app/security.py)
+        config.registry.token_cache = configure_token_cache(settings)
+        # Process pool untuk bcrypt (hash/cek password tidak memblokir thread waitress)
+        config.registry.password_hasher = PasswordHasher.from_settings(settings)
+        # Pool koneksi SMTP + executor email (app/email_utils.py)
+        configure_mailer(settings)
+        # Worker pool pembuat thumbnail / card / full dari gambar upload
+        config.registry.image_processor = ImageProcessor.from_settings(settings)
+
+        # File upload dilayani app/views/uploads.py (cache immutable, ETag, Range).
+        # Route ini harus didaftarkan SEBELUM static view agar /static/uploads/* masuk ke sini.
+        config.add_route('uploads', '/static/uploads/*subpath')
+
         # Ini agar gambar bisa diakses via URL: http://localhost:6543/static/uploads/namafile.jpg
         config.add_static_view(name='static', path='app:static')
 
@@ -100,7 +172,11 @@ def main(global_config, **settings):
         
         # EVENT ROUTES
         config.add_route('events', '/api/events')          
+        config.add_route('event_import', '/api/events/import')  # Harus sebelum event_detail
+        config.add_route('event_search', '/api/events/search')  # Harus sebelum event_detail
         config.add_route('event_detail', '/api/events/{id}') 
+        config.add_route('event_inventory', '/api/events/{id}/inventory') # Sharding stok (flash sale)
+        config.add_route('event_broadcast', '/api/events/{id}/broadcast') # Email ke semua attendee
 
         # ADMIN ROUTE (BARU)
         config.add_route('users_list', '/api/users') 
@@ -108,10 +184,25 @@ def main(global_config, **settings):
         # BOOKING ROUTES (BARU)
         config.add_route('bookings', '/api/bookings')          # Tahap 1: Create
         config.add_route('pay_booking', '/api/bookings/{id}/pay') # Tahap 2: Confirm
+        config.add_route('group_bookings', '/api/bookings/group')  # Paket beberapa event sekaligus
+        config.add_route('pay_group_booking', '/api/bookings/group/{group_id}/pay')
         config.add_route('my_bookings', '/api/my-bookings')   # GET (Lihat Tiket Saya)
         
         # Route untuk Admin melihat semua booking/attendee
         config.add_route('all_bookings', '/api/admin/bookings')
+        config.add_route('export_bookings', '/api/admin/bookings/export') # CSV / NDJSON
+        # Dashboard penjualan organizer (rollup, app/sales.py)
+        config.add_route('sales_dashboard', '/api/admin/sales')
+        config.add_route('event_sales', '/api/admin/sales/{id}')
+
+        # Statistik cache katalog (hit/miss/eviction)
+        config.add_route('cache_stats', '/api/admin/cache-stats')
+        # Readiness probe untuk load balancer (pool koneksi + latency DB)
+        config.add_route('health_ready', '/api/health/ready')
+        # Metrik format Prometheus (token scraper / admin)
+        config.add_route('metrics', '/api/metrics')
+        # Progress broadcast email
+        config.add_route('broadcast_status', '/api/admin/broadcasts/{job_id}')
 
             # --- ROUTE SUPERADMIN ---
         # GET (List) & POST (Add New)
@@ -121,7 +212,12 @@ def main(global_config, **settings):
         config.add_route('manage_user_detail', '/api/superadmin/users/{id}')
         # ------------------------
         config.add_tween('app.cors_tween_factory')
+        config.add_tween('app.metrics.metrics_tween_factory')
+        config.add_tween('app.query_stats.query_stats_tween_factory')
 
         config.scan('.views')
+
+        # Thread pembersih booking pending yang tidak dibayar (opsional, lihat .ini)
+        start_sweeper_thread(config.registry)
         
         return config.make_wsgi_app()
@@ -0,0 +1,183 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from pyramid.httpexceptions import HTTPNotModified
+from pyramid.response import Response
+
+class TTLCache:
+    """
+    Cache in-memory (LRU + TTL) yang aman dipakai bersama oleh thread-thread waitress.
+    Entry paling lama tidak dipakai dibuang saat cache penuh,
+    dan entry yang umurnya melewati TTL dianggap tidak ada.
+
+    fill_delay (detik): setelah entry dibuang, set() untuk key yang sama diabaikan
+    selama jeda ini. Dipakai saat GET dibaca dari read replica: tanpa jeda, GET pertama
+    setelah invalidasi bisa membaca replica yang tertinggal dan mengisi cache dengan
+    data lama selama TTL penuh.
+    """
+
+    def __init__(self, max_entries=512, ttl=30, fill_delay=0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.fill_delay = fill_delay
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        # [(berlaku_sampai, predicate)] dari discard_where(); clear() memblokir semua key
+        self._fill_blocks = []
+        self._fill_blocked_until = 0.0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            value, expires_at = item
+            if expires_at <= now:
+                del self._data[key]
+                self.misses += 1
+                self.evictions += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl=None):
+        # ttl per-entry (opsional) tidak boleh melebihi ttl default cache
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        now = time.monotonic()
+        expires_at = now + ttl
+        with self._lock:
+            if self._fill_blocked(key, now):
+                return
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def _fill_blocked(self, key, now):
+        if now < self._fill_blocked_until:
+            return True
+        if self._fill_blocks:
+            self._fill_blocks = [block for block in self._fill_blocks if block[0] > now]
+        return any(predicate(key) for _, predicate in self._fill_blocks)
+
+    def discard_where(self, predicate):
+        """Hapus semua entry yang key-nya cocok dengan predicate"""
+        with self._lock:
+            for key in [k for k in self._data if predicate(k)]:
+                del self._data[key]
+            if self.fill_delay:
+                self._fill_blocks.append((time.monotonic() + self.fill_delay, predicate))
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            if self.fill_delay:
+                self._fill_blocks = []
+                self._fill_blocked_until = time.monotonic() + self.fill_delay
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._data),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+# --- CONDITIONAL GET (ETag) ---
+# Entry cache berupa (body_json_bytes, etag): JSON cukup di-render sekali,
+# request berikutnya tinggal kirim bytes yang sama atau 304.
+# Sengaja tanpa Last-Modified: waktu invalidate cache berbeda per proses waitress
+# (dan reset saat restart), jadi bukan waktu perubahan data. ETag = hash body,
+# sama di semua proses untuk data yang sama.
+
+def build_json_entry(result):
+    # result boleh berupa string JSON yang sudah jadi (encoder Projection, app/serializers.py)
+    body = (result if isinstance(result, str) else json.dumps(result)).encode('utf8')
+    etag = hashlib.sha1(body).hexdigest()
+    return body, etag
+
+def conditional_json_response(request, entry):
+    body, etag = entry
+    max_age = int(request.registry.settings.get('events.http.max_age', 0))
+
+    if etag in request.if_none_match:
+        response = HTTPNotModified()
+    else:
+        response = Response(body=body, content_type='application/json')
+
+    response.etag = etag
+    response.cache_control = f'public, max-age={max_age}, must-revalidate'
+    return response
+
+# --- CACHE KATALOG EVENT ---
+# Key list : ('list', application_url, params)
+# Key detail: ('detail', application_url, event_id)
+# Key search: ('search', application_url, params)
+
+# Halaman list / pencarian memuat capacity banyak event sekaligus. Kalau setiap booking
+# ikut membuangnya, cache katalog selalu kosong justru saat sale ramai. Jadi halaman itu
+# TIDAK dibuang per booking, tetapi umurnya dibatasi list_ttl (capacity di list boleh
+# tertinggal beberapa detik); detail event (yang dipakai sebelum membeli) selalu dibuang.
+
+class EventCache(TTLCache):
+    def __init__(self, max_entries=512, ttl=30, list_ttl=5, fill_delay=0):
+        super().__init__(max_entries=max_entries, ttl=ttl, fill_delay=fill_delay)
+        self.list_ttl = min(list_ttl, ttl)
+
+    def set(self, key, value, ttl=None):
+        if key[0] != 'detail':
+            ttl = self.list_ttl if ttl is None else min(ttl, self.list_ttl)
+        super().set(key, value, ttl)
+
+    def stats(self):
+        return {**super().stats(), 'list_ttl': self.list_ttl, 'fill_delay': self.fill_delay}
+
+def build_event_cache(settings):
+    # Tanpa read replica GET membaca primary (sudah commit) -> tidak perlu jeda
+    fill_delay = 0.0
+    if settings.get('sqlalchemy.replica.url'):
+        fill_delay = float(settings.get('events.cache.replica_lag', 2))
+    return EventCache(
+        max_entries=int(settings.get('events.cache.max_entries', 512)),
+        ttl=float(settings.get('events.cache.ttl', 30)),
+        list_ttl=float(settings.get('events.cache.list_ttl', 5)),
+        fill_delay=fill_delay
+    )
+
+def discard_event_entries(cache, event_ids):
+    """
+    Sisa kapasitas event-event ini berubah: buang detail event tsb. Halaman list /
+    pencarian dibiarkan sampai list_ttl habis (lihat EventCache). Dipakai view
+    (invalidate_event_cache) maupun sweeper booking kadaluarsa, supaya aturannya sama.
+    """
+    event_ids = set(event_ids)
+    cache.discard_where(lambda key: key[0] == 'detail' and key[2] in event_ids)
+
+def invalidate_event_cache(request, event_id=None):
+    """
+    Dijalankan SETELAH transaksi request di-commit (finished callback),
+    supaya thread lain tidak sempat mengisi ulang cache dengan data lama.
+    Tanpa event_id (event dibuat / diubah / dihapus): seluruh katalog dibuang.
+    Dengan event_id (stok berubah): hanya detail event itu, lihat discard_event_entries().
+    """
+    cache = request.registry.event_cache
+
+    def _invalidate(request):
+        if event_id is None:
+            cache.clear()
+        else:
+            discard_event_entries(cache, [event_id])
+
+    request.add_finished_callback(_invalidate)
@@ -0,0 +1,158 @@
+import threading
+import time
+from pyramid.settings import asbool
+from sqlalchemy import engine_from_config, event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+# --- POOL KONEKSI DATABASE + METRIK ---
+# Setting pool diambil dari .ini (sqlalchemy.pool_size, max_overflow, pool_timeout,
+# pool_recycle, pool_pre_ping). Metrik dikumpulkan untuk melihat apakah thread
+# waitress sering menunggu koneksi:
+# - lama menunggu checkout (histogram), dihitung di TimedQueuePool.connect()
+# - koneksi yang sedang dipakai / overflow (gauge), dari event checkout & checkin
+
+# Batas atas bucket histogram (milidetik)
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+class PoolMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.bucket_counts = [0] * (len(WAIT_BUCKETS_MS) + 1)  # bucket terakhir = +Inf
+        self.wait_count = 0
+        self.wait_sum = 0.0
+        self.wait_max = 0.0
+        self.timeouts = 0
+        self.in_use = 0
+        self.peak_in_use = 0
+        self.connects = 0
+        self.invalidations = 0
+
+    def observe_wait(self, seconds):
+        ms = seconds * 1000
+        index = next((i for i, bound in enumerate(WAIT_BUCKETS_MS) if ms <= bound), len(WAIT_BUCKETS_MS))
+        with self._lock:
+            self.bucket_counts[index] += 1
+            self.wait_count += 1
+            self.wait_sum += seconds
+            if seconds > self.wait_max:
+                self.wait_max = seconds
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def on_checkout(self, *args):
+        with self._lock:
+            self.in_use += 1
+            if self.in_use > self.peak_in_use:
+                self.peak_in_use = self.in_use
+
+    def on_checkin(self, *args):
+        with self._lock:
+            self.in_use = max(self.in_use - 1, 0)
+
+    def on_connect(self, *args):
+        with self._lock:
+            self.connects += 1
+
+    def on_invalidate(self, *args):
+        with self._lock:
+            self.invalidations += 1
+
+    def snapshot(self, pool=None):
+        with self._lock:
+            cumulative = []
+            running = 0
+            for bound, count in zip(WAIT_BUCKETS_MS + ('+Inf',), self.bucket_counts):
+                running += count
+                cumulative.append({'le_ms': bound, 'count': running})
+            data = {
+                'in_use': self.in_use,
+                'peak_in_use': self.peak_in_use,
+                'connects': self.connects,
+                'invalidations': self.invalidations,
+                'checkout_wait': {
+                    'count': self.wait_count,
+                    'sum_ms': round(self.wait_sum * 1000, 3),
+                    'avg_ms': round(self.wait_sum / self.wait_count * 1000, 3) if self.wait_count else 0.0,
+                    'max_ms': round(self.wait_max * 1000, 3),
+                    'timeouts': self.timeouts,
+                    'buckets': cumulative
+                }
+            }
+        if isinstance(pool, QueuePool):
+            capacity = pool.size() + max(pool._max_overflow, 0)
+            data.update({
+                'size': pool.size(),
+                'max_overflow': pool._max_overflow,
+                'overflow': max(pool.overflow(), 0),
+                'checked_out': pool.checkedout(),
+                'idle': pool.checkedin(),
+                'saturation': round(pool.checkedout() / capacity, 3) if capacity else 0.0
+            })
+        return data
+
+class TimedQueuePool(QueuePool):
+    """QueuePool yang mencatat lama thread menunggu koneksi"""
+
+    metrics = None
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            if self.metrics is not None:
+                self.metrics.record_timeout()
+            raise
+        finally:
+            if self.metrics is not None:
+                self.metrics.observe_wait(time.perf_counter() - started)
+
+    def recreate(self):
+        # engine.dispose() membuat pool baru -> metrik tetap dipakai bersama
+        new_pool = super().recreate()
+        new_pool.metrics = self.metrics
+        return new_pool
+
+def _uses_queue_pool(url):
+    url = make_url(url)
+    # SQLite in-memory memakai SingletonThreadPool / StaticPool, bukan QueuePool
+    return not (url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:'))
+
+def create_engine_with_metrics(settings, prefix='sqlalchemy.'):
+    """Return (engine, PoolMetrics). Dipakai main() menggantikan engine_from_config biasa."""
+    options = {}
+    # engine_from_config tidak mengubah string "true"/"false" untuk opsi ini
+    if f'{prefix}pool_pre_ping' in settings:
+        options['pool_pre_ping'] = asbool(settings[f'{prefix}pool_pre_ping'])
+    if f'{prefix}pool_use_lifo' in settings:
+        options['pool_use_lifo'] = asbool(settings[f'{prefix}pool_use_lifo'])
+    # Hanya key langsung di bawah prefix: sqlalchemy.replica.* bukan milik engine utama
+    config = {
+        k: v for k, v in settings.items()
+        if k.startswith(prefix) and '.' not in k[len(prefix):]
+        and k not in (f'{prefix}pool_pre_ping', f'{prefix}pool_use_lifo')
+    }
+
+    metrics = PoolMetrics()
+    if _uses_queue_pool(settings[f'{prefix}url']):
+        options['poolclass'] = TimedQueuePool
+    engine = engine_from_config(config, prefix, **options)
+    if isinstance(engine.pool, TimedQueuePool):
+        engine.pool.metrics = metrics
+
+    event.listen(engine, 'checkout', metrics.on_checkout)
+    event.listen(engine, 'checkin', metrics.on_checkin)
+    event.listen(engine, 'connect', metrics.on_connect)
+    event.listen(engine, 'invalidate', metrics.on_invalidate)
+    return engine, metrics
+
+def check_database(engine):
+    """SELECT 1 -> return latency (detik). Exception jika DB tidak bisa dihubungi."""
+    started = time.perf_counter()
+    with engine.connect() as conn:
+        conn.execute(text('SELECT 1'))
+    return time.perf_counter() - started
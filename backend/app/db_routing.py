@@ -0,0 +1,85 @@
+import logging
+import threading
+import time
+from sqlalchemy import event, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import sessionmaker
+
+log = logging.getLogger(__name__)
+
+# --- PEMISAHAN SESSION BACA / TULIS ---
+# Request GET/HEAD hanya membaca data, jadi:
+# - session-nya read-only (autoflush mati, tidak ada COMMIT di akhir request,
+#   di Postgres transaksi dibuka dengan SET TRANSACTION READ ONLY)
+# - boleh diarahkan ke read replica (sqlalchemy.replica.url) jika ada;
+#   kalau replica tidak bisa dihubungi, otomatis kembali ke primary.
+# Request yang mengubah data (POST/PUT/DELETE) selalu memakai primary.
+
+READ_ONLY_METHODS = ('GET', 'HEAD')
+
+class ReadOnlySessionError(Exception):
+    """Ada perubahan data (flush) di session read-only"""
+
+def _block_flush(session, flush_context, instances):
+    if session.new or session.dirty or session.deleted:
+        raise ReadOnlySessionError("Cannot write to the database in a read-only (GET) request")
+
+def _begin_read_only(session, transaction, connection):
+    if connection.dialect.name == 'postgresql' and transaction.parent is None:
+        connection.exec_driver_sql('SET TRANSACTION READ ONLY')
+
+def make_read_only_maker(engine, role):
+    maker = sessionmaker(bind=engine, autoflush=False, info={'read_only': True, 'role': role})
+    event.listen(maker, 'before_flush', _block_flush)
+    event.listen(maker, 'after_begin', _begin_read_only)
+    return maker
+
+class SessionRouter:
+    def __init__(self, primary_engine, replica_engine=None, retry_interval=30):
+        self.write_maker = sessionmaker(bind=primary_engine, info={'read_only': False, 'role': 'primary'})
+        self.primary_read_maker = make_read_only_maker(primary_engine, 'primary')
+        self.replica_read_maker = make_read_only_maker(replica_engine, 'replica') if replica_engine is not None else None
+        self.retry_interval = retry_interval
+        self._replica_down_until = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def replica_available(self):
+        return self.replica_read_maker is not None and time.monotonic() >= self._replica_down_until
+
+    def _mark_replica_down(self, error):
+        with self._lock:
+            self._replica_down_until = time.monotonic() + self.retry_interval
+        log.warning('Read replica unavailable, using primary for %ss: %s', self.retry_interval, error)
+
+    def read_session(self):
+        if self.replica_available:
+            session = self.replica_read_maker()
+            try:
+                # Ambil koneksi sekarang supaya kegagalan replica ketahuan sebelum view jalan
+                session.connection()
+                return session
+            except DBAPIError as e:
+                session.close()
+                self._mark_replica_down(e)
+        return self.primary_read_maker()
+
+    def write_session(self):
+        return self.write_maker()
+
+    def session_for(self, method):
+        if method in READ_ONLY_METHODS:
+            return self.read_session()
+        return self.write_session()
+
+def check_replica(router):
+    """Dipakai /api/health/ready: latency replica (detik) atau None jika tidak dipakai"""
+    if router.replica_read_maker is None:
+        return None
+    started = time.perf_counter()
+    session = router.replica_read_maker()
+    try:
+        session.execute(text('SELECT 1'))
+    finally:
+        session.close()
+    return time.perf_counter() - started
@@ -1,35 +1,129 @@
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+from contextlib import contextmanager
+from string import Template
+from pyramid.settings import asbool
+import html
+import queue
 import threading
+import time
+import uuid
 
 # --- KONFIGURASI SMTP (GMAIL) ---
 # PENTING: Untuk GMAIL, kamu harus pakai "App Password", bukan password login biasa.
 # Tutorial: https://support.google.com/accounts/answer/185833
+# Nilai di bawah bisa ditimpa lewat setting mail.* di file .ini (lihat configure_mailer)
 SMTP_SERVER = "smtp.gmail.com"
 SMTP_PORT = 587
+SMTP_STARTTLS = True
 SENDER_EMAIL = "evoria022@gmail.com"  
 SENDER_PASSWORD = "ndig bann njng ewrj"        
 
+# Jumlah koneksi SMTP yang dibiarkan terbuka = jumlah email yang dikirim bersamaan
+SMTP_POOL_SIZE = 3
+# Koneksi yang menganggur lebih lama dari ini dicek dulu (NOOP) sebelum dipakai
+SMTP_IDLE_CHECK = 30
+
+# --- POOL KONEKSI SMTP ---
+# Sebelumnya setiap email membuka koneksi baru + STARTTLS + login.
+# Sekarang koneksi dipakai ulang; rusak/putus -> dibuang lalu dibuat ulang.
+
+class SMTPConnectionPool:
+    def __init__(self, size):
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def _connect(self):
+        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT, timeout=30)
+        if SMTP_STARTTLS:
+            server.starttls() # Amankan koneksi
+        if SENDER_PASSWORD:
+            server.login(SENDER_EMAIL, SENDER_PASSWORD)
+        return server
+
+    def _is_alive(self, server):
+        try:
+            return server.noop()[0] == 250
+        except smtplib.SMTPException:
+            return False
+        except OSError:
+            return False
+
+    @contextmanager
+    def connection(self):
+        self._slots.acquire()
+        server = None
+        try:
+            try:
+                server, last_used = self._idle.get_nowait()
+                if time.monotonic() - last_used > SMTP_IDLE_CHECK and not self._is_alive(server):
+                    self._close(server)
+                    server = None
+            except queue.Empty:
+                pass
+            if server is None:
+                server = self._connect()
+            yield server
+            self._idle.put((server, time.monotonic()))
+        except Exception:
+            if server is not None:
+                self._close(server)
+            raise
+        finally:
+            self._slots.release()
+
+    def _close(self, server):
+        try:
+            server.quit()
+        except Exception:
+            pass
+
+    def close_all(self):
+        while True:
+            try:
+                server, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._close(server)
+
+smtp_pool = SMTPConnectionPool(SMTP_POOL_SIZE)
+# Executor terbatas menggantikan threading.Thread baru untuk setiap email
+mail_executor = ThreadPoolExecutor(max_workers=SMTP_POOL_SIZE, thread_name_prefix='mail')
+
+def configure_mailer(settings):
+    """Dipanggil dari main(): baca setting mail.* (misal untuk SMTP lokal saat testing)"""
+    global SMTP_SERVER, SMTP_PORT, SMTP_STARTTLS, SENDER_EMAIL, SENDER_PASSWORD
+    global SMTP_POOL_SIZE, smtp_pool, mail_executor
+    SMTP_SERVER = settings.get('mail.host', SMTP_SERVER)
+    SMTP_PORT = int(settings.get('mail.port', SMTP_PORT))
+    SMTP_STARTTLS = asbool(settings.get('mail.starttls', SMTP_STARTTLS))
+    SENDER_EMAIL = settings.get('mail.sender', SENDER_EMAIL)
+    SENDER_PASSWORD = settings.get('mail.password', SENDER_PASSWORD)
+    pool_size = int(settings.get('mail.pool_size', SMTP_POOL_SIZE))
+    if pool_size != SMTP_POOL_SIZE:
+        SMTP_POOL_SIZE = pool_size
+        smtp_pool.close_all()
+        smtp_pool = SMTPConnectionPool(pool_size)
+        mail_executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix='mail')
+
+def _build_message(to_email, subject, body):
+    msg = MIMEMultipart()
+    msg['From'] = SENDER_EMAIL
+    msg['To'] = to_email
+    msg['Subject'] = subject
+    msg.attach(MIMEText(body, 'html')) # Kita pakai format HTML biar bagus
+    return msg.as_string()
+
 def send_email_async(to_email, subject, body):
     """Fungsi pengirim email yang berjalan di background (agar tidak bikin loading lama)"""
     try:
-        # Setup Pesan
-        msg = MIMEMultipart()
-        msg['From'] = SENDER_EMAIL
-        msg['To'] = to_email
-        msg['Subject'] = subject
-        msg.attach(MIMEText(body, 'html')) # Kita pakai format HTML biar bagus
-
-        # Koneksi ke Server Gmail
-        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
-        server.starttls() # Amankan koneksi
-        server.login(SENDER_EMAIL, SENDER_PASSWORD)
-        
-        # Kirim!
-        text = msg.as_string()
-        server.sendmail(SENDER_EMAIL, to_email, text)
-        server.quit()
+        # Kirim lewat koneksi dari pool (tanpa connect + login ulang)
+        with smtp_pool.connection() as server:
+            server.sendmail(SENDER_EMAIL, to_email, _build_message(to_email, subject, body))
         
         print(f"✅ Email konfirmasi berhasil dikirim ke {to_email}")
         
@@ -37,6 +131,9 @@ def send_email_async(to_email, subject, body):
         print(f"Gagal kirim email: {str(e)}")
         print("Tips: Pastikan SENDER_EMAIL & SENDER_PASSWORD di email_utils.py sudah benar.")
 
+def queue_email(to_email, subject, body):
+    return mail_executor.submit(send_email_async, to_email, subject, body)
+
 def send_booking_confirmation(to_email, user_name, event_title, booking_code, quantity, total_price):
     """
     Menyusun template email konfirmasi tiket
@@ -83,9 +180,8 @@ def send_booking_confirmation(to_email, user_name, event_title, booking_code, qu
     </html>
     """
     
-    # Jalankan di Thread terpisah agar user tidak menunggu loading kirim email
-    thread = threading.Thread(target=send_email_async, args=(to_email, subject, html_body))
-    thread.start()
+    # Jalankan di background (executor terbatas) agar user tidak menunggu loading kirim email
+    queue_email(to_email, subject, html_body)
 
 def send_reset_token_email(to_email, token):
     """
@@ -114,5 +210,122 @@ def send_reset_token_email(to_email, token):
     </html>
     """
     
-    thread = threading.Thread(target=send_email_async, args=(to_email, subject, html_body))
-    thread.start()
\ No newline at end of file
+    queue_email(to_email, subject, html_body)
+
+# --- BROADCAST KE SEMUA ATTENDEE EVENT ---
+# Template di-render SEKALI (HTML + pesan yang sudah di-escape), per penerima
+# hanya substitusi $name ("$" dari judul / pesan organizer di-escape jadi "$$" supaya
+# teks seperti "$name" atau "$10" di pesan tidak ikut disubstitusi). Pengiriman dibagi per batch; tiap batch memakai satu
+# koneksi dari pool, dan jumlah batch yang jalan bersamaan dibatasi ukuran pool.
+
+BROADCAST_TEMPLATE = """
+    <html>
+      <body style="font-family: Arial, sans-serif;">
+        <div style="border: 1px solid #ddd; padding: 20px; border-radius: 10px; max-width: 600px;">
+            <h2 style="color: #2c3e50;">Halo, $name!</h2>
+            <p>Ada informasi terbaru untuk event <strong>{event_title}</strong>:</p>
+            <div style="background-color: #f9f9f9; padding: 15px; border-radius: 5px;">{message}</div>
+            <div style="margin-top: 30px; font-size: 12px; color: #888;">
+                &copy; 2025 Event Ticketing System Kelompok 4
+            </div>
+        </div>
+      </body>
+    </html>
+    """
+
+class BroadcastJob:
+    def __init__(self, event_id, total):
+        self.id = uuid.uuid4().hex
+        self.event_id = event_id
+        self.total = total
+        self.sent = 0
+        self.failed = []
+        self.status = 'queued'
+        self.started_at = time.time()
+        self.finished_at = None
+        self._lock = threading.Lock()
+
+    def record(self, sent, failed):
+        with self._lock:
+            self.sent += sent
+            self.failed.extend(failed)
+
+    def final_status(self):
+        # Tidak ada satu pun yang terkirim (misal SMTP mati) -> failed, sebagian gagal -> completed_with_errors
+        with self._lock:
+            if not self.failed:
+                return 'completed'
+            return 'completed_with_errors' if self.sent else 'failed'
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                'job_id': self.id,
+                'event_id': self.event_id,
+                'status': self.status,
+                'total': self.total,
+                'sent': self.sent,
+                'failed': len(self.failed),
+                'failed_recipients': self.failed[:50],
+                'progress': round((self.sent + len(self.failed)) / self.total * 100, 1) if self.total else 100.0
+            }
+
+def _send_batch(job, subject, body_template, batch):
+    failed = []
+    sent = 0
+    try:
+        with smtp_pool.connection() as server:
+            for email, name in batch:
+                body = body_template.safe_substitute(name=html.escape(name or ''))
+                try:
+                    server.sendmail(SENDER_EMAIL, email, _build_message(email, subject, body))
+                    sent += 1
+                except smtplib.SMTPRecipientsRefused:
+                    failed.append(email)
+    except Exception:
+        # Koneksi putus di tengah batch: sisa batch dianggap gagal
+        failed.extend(email for email, _ in batch[sent + len(failed):])
+    job.record(sent, failed)
+
+def _run_broadcast(job, subject, body_template, recipients, batch_size):
+    job.status = 'running'
+    in_flight = threading.BoundedSemaphore(SMTP_POOL_SIZE)
+    futures = []
+    for start in range(0, len(recipients), batch_size):
+        in_flight.acquire()
+        future = mail_executor.submit(_send_batch, job, subject, body_template, recipients[start:start + batch_size])
+        future.add_done_callback(lambda _: in_flight.release())
+        futures.append(future)
+    for future in futures:
+        future.result()
+    job.finished_at = time.time()
+    job.status = job.final_status()
+
+# Job terakhir disimpan di memori proses agar progress-nya bisa dicek admin
+MAX_BROADCAST_JOBS = 100
+_broadcast_jobs = OrderedDict()
+_broadcast_jobs_lock = threading.Lock()
+
+def get_broadcast_job(job_id):
+    with _broadcast_jobs_lock:
+        return _broadcast_jobs.get(job_id)
+
+def broadcast_to_attendees(event_id, event_title, recipients, subject, message, batch_size=50):
+    """
+    recipients: list (email, name). Return BroadcastJob yang bisa dipantau progress-nya.
+    Pengiriman berjalan di background thread.
+    """
+    message_html = html.escape(message).replace('\n', '<br>').replace('$', '$$')
+    title_html = html.escape(event_title).replace('$', '$$')
+    body_template = Template(BROADCAST_TEMPLATE.format(event_title=title_html, message=message_html))
+    job = BroadcastJob(event_id, len(recipients))
+    with _broadcast_jobs_lock:
+        _broadcast_jobs[job.id] = job
+        while len(_broadcast_jobs) > MAX_BROADCAST_JOBS:
+            _broadcast_jobs.popitem(last=False)
+    thread = threading.Thread(
+        target=_run_broadcast, args=(job, subject, body_template, recipients, batch_size),
+        name=f'broadcast-{job.id[:8]}', daemon=True
+    )
+    thread.start()
+    return job
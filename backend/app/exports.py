@@ -0,0 +1,62 @@
+import csv
+import io
+import json
+
+# --- STREAMING EXPORT (CSV / NDJSON) ---
+# Baris diambil dari DB sedikit demi sedikit (yield_per -> server-side cursor di Postgres)
+# dan langsung dikirim ke client, jadi memori tetap datar berapapun jumlah barisnya.
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+# Jumlah baris yang digabung menjadi satu chunk HTTP
+CHUNK_ROWS = 500
+
+def _format_value(value):
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+def _csv_chunks(columns, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    count = 0
+    for row in rows:
+        writer.writerow([_format_value(v) for v in row])
+        count += 1
+        if count % CHUNK_ROWS == 0:
+            yield buffer.getvalue().encode('utf8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf8')
+
+def _ndjson_chunks(columns, rows):
+    lines = []
+    for row in rows:
+        record = {col: _format_value(v) for col, v in zip(columns, row)}
+        lines.append(json.dumps(record))
+        if len(lines) == CHUNK_ROWS:
+            yield ('\n'.join(lines) + '\n').encode('utf8')
+            lines = []
+    if lines:
+        yield ('\n'.join(lines) + '\n').encode('utf8')
+
+def stream_query(dbmaker, statement, columns, fmt, batch_size=1000):
+    """
+    Generator untuk Response.app_iter.
+    Pakai session sendiri (bukan request.dbsession) karena session request
+    sudah ditutup sebelum server selesai mengirim body.
+    """
+    session = dbmaker()
+    try:
+        result = session.execute(statement.execution_options(yield_per=batch_size))
+        rows = (tuple(row) for row in result)
+        chunks = _csv_chunks(columns, rows) if fmt == 'csv' else _ndjson_chunks(columns, rows)
+        for chunk in chunks:
+            yield chunk
+    finally:
+        session.rollback()
+        session.close()
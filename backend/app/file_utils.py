@@ -1,32 +1,116 @@
+import hashlib
 import os
-import uuid
-import shutil
+from app.images import IMAGE_VARIANTS, variant_filename
+from app.storage import open_temp_file, commit_file, publish_file, discard_temp_file, release_file, purge_unreferenced
 
-def get_image_url(request, filename):
+# --- UPLOAD GAMBAR ---
+# File disalin per potongan (chunk) dengan batas ukuran, dan jenisnya dicek
+# dari "magic bytes" di awal file, bukan dari ekstensi nama file.
+# Lokasi & nama file ditentukan app/storage.py (hash isi file).
+
+DEFAULT_MAX_UPLOAD_BYTES = 5 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+
+# Signature awal file -> ekstensi yang disimpan
+_IMAGE_SIGNATURES = [
+    (b'\xff\xd8\xff', '.jpg'),
+    (b'\x89PNG\r\n\x1a\n', '.png'),
+    (b'GIF87a', '.gif'),
+    (b'GIF89a', '.gif'),
+]
+
+class UploadError(Exception):
+    """Upload ditolak -> view membalas 400 / 413"""
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+def get_max_upload_bytes(settings):
+    return int(settings.get('uploads.max_bytes', DEFAULT_MAX_UPLOAD_BYTES))
+
+def _format_size(num_bytes):
+    if num_bytes >= 1024 * 1024:
+        return f"{num_bytes / (1024 * 1024):.4g} MB"
+    return f"{num_bytes / 1024:.4g} KB"
+
+def detect_image_type(header):
+    for signature, ext in _IMAGE_SIGNATURES:
+        if header.startswith(signature):
+            return ext
+    return None
+
+def get_image_url(request, filename, variant=None):
+    """
+    variant: 'thumb' / 'card' / 'full' (lihat app/images.py).
+    Jika varian belum selesai dibuat, pakai file asli.
+    """
     if not filename:
         return None
+    if variant in IMAGE_VARIANTS:
+        candidate = variant_filename(filename, variant)
+        if os.path.exists(os.path.join(request.registry.settings['upload_dir'], candidate)):
+            filename = candidate
     return request.static_url(f'app:static/uploads/{filename}')
 
 def save_uploaded_file(request, file_input):
-    filename = file_input.filename
-    ext = os.path.splitext(filename)[1].lower()
-    if ext not in ['.jpg', '.jpeg', '.png', '.gif']:
-        raise Exception("Invalid image format. Only JPG, PNG, and GIF allowed.")
+    max_bytes = get_max_upload_bytes(request.registry.settings)
+    # Tolak lebih awal jika ukuran body saja sudah jauh melewati batas
+    if request.content_length and request.content_length > max_bytes + CHUNK_SIZE:
+        raise UploadError(f"File too large. Maximum size is {_format_size(max_bytes)}.", 413)
+
+    source = file_input.file
+    header = source.read(16)
+    ext = detect_image_type(header)
+    if ext is None:
+        raise UploadError("Invalid image format. Only JPG, PNG, and GIF allowed.")
 
-    unique_filename = f"{uuid.uuid4().hex}{ext}"
-    
     upload_dir = request.registry.settings['upload_dir']
-    file_path = os.path.join(upload_dir, unique_filename)
+    # Tulis ke file sementara dulu sambil menghitung hash isinya
+    digest = hashlib.sha256(header)
+    written = len(header)
+    tmp_path, output_file = open_temp_file(upload_dir)
+    try:
+        with output_file:
+            output_file.write(header)
+            while True:
+                chunk = source.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                written += len(chunk)
+                if written > max_bytes:
+                    raise UploadError(f"File too large. Maximum size is {_format_size(max_bytes)}.", 413)
+                digest.update(chunk)
+                output_file.write(chunk)
+        filename = commit_file(request.dbsession, digest.hexdigest(), ext, written)
+    except BaseException:
+        discard_temp_file(tmp_path)
+        raise
 
-    with open(file_path, 'wb') as output_file:
-        shutil.copyfileobj(file_input.file, output_file)
+    registry = request.registry
 
-    return unique_filename
+    def publish(request):
+        # Finished callback ini jalan setelah callback commit di get_db
+        if request.exception is not None:
+            discard_temp_file(tmp_path)
+            return
+        # Thumbnail / card / full dibuat di background (file duplikat sudah punya varian)
+        if publish_file(upload_dir, tmp_path, filename):
+            registry.image_processor.submit(filename)
+    request.add_finished_callback(publish)
+    return filename
 
 def delete_image_file(request, filename):
+    """Lepas satu referensi; file fisik dihapus setelah commit jika tidak dipakai lagi"""
     if not filename:
         return
-    upload_dir = request.registry.settings['upload_dir']
-    file_path = os.path.join(upload_dir, filename)
-    if os.path.exists(file_path):
-        os.remove(file_path)
\ No newline at end of file
+    if not release_file(request.dbsession, filename):
+        return
+    registry = request.registry
+    upload_dir = registry.settings['upload_dir']
+    names = [filename] + [variant_filename(filename, v) for v in IMAGE_VARIANTS]
+
+    def purge(request):
+        # Finished callback ini jalan setelah callback commit di get_db
+        if request.exception is None:
+            purge_unreferenced(registry.dbmaker, upload_dir, filename, names)
+    request.add_finished_callback(purge)
@@ -0,0 +1,91 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from app.security import hash_password, check_password, get_bcrypt_rounds, DEFAULT_BCRYPT_ROUNDS
+
+# --- POOL HASHING BCRYPT ---
+# bcrypt sengaja lambat (~100-300 ms). Kalau dijalankan langsung di thread waitress,
+# lonjakan login bisa memakan semua thread dan endpoint ringan (/api/events) ikut antre.
+# Di sini hashing dijalankan di process pool terpisah (tidak terbatas GIL) dengan
+# batas antrean: jika penuh, request langsung ditolak (503) bukan ikut menunggu.
+#
+# Thread waitress yang memanggil tetap menunggu hasilnya (.result()), jadi batas antrean
+# (max_pending) harus LEBIH KECIL dari jumlah thread waitress: sisa thread selalu bebas
+# melayani endpoint lain. Default: setengah dari server.threads (= threads di [server:main]).
+
+log = logging.getLogger(__name__)
+
+DEFAULT_SERVER_THREADS = 4  # default waitress
+
+def max_pending_for(server_threads, max_pending=None):
+    """Batas operasi hashing bersamaan untuk jumlah thread waitress tertentu (selalu < threads)"""
+    limit = max(server_threads - 1, 1)
+    if max_pending is None:
+        return max(server_threads // 2, 1)
+    if max_pending > limit:
+        log.warning('auth.hash_max_pending=%s would block all %s waitress threads; using %s',
+                    max_pending, server_threads, limit)
+        return limit
+    return max_pending
+
+class HashingBusy(Exception):
+    """Antrean hashing penuh -> view membalas 503"""
+
+class PasswordHasher:
+    def __init__(self, rounds=DEFAULT_BCRYPT_ROUNDS, workers=None, max_pending=None, timeout=30):
+        self.rounds = rounds
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.max_pending = max_pending or max(self.workers, 1) * 4
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings):
+        workers = settings.get('auth.hash_workers')
+        max_pending = settings.get('auth.hash_max_pending')
+        server_threads = int(settings.get('server.threads') or DEFAULT_SERVER_THREADS)
+        return cls(
+            rounds=int(settings.get('auth.bcrypt_rounds', DEFAULT_BCRYPT_ROUNDS)),
+            workers=int(workers) if workers not in (None, '') else None,
+            max_pending=max_pending_for(server_threads, int(max_pending) if max_pending else None),
+            timeout=float(settings.get('auth.hash_timeout', 30))
+        )
+
+    def _get_executor(self):
+        # Pool dibuat saat pertama dipakai, bukan saat import/start app
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context('spawn')
+                    )
+        return self._executor
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HashingBusy("Too many password operations in progress")
+        try:
+            if self.workers == 0:
+                # Mode tanpa pool (auth.hash_workers = 0), misal untuk development
+                return fn(*args)
+            return self._get_executor().submit(fn, *args).result(timeout=self.timeout)
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        return self._run(hash_password, password, self.rounds)
+
+    def check(self, password, hashed_password):
+        return self._run(check_password, password, hashed_password)
+
+    def needs_rehash(self, hashed_password):
+        return get_bcrypt_rounds(hashed_password) != self.rounds
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,217 @@
+import logging
+import os
+import secrets
+import socket
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import insert, update, delete, select
+from sqlalchemy.exc import IntegrityError
+
+log = logging.getLogger(__name__)
+
+# --- ALOKASI ID (PENGGANTI generate_short_id) ---
+# ID berbasis waktu ala "Snowflake", 63 bit:
+#   [41 bit milidetik sejak ID_EPOCH][10 bit worker_id][12 bit sequence]
+# Unik tanpa perlu cek ke DB selama worker_id tiap proses berbeda.
+# worker_id disewa (lease) dari tabel id_workers saat app start,
+# jadi tidak ada retry karena tabrakan primary key.
+# Jika lease hilang (heartbeat gagal sampai lease_ttl lewat, atau worker_id sudah diambil
+# proses lain), allocator berhenti mengeluarkan ID sampai dapat worker_id baru.
+
+ID_EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+WORKER_BITS = 10
+SEQUENCE_BITS = 12
+MAX_WORKER_ID = (1 << WORKER_BITS) - 1
+MAX_SEQUENCE = (1 << SEQUENCE_BITS) - 1
+ID_LENGTH = 13  # 36^13 > 2^63 -> panjang tetap, urutan string = urutan waktu
+
+_BASE36 = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ'
+# Crockford base32: tanpa I, L, O, U supaya kode booking tidak ambigu saat dibaca
+_BOOKING_CODE_CHARS = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+BOOKING_CODE_LENGTH = 10
+
+_EPOCH_MS = int(ID_EPOCH.timestamp() * 1000)  # ID_EPOCH harus aware (UTC), bukan jam lokal server
+
+def encode_base36(number, length=ID_LENGTH):
+    chars = []
+    while number:
+        number, rem = divmod(number, 36)
+        chars.append(_BASE36[rem])
+    return ''.join(reversed(chars)).rjust(length, '0')
+
+class LeaseLostError(RuntimeError):
+    """worker_id tidak lagi disewa proses ini -> ID tidak boleh dikeluarkan"""
+
+def _check_worker_id(worker_id):
+    if not 0 <= worker_id <= MAX_WORKER_ID:
+        raise ValueError(f"worker_id must be between 0 and {MAX_WORKER_ID}")
+
+class IdAllocator:
+    def __init__(self, worker_id, lease_deadline=None):
+        """lease_deadline: time.monotonic() batas lease worker_id (None = tanpa lease)"""
+        _check_worker_id(worker_id)
+        self.worker_id = worker_id
+        self._lease_deadline = lease_deadline
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._sequence = 0
+
+    def renew_lease(self, lease_deadline):
+        with self._lock:
+            self._lease_deadline = lease_deadline
+
+    def revoke_lease(self):
+        with self._lock:
+            self._lease_deadline = 0
+
+    def assign_worker_id(self, worker_id, lease_deadline):
+        # _last_ms dipertahankan: ID berikutnya tetap tidak mundur
+        _check_worker_id(worker_id)
+        with self._lock:
+            self.worker_id = worker_id
+            self._lease_deadline = lease_deadline
+
+    def next_int(self):
+        with self._lock:
+            if self._lease_deadline is not None and time.monotonic() >= self._lease_deadline:
+                raise LeaseLostError(f"worker_id {self.worker_id} lease expired, waiting for a new lease")
+            now_ms = int(time.time() * 1000) - _EPOCH_MS
+            # Jam mundur (NTP) -> tetap pakai milidetik terakhir agar tidak dobel
+            if now_ms < self._last_ms:
+                now_ms = self._last_ms
+            if now_ms == self._last_ms:
+                self._sequence = (self._sequence + 1) & MAX_SEQUENCE
+                if self._sequence == 0:
+                    # 4096 ID dalam 1 ms habis -> tunggu milidetik berikutnya
+                    while now_ms <= self._last_ms:
+                        time.sleep(0.0001)
+                        now_ms = int(time.time() * 1000) - _EPOCH_MS
+            else:
+                self._sequence = 0
+            self._last_ms = now_ms
+            return (now_ms << (WORKER_BITS + SEQUENCE_BITS)) | (self.worker_id << SEQUENCE_BITS) | self._sequence
+
+    def next_id(self):
+        return encode_base36(self.next_int())
+
+# --- LEASE WORKER ID ---
+
+def claim_worker_id(engine, lease_ttl):
+    """
+    Ambil worker_id terkecil yang belum dipakai (lease yang basi boleh diambil alih).
+    Return (worker_id, owner, lease_deadline) -- deadline dihitung dari sebelum INSERT.
+    """
+    from app.models import IdWorker
+    id_workers = IdWorker.__table__
+    owner = f"{socket.gethostname()}:{os.getpid()}:{secrets.token_hex(4)}"
+    for _ in range(MAX_WORKER_ID + 1):
+        with engine.begin() as conn:
+            now = datetime.utcnow()
+            conn.execute(delete(id_workers).where(id_workers.c.heartbeat_at < now - lease_ttl))
+            used = set(conn.execute(select(id_workers.c.worker_id)).scalars())
+            free = next((i for i in range(MAX_WORKER_ID + 1) if i not in used), None)
+            if free is None:
+                raise RuntimeError("No free worker_id left in id_workers")
+        try:
+            started = time.monotonic()
+            with engine.begin() as conn:
+                conn.execute(insert(id_workers).values(worker_id=free, owner=owner, heartbeat_at=datetime.utcnow()))
+            return free, owner, started + lease_ttl.total_seconds()
+        except IntegrityError:
+            # Proses lain mengambil worker_id yang sama duluan -> coba yang berikutnya
+            continue
+    raise RuntimeError("Could not claim a worker_id")
+
+class WorkerLeaseKeeper(threading.Thread):
+    """
+    Perbarui heartbeat lease worker_id secara berkala.
+    Heartbeat yang gagal membiarkan lease habis sendiri (allocator menolak setelah
+    lease_ttl); baris yang sudah tidak ada / milik owner lain -> lease langsung dicabut
+    dan worker_id baru disewa.
+    """
+
+    def __init__(self, engine, allocator, owner, lease_ttl):
+        super().__init__(name='id-worker-lease', daemon=True)
+        self.engine = engine
+        self.allocator = allocator
+        self.owner = owner
+        self.lease_ttl = lease_ttl
+        self.interval = lease_ttl.total_seconds() / 3
+        self._stop_event = threading.Event()
+
+    def _renew(self, id_workers):
+        started = time.monotonic()
+        with self.engine.begin() as conn:
+            result = conn.execute(
+                update(id_workers)
+                .where(id_workers.c.worker_id == self.allocator.worker_id, id_workers.c.owner == self.owner)
+                .values(heartbeat_at=datetime.utcnow())
+            )
+        if result.rowcount == 1:
+            self.allocator.renew_lease(started + self.lease_ttl.total_seconds())
+            return
+        log.error('Lost worker_id %s lease, claiming a new worker_id', self.allocator.worker_id)
+        self.allocator.revoke_lease()
+        worker_id, self.owner, lease_deadline = claim_worker_id(self.engine, self.lease_ttl)
+        self.allocator.assign_worker_id(worker_id, lease_deadline)
+        log.info('ID allocator re-leased (worker_id=%s)', worker_id)
+
+    def run(self):
+        from app.models import IdWorker
+        id_workers = IdWorker.__table__
+        while not self._stop_event.wait(self.interval):
+            try:
+                self._renew(id_workers)
+            except Exception:
+                log.exception('Failed to renew worker_id lease')
+
+    def stop(self):
+        self._stop_event.set()
+
+_allocator = None
+_allocator_lock = threading.Lock()
+
+def configure_id_allocator(engine, settings=None):
+    """
+    Dipanggil sekali saat start (main() / script seed).
+    `ids.worker_id` di .ini memaksa worker_id tertentu; jika kosong, disewa dari DB.
+    """
+    global _allocator
+    settings = settings or {}
+    if settings.get('ids.worker_id'):
+        allocator = IdAllocator(int(settings['ids.worker_id']))
+    else:
+        lease_ttl = timedelta(seconds=float(settings.get('ids.lease_ttl', 600)))
+        from app.models import IdWorker
+        IdWorker.__table__.create(engine, checkfirst=True)
+        worker_id, owner, lease_deadline = claim_worker_id(engine, lease_ttl)
+        allocator = IdAllocator(worker_id, lease_deadline)
+        WorkerLeaseKeeper(engine, allocator, owner, lease_ttl).start()
+    worker_id = allocator.worker_id
+    with _allocator_lock:
+        _allocator = allocator
+    log.info('ID allocator ready (worker_id=%s)', worker_id)
+    return _allocator
+
+class AllocatorNotConfigured(RuntimeError):
+    """generate_id() dipanggil sebelum configure_id_allocator()"""
+
+def _get_allocator():
+    # Tidak ada fallback worker_id acak: dua script yang jalan bersamaan bisa dapat
+    # worker_id sama dan membuat ID kembar. Script (seed, benchmark) wajib memanggil
+    # configure_id_allocator(engine) supaya worker_id-nya disewa dari id_workers.
+    if _allocator is None:
+        raise AllocatorNotConfigured(
+            "ID allocator is not configured: call app.ids.configure_id_allocator(engine, settings) first"
+        )
+    return _allocator
+
+# --- DEFAULT KOLOM (dipakai di models.py) ---
+
+def generate_id():
+    return _get_allocator().next_id()
+
+def generate_booking_code():
+    # Kode pendek untuk ditunjukkan di lokasi acara: 10 karakter (~50 bit acak)
+    return ''.join(secrets.choice(_BOOKING_CODE_CHARS) for _ in range(BOOKING_CODE_LENGTH))
@@ -0,0 +1,92 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from PIL import Image, ImageOps
+
+log = logging.getLogger(__name__)
+
+# --- VARIAN GAMBAR (THUMBNAIL / CARD / FULL) ---
+# Setelah upload, gambar asli diperkecil ke beberapa ukuran di worker pool
+# (bukan di thread request). Halaman list cukup mengambil varian "card",
+# bukan file asli yang bisa berukuran beberapa MB.
+
+# nama varian -> sisi terpanjang (pixel)
+IMAGE_VARIANTS = {
+    'thumb': 200,
+    'card': 640,
+    'full': 1600,
+}
+
+# Tolak gambar raksasa (decompression bomb) sebelum di-decode
+Image.MAX_IMAGE_PIXELS = 40_000_000
+
+_SAVE_OPTIONS = {
+    'JPEG': {'quality': 85, 'optimize': True, 'progressive': True},
+    'PNG': {'optimize': True},
+    'GIF': {'optimize': True},
+}
+
+def variant_filename(filename, variant):
+    stem, ext = os.path.splitext(filename)
+    return f"{stem}_{variant}{ext}"
+
+def _save_atomic(image, path, fmt):
+    tmp_path = path + '.part'
+    image.save(tmp_path, fmt, **_SAVE_OPTIONS.get(fmt, {}))
+    os.replace(tmp_path, path)
+
+def build_variants(upload_dir, filename):
+    """Buat semua varian untuk satu file (dijalankan di worker pool)"""
+    source_path = os.path.join(upload_dir, filename)
+    with Image.open(source_path) as original:
+        fmt = original.format
+        # Foto dari HP sering disimpan miring + info rotasi di EXIF (hasilnya selalu salinan)
+        image = ImageOps.exif_transpose(original)
+        if fmt == 'JPEG' and image.mode not in ('RGB', 'L'):
+            image = image.convert('RGB')
+        # Dari besar ke kecil: tiap varian di-resize dari varian sebelumnya (lebih cepat)
+        for variant, size in sorted(IMAGE_VARIANTS.items(), key=lambda item: -item[1]):
+            image.thumbnail((size, size), Image.LANCZOS)
+            _save_atomic(image, os.path.join(upload_dir, variant_filename(filename, variant)), fmt)
+
+class ImageProcessor:
+    def __init__(self, upload_dir, workers=2):
+        self.upload_dir = upload_dir
+        self.workers = workers
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings):
+        return cls(
+            upload_dir=settings['upload_dir'],
+            workers=int(settings.get('uploads.image_workers', 2))
+        )
+
+    def _get_executor(self):
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers, thread_name_prefix='image'
+                    )
+        return self._executor
+
+    def _process(self, filename):
+        try:
+            build_variants(self.upload_dir, filename)
+        except Exception:
+            # Varian gagal dibuat -> get_image_url tetap memakai file asli
+            log.exception('Failed to build image variants for %s', filename)
+
+    def submit(self, filename):
+        if self.workers == 0:
+            # Mode tanpa pool (uploads.image_workers = 0), varian dibuat langsung
+            self._process(filename)
+            return None
+        return self._get_executor().submit(self._process, filename)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
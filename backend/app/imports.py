@@ -0,0 +1,285 @@
+import csv
+import io
+import json
+import time
+from datetime import datetime
+from sqlalchemy import insert
+from app.models import Event
+from app.ids import generate_id
+
+# --- IMPORT EVENT MASSAL (CSV / NDJSON) ---
+# File dibaca baris per baris (tidak dimuat utuh ke memori), setiap baris divalidasi,
+# lalu baris yang valid dikumpulkan per batch dan di-INSERT sekaligus:
+#   - Postgres (psycopg2): COPY events (...) FROM STDIN
+#   - database lain      : INSERT executemany
+# Semua batch masuk dalam satu transaksi (session request), termasuk index
+# full-text search untuk event baru (app/search.py).
+# Hasilnya laporan per baris: nomor baris + pesan error untuk baris yang ditolak.
+
+IMPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+_CONTENT_TYPES = {
+    'text/csv': 'csv',
+    'application/csv': 'csv',
+    'application/x-ndjson': 'ndjson',
+    'application/ndjson': 'ndjson',
+    'application/jsonl': 'ndjson',
+    'application/json': 'ndjson',
+}
+
+_EXTENSIONS = {'.csv': 'csv', '.ndjson': 'ndjson', '.jsonl': 'ndjson'}
+
+REQUIRED_FIELDS = ('title', 'date', 'location', 'capacity', 'ticket_price')
+
+# Kolom yang diisi saat import (urutan ini juga dipakai untuk COPY)
+INSERT_COLUMNS = ('id', 'organizer_id', 'title', 'description', 'date', 'location',
+                  'capacity', 'ticket_price', 'inventory_shards', 'created_at')
+
+MAX_TITLE_LENGTH = 200
+
+class ImportFormatError(ValueError):
+    """File tidak bisa dibaca sama sekali (format / header salah) -> 400"""
+
+def parse_event_date(raw_date):
+    """
+    Terima "YYYY-MM-DD HH:MM", "YYYY-MM-DDTHH:MM" maupun ISO lengkap (detik, milidetik, "Z").
+    Disimpan per menit tanpa timezone, sama seperti form create event.
+    """
+    value = datetime.fromisoformat(str(raw_date).strip().replace(' ', 'T', 1))
+    return value.replace(tzinfo=None, second=0, microsecond=0)
+
+def _parse_int(value, field, errors):
+    if isinstance(value, bool) or value is None or value == '':
+        errors.append(f"{field}: required integer")
+        return None
+    try:
+        number = int(value) if not isinstance(value, float) or value.is_integer() else None
+    except (TypeError, ValueError):
+        number = None
+    if number is None:
+        errors.append(f"{field}: '{value}' is not an integer")
+    elif number < 0:
+        errors.append(f"{field}: must be >= 0")
+        number = None
+    return number
+
+def _parse_text(value, field, errors, required=True):
+    if value is None or (isinstance(value, str) and not value.strip()):
+        if required:
+            errors.append(f"{field}: required")
+        return None
+    if not isinstance(value, str):
+        errors.append(f"{field}: must be a string")
+        return None
+    return value.strip()
+
+def validate_event_row(record, organizer_id, now):
+    """Return (values_dict, None) atau (None, [pesan error])"""
+    if not isinstance(record, dict):
+        return None, ["row must be an object"]
+    errors = []
+    title = _parse_text(record.get('title'), 'title', errors)
+    if title and len(title) > MAX_TITLE_LENGTH:
+        errors.append(f"title: longer than {MAX_TITLE_LENGTH} characters")
+    location = _parse_text(record.get('location'), 'location', errors)
+    description = _parse_text(record.get('description'), 'description', errors, required=False)
+
+    raw_date = record.get('date')
+    date = None
+    if raw_date in (None, ''):
+        errors.append("date: required")
+    else:
+        try:
+            date = parse_event_date(raw_date)
+        except ValueError:
+            errors.append(f"date: '{raw_date}' is not a valid date (use YYYY-MM-DD HH:MM or ISO 8601)")
+
+    capacity = _parse_int(record.get('capacity'), 'capacity', errors)
+    ticket_price = _parse_int(record.get('ticket_price'), 'ticket_price', errors)
+    if errors:
+        return None, errors
+    return {
+        'id': generate_id(),
+        'organizer_id': organizer_id,
+        'title': title,
+        'description': description or '',
+        'date': date,
+        'location': location,
+        'capacity': capacity,
+        'ticket_price': ticket_price,
+        'inventory_shards': 0,
+        'created_at': now,
+    }, None
+
+# --- MEMBACA FILE ---
+# Reader menghasilkan (nomor_baris, record, error_parse)
+
+def _csv_records(text_stream):
+    reader = csv.DictReader(text_stream)
+    fields = [name.strip() for name in (reader.fieldnames or [])]
+    missing = [name for name in REQUIRED_FIELDS if name not in fields]
+    if missing:
+        raise ImportFormatError(f"CSV header is missing column(s): {', '.join(missing)}")
+    reader.fieldnames = fields
+    for record in reader:
+        if None in record:
+            yield reader.line_num, None, "too many values in row"
+        else:
+            yield reader.line_num, record, None
+
+def _ndjson_records(text_stream):
+    for line_no, line in enumerate(text_stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_no, json.loads(line), None
+        except ValueError as e:
+            yield line_no, None, f"invalid JSON: {e}"
+
+def _strict_utf8(records):
+    # Byte yang bukan UTF-8 tidak diganti diam-diam (U+FFFD ikut tersimpan di judul / lokasi):
+    # seluruh import ditolak, karena biasanya file-nya tersimpan dengan encoding lain
+    line_no = 0
+    try:
+        for line_no, record, parse_error in records:
+            yield line_no, record, parse_error
+    except UnicodeDecodeError as e:
+        raise ImportFormatError(
+            f"File is not valid UTF-8 (after line {line_no}): {e.reason}. Save the file as UTF-8 and retry."
+        ) from None
+
+def detect_import_format(request):
+    """?format=csv|ndjson, atau dari Content-Type / ekstensi file upload"""
+    fmt = request.GET.get('format')
+    if fmt:
+        if fmt not in IMPORT_FORMATS:
+            raise ImportFormatError(f"Unsupported format '{fmt}'. Use csv or ndjson.")
+        return fmt
+    upload = _uploaded_file(request)
+    if upload is not None:
+        for ext, name in _EXTENSIONS.items():
+            if upload.filename.lower().endswith(ext):
+                return name
+    fmt = _CONTENT_TYPES.get(request.content_type)
+    if fmt is None:
+        raise ImportFormatError("Cannot detect file format. Send text/csv or application/x-ndjson, or add ?format=")
+    return fmt
+
+def _uploaded_file(request):
+    if request.content_type != 'multipart/form-data':
+        return None
+    upload = request.POST.get('file')
+    if not hasattr(upload, 'file'):
+        raise ImportFormatError("Multipart upload must contain a 'file' field")
+    return upload
+
+def open_import_records(request):
+    """Return (format, iterator record). Body dibaca bertahap, bukan request.body sekaligus."""
+    fmt = detect_import_format(request)
+    upload = _uploaded_file(request)
+    raw = upload.file if upload is not None else io.BufferedReader(request.body_file)
+    # utf-8-sig: file CSV dari Excel sering diawali BOM
+    text_stream = io.TextIOWrapper(raw, encoding='utf-8-sig', errors='strict', newline='')
+    records = _csv_records(text_stream) if fmt == 'csv' else _ndjson_records(text_stream)
+    return fmt, _strict_utf8(records)
+
+# --- INSERT PER BATCH ---
+
+def _copy_value(value):
+    if value is None:
+        return '\\N'
+    if isinstance(value, datetime):
+        return value.isoformat(' ')
+    return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+def _copy_batch(session, rows):
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write('\t'.join(_copy_value(row[column]) for column in INSERT_COLUMNS))
+        buffer.write('\n')
+    buffer.seek(0)
+    cursor = session.connection().connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {Event.__tablename__} ({', '.join(INSERT_COLUMNS)}) FROM STDIN", buffer)
+    finally:
+        cursor.close()
+
+def _uses_copy(session):
+    bind = session.get_bind()
+    return bind.dialect.name == 'postgresql' and bind.dialect.driver == 'psycopg2'
+
+class EventImporter:
+    def __init__(self, session, organizer_id, batch_size=1000, max_rows=50000, abort_on_error=True, max_errors=100,
+                 search_index=None):
+        self.session = session
+        self.organizer_id = organizer_id
+        self.batch_size = batch_size
+        self.max_rows = max_rows
+        self.abort_on_error = abort_on_error
+        self.max_errors = max_errors
+        self.search_index = search_index
+        self.use_copy = _uses_copy(session)
+        self.batch = []
+        self.total = 0
+        self.imported = 0
+        self.failed = 0
+        self.errors = []
+        self.too_many_rows = False
+
+    def _reject(self, line_no, messages):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'line': line_no, 'errors': messages})
+
+    def _flush(self):
+        if not self.batch:
+            return
+        # Mode abort: setelah ada error tidak perlu insert lagi, semuanya akan di-rollback
+        if not (self.abort_on_error and self.failed):
+            if self.use_copy:
+                _copy_batch(self.session, self.batch)
+            else:
+                self.session.execute(insert(Event.__table__), self.batch)
+            if self.search_index is not None:
+                self.search_index.add(self.session, [row['id'] for row in self.batch])
+            self.imported += len(self.batch)
+        self.batch = []
+
+    def run(self, records):
+        started = time.perf_counter()
+        now = datetime.utcnow()
+        for line_no, record, parse_error in records:
+            self.total += 1
+            if self.total > self.max_rows:
+                self.too_many_rows = True
+                break
+            if parse_error:
+                self._reject(line_no, [parse_error])
+                continue
+            values, errors = validate_event_row(record, self.organizer_id, now)
+            if errors:
+                self._reject(line_no, errors)
+                continue
+            self.batch.append(values)
+            if len(self.batch) >= self.batch_size:
+                self._flush()
+        self._flush()
+
+        rolled_back = self.too_many_rows or (self.abort_on_error and self.failed > 0)
+        if rolled_back:
+            # Satu transaksi: batch yang sudah masuk ikut dibatalkan
+            self.session.rollback()
+            self.imported = 0
+        return {
+            'total_rows': min(self.total, self.max_rows),
+            'imported': self.imported,
+            'failed': self.failed,
+            'rolled_back': rolled_back,
+            'errors': self.errors,
+            'errors_truncated': self.failed > len(self.errors),
+            'method': 'copy' if self.use_copy else 'executemany',
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 1),
+        }
@@ -0,0 +1,153 @@
+import bisect
+import threading
+import time
+
+# --- METRIK REQUEST PER ROUTE (FORMAT PROMETHEUS) ---
+# Tween mencatat latency, jumlah request dan status code per nama route.
+# Setiap thread waitress menulis ke bucket miliknya sendiri (threading.local),
+# jadi tidak ada lock di jalur request; lock hanya dipakai saat thread baru
+# mendaftarkan bucket-nya dan saat /api/metrics menggabungkan semua bucket.
+
+# Batas atas bucket histogram latency (detik)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+class _RouteStats:
+    __slots__ = ('buckets', 'total', 'count', 'statuses')
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)  # terakhir = +Inf
+        self.total = 0.0
+        self.count = 0
+        self.statuses = {}
+
+class RequestMetrics:
+    def __init__(self):
+        self._local = threading.local()
+        self._thread_stats = []
+        self._register_lock = threading.Lock()
+        self.started_at = time.time()
+
+    def _stats_for_thread(self):
+        stats = getattr(self._local, 'stats', None)
+        if stats is None:
+            stats = self._local.stats = {}
+            with self._register_lock:
+                self._thread_stats.append(stats)
+        return stats
+
+    def observe(self, route, method, status, seconds):
+        stats = self._stats_for_thread()
+        key = (route, method)
+        entry = stats.get(key)
+        if entry is None:
+            entry = stats[key] = _RouteStats()
+        entry.buckets[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        entry.total += seconds
+        entry.count += 1
+        entry.statuses[status] = entry.statuses.get(status, 0) + 1
+
+    def collect(self):
+        """Gabungkan bucket semua thread -> {(route, method): _RouteStats}"""
+        with self._register_lock:
+            per_thread = list(self._thread_stats)
+        merged = {}
+        for stats in per_thread:
+            for key, entry in list(stats.items()):
+                target = merged.get(key)
+                if target is None:
+                    target = merged[key] = _RouteStats()
+                for i, value in enumerate(entry.buckets):
+                    target.buckets[i] += value
+                target.total += entry.total
+                target.count += entry.count
+                for status, value in list(entry.statuses.items()):
+                    target.statuses[status] = target.statuses.get(status, 0) + value
+        return merged
+
+def metrics_tween_factory(handler, registry):
+    metrics = registry.request_metrics
+    perf_counter = time.perf_counter
+
+    def metrics_tween(request):
+        started = perf_counter()
+        status = 500
+        try:
+            response = handler(request)
+            status = response.status_code
+            return response
+        finally:
+            route = request.matched_route.name if request.matched_route is not None else 'unmatched'
+            metrics.observe(route, request.method, status, perf_counter() - started)
+
+    return metrics_tween
+
+# --- EXPOSITION FORMAT (text/plain; version=0.0.4) ---
+
+def _labels(**labels):
+    def escape(value):
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return '{' + ','.join(f'{k}="{escape(v)}"' for k, v in labels.items()) + '}'
+
+def _format_float(value):
+    return repr(float(value)) if value != float('inf') else '+Inf'
+
+def render_request_metrics(metrics):
+    lines = [
+        '# HELP http_request_duration_seconds Request latency per route.',
+        '# TYPE http_request_duration_seconds histogram',
+    ]
+    merged = sorted(metrics.collect().items())
+    for (route, method), entry in merged:
+        running = 0
+        for bound, value in zip(LATENCY_BUCKETS + (float('inf'),), entry.buckets):
+            running += value
+            lines.append(f"http_request_duration_seconds_bucket{_labels(route=route, method=method, le=_format_float(bound))} {running}")
+        lines.append(f"http_request_duration_seconds_sum{_labels(route=route, method=method)} {entry.total!r}")
+        lines.append(f"http_request_duration_seconds_count{_labels(route=route, method=method)} {entry.count}")
+
+    lines += [
+        '# HELP http_requests_total Requests per route and status code.',
+        '# TYPE http_requests_total counter',
+    ]
+    for (route, method), entry in merged:
+        for status, value in sorted(entry.statuses.items()):
+            lines.append(f"http_requests_total{_labels(route=route, method=method, status=status)} {value}")
+    return lines
+
+def _render_family(lines, name, kind, samples):
+    # samples: list (suffix, labels, value); satu baris TYPE per metric family
+    lines.append(f'# TYPE {name} {kind}')
+    for suffix, labels, value in samples:
+        lines.append(f"{name}{suffix}{_labels(**labels)} {value}")
+
+def render_pool_metrics(snapshots):
+    """snapshots: {'primary': PoolMetrics.snapshot(...), 'replica': ...}"""
+    lines = []
+    wait_samples = []
+    for pool_name, snapshot in snapshots.items():
+        wait = snapshot['checkout_wait']
+        for bucket in wait['buckets']:
+            le = '+Inf' if bucket['le_ms'] == '+Inf' else _format_float(bucket['le_ms'] / 1000)
+            wait_samples.append(('_bucket', {'pool': pool_name, 'le': le}, bucket['count']))
+        wait_samples.append(('_sum', {'pool': pool_name}, repr(wait['sum_ms'] / 1000)))
+        wait_samples.append(('_count', {'pool': pool_name}, wait['count']))
+    _render_family(lines, 'db_pool_checkout_wait_seconds', 'histogram', wait_samples)
+    _render_family(lines, 'db_pool_checkout_timeouts_total', 'counter', [
+        ('', {'pool': name}, snap['checkout_wait']['timeouts']) for name, snap in snapshots.items()
+    ])
+    _render_family(lines, 'db_pool_connections_in_use', 'gauge', [
+        ('', {'pool': name}, snap['in_use']) for name, snap in snapshots.items()
+    ])
+    sized = {name: snap for name, snap in snapshots.items() if 'size' in snap}
+    if sized:
+        _render_family(lines, 'db_pool_overflow', 'gauge', [('', {'pool': name}, snap['overflow']) for name, snap in sized.items()])
+        _render_family(lines, 'db_pool_size', 'gauge', [('', {'pool': name}, snap['size']) for name, snap in sized.items()])
+    return lines
+
+def render_cache_metrics(caches):
+    """caches: {'event_cache': TTLCache.stats(), ...}"""
+    lines = []
+    _render_family(lines, 'cache_hits_total', 'counter', [('', {'cache': name}, stats['hits']) for name, stats in caches.items()])
+    _render_family(lines, 'cache_misses_total', 'counter', [('', {'cache': name}, stats['misses']) for name, stats in caches.items()])
+    _render_family(lines, 'cache_entries', 'gauge', [('', {'cache': name}, stats['entries']) for name, stats in caches.items()])
+    return lines
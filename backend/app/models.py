@@ -1,20 +1,17 @@
-from sqlalchemy import Column, String, Integer, DateTime, Text, ForeignKey
+from sqlalchemy import Column, String, Integer, BigInteger, DateTime, Text, ForeignKey, Index
 from sqlalchemy.orm import relationship, declarative_base
 from datetime import datetime
-import string
-import random
+from app.ids import generate_id, generate_booking_code
 
 Base = declarative_base()
 
-# Fungsi pembuat ID 4 Karakter (Huruf Besar + Angka)
-def generate_short_id():
-    chars = string.ascii_uppercase + string.digits # A-Z dan 0-9
-    return ''.join(random.choices(chars, k=4))
+# ID dibuat oleh app/ids.py (berbasis waktu + worker_id, dijamin unik).
+# Data lama dengan ID 4 karakter tetap valid.
 
 class User(Base):
     __tablename__ = 'users'
-    # ID otomatis panggil fungsi di atas
-    id = Column(String, primary_key=True, default=generate_short_id)
+    # ID otomatis panggil generate_id (app/ids.py)
+    id = Column(String, primary_key=True, default=generate_id)
     name = Column(String, nullable=False)
     email = Column(String, unique=True, nullable=False)
     password = Column(String, nullable=False)
@@ -35,7 +32,7 @@ class User(Base):
 
 class Event(Base):
     __tablename__ = 'events'
-    id = Column(String, primary_key=True, default=generate_short_id)
+    id = Column(String, primary_key=True, default=generate_id)
     organizer_id = Column(String, ForeignKey('users.id'), nullable=False)
     title = Column(String, nullable=False)
     description = Column(Text)
@@ -47,6 +44,8 @@ class Event(Base):
     # --- TAMBAHAN UNTUK UPLOAD GAMBAR EVENT ---
     image_filename = Column(String, nullable=True) 
     # ----------------------------------
+    # Jumlah shard stok (0 = stok langsung di kolom capacity, lihat reservations.py)
+    inventory_shards = Column(Integer, nullable=False, default=0, server_default='0')
     
     organizer = relationship("User", back_populates="events")
     bookings = relationship("Booking", back_populates="event")
@@ -55,14 +54,14 @@ class Booking(Base):
     __tablename__ = 'bookings'
     
     # ID Booking (Primary Key)
-    id = Column(String(4), primary_key=True, default=generate_short_id)
+    id = Column(String(16), primary_key=True, default=generate_id)
     
     # Relasi ke Event dan User
-    event_id = Column(String(4), ForeignKey('events.id'), nullable=False)
-    attendee_id = Column(String(4), ForeignKey('users.id'), nullable=False)
+    event_id = Column(String(16), ForeignKey('events.id'), nullable=False)
+    attendee_id = Column(String(16), ForeignKey('users.id'), nullable=False)
     
-    # Kode Booking Unik (misal: "X7K9")
-    booking_code = Column(String, unique=True, default=generate_short_id)
+    # Kode Booking Unik (misal: "7KQ9X2MD4P", lihat generate_booking_code)
+    booking_code = Column(String, unique=True, default=generate_booking_code)
     
     # Data Tiket
     quantity = Column(Integer, nullable=False)
@@ -79,7 +78,82 @@ class Booking(Base):
     # ----------------------------------------
     
     booking_date = Column(DateTime, default=datetime.utcnow)
+
+    # Group booking (paket festival): booking untuk beberapa event yang dibuat & dibayar bersama
+    group_id = Column(String(16), nullable=True)
     
     # Relasi SQLAlchemy
     event = relationship("Event", back_populates="bookings")
-    attendee = relationship("User", back_populates="bookings")
\ No newline at end of file
+    attendee = relationship("User", back_populates="bookings")
+
+    __table_args__ = (
+        # Dipakai sweeper untuk mencari booking pending yang kadaluarsa (app/sweeper.py)
+        Index('ix_bookings_status_booking_date', 'status', 'booking_date'),
+    )
+
+class InventoryShard(Base):
+    # Potongan stok tiket untuk event yang sedang "hot" (flash sale).
+    # Total sisa tiket = SUM(remaining) semua shard milik event tsb.
+    __tablename__ = 'event_inventory_shards'
+
+    # Ikut terhapus bersama event-nya (delete_event tidak menghapus shard satu per satu)
+    event_id = Column(String, ForeignKey('events.id', ondelete='CASCADE'), primary_key=True)
+    shard_no = Column(Integer, primary_key=True)
+    remaining = Column(Integer, nullable=False)
+
+class IdWorker(Base):
+    # Lease worker_id untuk alokasi ID (app/ids.py): satu baris per proses app yang hidup
+    __tablename__ = 'id_workers'
+
+    worker_id = Column(Integer, primary_key=True, autoincrement=False)
+    owner = Column(String, nullable=False)
+    heartbeat_at = Column(DateTime, nullable=False)
+
+class StoredFile(Base):
+    # File upload yang disimpan berdasarkan hash isinya (app/storage.py).
+    # ref_count = jumlah Event.image_filename + User.profile_picture yang menunjuk ke file ini.
+    __tablename__ = 'stored_files'
+
+    path = Column(String, primary_key=True)
+    ref_count = Column(Integer, nullable=False, default=0)
+    size = Column(Integer, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+class EventSales(Base):
+    # Rollup penjualan per event (app/sales.py), di-update setiap booking dibuat / dibayar / kadaluarsa.
+    # Satu event bisa punya beberapa baris (slot) supaya event flash sale yang stoknya
+    # di-shard tidak kembali antre di satu baris rollup. Total event = SUM semua slot.
+    __tablename__ = 'event_sales'
+
+    event_id = Column(String(16), ForeignKey('events.id', ondelete='CASCADE'), primary_key=True)
+    slot = Column(Integer, primary_key=True, autoincrement=False, default=0)
+    bookings_pending = Column(Integer, nullable=False, default=0, server_default='0')
+    tickets_pending = Column(Integer, nullable=False, default=0, server_default='0')
+    bookings_confirmed = Column(Integer, nullable=False, default=0, server_default='0')
+    tickets_sold = Column(Integer, nullable=False, default=0, server_default='0')
+    revenue = Column(BigInteger, nullable=False, default=0, server_default='0')
+    tickets_expired = Column(Integer, nullable=False, default=0, server_default='0')
+
+class EventSalesHourly(Base):
+    # Rollup yang sama per jam, berdasarkan jam booking dibuat (booking_date)
+    __tablename__ = 'event_sales_hourly'
+
+    event_id = Column(String(16), ForeignKey('events.id', ondelete='CASCADE'), primary_key=True)
+    bucket_start = Column(DateTime, primary_key=True)
+    slot = Column(Integer, primary_key=True, autoincrement=False, default=0)
+    bookings_pending = Column(Integer, nullable=False, default=0, server_default='0')
+    tickets_pending = Column(Integer, nullable=False, default=0, server_default='0')
+    bookings_confirmed = Column(Integer, nullable=False, default=0, server_default='0')
+    tickets_sold = Column(Integer, nullable=False, default=0, server_default='0')
+    revenue = Column(BigInteger, nullable=False, default=0, server_default='0')
+    tickets_expired = Column(Integer, nullable=False, default=0, server_default='0')
+
+# --- INDEX UNTUK QUERY YANG SERING DIPAKAI ---
+# Disesuaikan dengan bentuk query di views (lihat migrasi c41d9e7f2a18)
+Index('ix_bookings_attendee_booking_date', Booking.attendee_id, Booking.booking_date.desc()) # get_my_bookings
+Index('ix_bookings_event_booking_date', Booking.event_id, Booking.booking_date)  # export & rollup per event
+Index('ix_bookings_booking_date', Booking.booking_date.desc())                   # get_all_bookings
+Index('ix_bookings_group_id', Booking.group_id)                                    # bayar group booking
+Index('ix_events_date_id', Event.date, Event.id)                                  # katalog (keyset pagination)
+Index('ix_users_name', User.name)                                                 # login & cek duplikat username
+Index('ix_users_role_name', User.role, User.name)                                 # list user superadmin
@@ -0,0 +1,42 @@
+import base64
+from datetime import datetime
+from sqlalchemy import and_, or_
+
+# Batas jumlah item per halaman untuk endpoint list
+DEFAULT_PAGE_LIMIT = 20
+MAX_PAGE_LIMIT = 100
+
+def parse_limit(raw_limit, default=DEFAULT_PAGE_LIMIT, maximum=MAX_PAGE_LIMIT):
+    if raw_limit in (None, ''):
+        return default
+    limit = int(raw_limit)
+    if limit < 1:
+        raise ValueError("limit must be a positive integer")
+    return min(limit, maximum)
+
+# --- KEYSET CURSOR ---
+# Cursor berisi (date, id) dari item terakhir di halaman sebelumnya.
+# Di-encode base64 agar client menganggapnya sebagai string "opaque".
+
+def encode_cursor(date_value, row_id):
+    raw = f"{date_value.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode('utf8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf8')
+        date_part, row_id = raw.split('|', 1)
+        return datetime.fromisoformat(date_part), row_id
+    except (ValueError, UnicodeError):
+        raise ValueError("Invalid cursor")
+
+def apply_keyset(query, date_column, id_column, cursor):
+    """Ambil baris SETELAH cursor pada urutan (date ASC, id ASC)"""
+    if not cursor:
+        return query
+    last_date, last_id = decode_cursor(cursor)
+    return query.filter(or_(
+        date_column > last_date,
+        and_(date_column == last_date, id_column > last_id)
+    ))
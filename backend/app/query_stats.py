@@ -0,0 +1,122 @@
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pyramid.settings import asbool
+from sqlalchemy import event
+
+log = logging.getLogger(__name__)
+
+# --- PENGHITUNG QUERY SQL PER REQUEST + DETEKTOR N+1 ---
+# Listener before/after_cursor_execute di engine mencatat jumlah statement dan
+# total waktu DB ke "collector" yang sedang aktif di thread ini.
+# Statement dengan bentuk (shape) sama yang muncul berulang kali dalam satu
+# request hampir selalu lazy load di dalam loop (pola N+1).
+#
+# Mode dev (debug.sql_stats = true): response diberi header
+#   X-SQL-Count, X-SQL-Time-Ms, X-SQL-Repeated
+# dan pola N+1 ditulis ke log sebagai WARNING.
+
+_local = threading.local()
+
+_WHITESPACE = re.compile(r'\s+')
+# "IN (?, ?, ?)" / "IN (%(id_1)s, %(id_2)s)" -> "IN (?)" supaya panjang list tidak membuat shape baru
+_IN_LIST = re.compile(r'\bIN \((?:\s*(?:\?|%\(\w+\)s|:\w+|__\[POSTCOMPILE_\w+\])\s*,?)+\)', re.IGNORECASE)
+
+def statement_shape(statement):
+    return _IN_LIST.sub('IN (?)', _WHITESPACE.sub(' ', statement).strip())
+
+class QueryStats:
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.shapes = Counter()
+
+    def record(self, statement, seconds):
+        self.count += 1
+        self.total_time += seconds
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold=2):
+        """[(shape, jumlah)] untuk statement yang dijalankan >= threshold kali"""
+        return [(shape, n) for shape, n in self.shapes.most_common() if n >= threshold]
+
+def _active_collectors():
+    collectors = getattr(_local, 'collectors', None)
+    if collectors is None:
+        collectors = _local.collectors = []
+    return collectors
+
+@contextmanager
+def collect_queries():
+    """Kumpulkan statistik query di thread ini (boleh bersarang)"""
+    stats = QueryStats()
+    collectors = _active_collectors()
+    collectors.append(stats)
+    try:
+        yield stats
+    finally:
+        collectors.remove(stats)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Disimpan di execution context (per statement): tidak bocor jika statement error
+    context._query_stats_started = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    collectors = getattr(_local, 'collectors', None)
+    if collectors:
+        elapsed = time.perf_counter() - context._query_stats_started
+        for stats in collectors:
+            stats.record(statement, elapsed)
+
+def install_query_stats(engine):
+    """Pasang listener ke engine (primary & replica). Tanpa collector aktif biayanya hampir nol."""
+    event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+def query_stats_tween_factory(handler, registry):
+    settings = registry.settings
+    if not asbool(settings.get('debug.sql_stats', False)):
+        return handler
+    threshold = int(settings.get('debug.n_plus_one_threshold', 3))
+
+    def query_stats_tween(request):
+        with collect_queries() as stats:
+            response = handler(request)
+        suspects = stats.repeated(threshold)
+        response.headers['X-SQL-Count'] = str(stats.count)
+        response.headers['X-SQL-Time-Ms'] = f'{stats.total_time * 1000:.2f}'
+        response.headers['X-SQL-Repeated'] = str(len(suspects))
+        for shape, n in suspects:
+            log.warning('Probable N+1 on %s %s: %d x %s', request.method, request.path, n, shape[:300])
+        return response
+
+    return query_stats_tween
+
+# --- HELPER UNTUK TEST: BATAS JUMLAH QUERY PER ENDPOINT ---
+# Contoh (WebTest):
+#     with query_budget(3):
+#         testapp.get('/api/my-bookings', headers=auth)
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+@contextmanager
+def query_budget(max_queries, max_repeats=None):
+    """
+    Gagal (QueryBudgetExceeded) jika blok menjalankan lebih dari max_queries statement,
+    atau (jika max_repeats diisi) ada satu shape statement yang diulang lebih dari max_repeats kali.
+    """
+    with collect_queries() as stats:
+        yield stats
+    problems = []
+    if stats.count > max_queries:
+        problems.append(f"{stats.count} queries executed, budget is {max_queries}")
+    if max_repeats is not None:
+        for shape, n in stats.repeated(max_repeats + 1):
+            problems.append(f"statement repeated {n} times (max {max_repeats}): {shape[:200]}")
+    if problems:
+        detail = '\n'.join(f"  {n} x {shape[:200]}" for shape, n in stats.shapes.most_common(10))
+        raise QueryBudgetExceeded('; '.join(problems) + '\nTop statements:\n' + detail)
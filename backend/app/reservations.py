@@ -0,0 +1,238 @@
+import random
+import threading
+import time
+from sqlalchemy import update, delete, select, func, case
+from app.models import Event, InventoryShard
+
+# --- MESIN RESERVASI KAPASITAS ---
+# Semua perubahan stok memakai UPDATE bersyarat yang atomik:
+#   UPDATE ... SET capacity = capacity - :q WHERE ... AND capacity >= :q
+# Jika rowcount = 0 berarti stok tidak cukup -> tidak ada oversell,
+# dan tidak perlu SELECT ... FOR UPDATE yang membuat pembeli antre di satu baris.
+#
+# Untuk event yang sangat ramai, stok bisa dipecah ke beberapa shard
+# (tabel event_inventory_shards) supaya pembeli tersebar ke banyak baris.
+#
+# Mode stok (events.inventory_shards) bisa berubah saat pembeli sedang berjalan
+# (shard_inventory / merge_inventory). Karena itu UPDATE ke events.capacity selalu
+# bersyarat inventory_shards = 0, dan jika gagal mode stok dibaca ulang -- potongan
+# ke events.capacity setelah stok dipindah ke shard akan tertimpa sync berikutnya (oversell).
+#
+# events.capacity untuk event yang di-shard hanya disinkron berkala (SHARD_SYNC_INTERVAL),
+# jadi pembaca yang butuh angka pasti memakai remaining_capacity() / remaining_capacity_column().
+
+# Minimal jeda (detik) antar sinkronisasi total shard -> events.capacity per event
+SHARD_SYNC_INTERVAL = 1.0
+
+_last_sync = {}
+_last_sync_lock = threading.Lock()
+
+def _take_from_events(session, event_id, quantity):
+    result = session.execute(
+        update(Event)
+        .where(Event.id == event_id, Event.inventory_shards == 0, Event.capacity >= quantity)
+        .values(capacity=Event.capacity - quantity)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+def _take_from_shard(session, event_id, shard_no, quantity):
+    result = session.execute(
+        update(InventoryShard)
+        .where(
+            InventoryShard.event_id == event_id,
+            InventoryShard.shard_no == shard_no,
+            InventoryShard.remaining >= quantity
+        )
+        .values(remaining=InventoryShard.remaining - quantity)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == 1
+
+def _take_from_shards(session, event_id, shard_count, quantity):
+    # Jalur cepat: mulai dari shard acak agar pembeli yang bersamaan tidak rebutan baris
+    # yang sama. Aman dari deadlock: UPDATE yang gagal tidak menahan kunci, dan yang
+    # berhasil langsung selesai -> paling banyak satu shard terkunci.
+    start = random.randrange(shard_count)
+    for i in range(shard_count):
+        if _take_from_shard(session, event_id, (start + i) % shard_count, quantity):
+            return True
+
+    # Tidak ada satu shard pun yang cukup: ambil sedikit-sedikit dari beberapa shard.
+    # Dibungkus SAVEPOINT supaya bisa dibatalkan kalau totalnya tetap kurang.
+    # Kunci setiap shard ditahan sampai commit, jadi urutannya harus sama untuk semua
+    # transaksi (shard_no naik) -- urutan acak bisa saling deadlock di Postgres.
+    savepoint = session.begin_nested()
+    needed = quantity
+    for shard_no in range(shard_count):
+        remaining = session.execute(
+            select(InventoryShard.remaining).where(
+                InventoryShard.event_id == event_id,
+                InventoryShard.shard_no == shard_no
+            )
+        ).scalar() or 0
+        take = min(remaining, needed)
+        if take > 0 and _take_from_shard(session, event_id, shard_no, take):
+            needed -= take
+        if needed == 0:
+            savepoint.commit()
+            return True
+    savepoint.rollback()
+    return False
+
+def _maybe_sync_shard_total(session, event_id):
+    now = time.monotonic()
+    with _last_sync_lock:
+        if now - _last_sync.get(event_id, 0) < SHARD_SYNC_INTERVAL:
+            return
+        _last_sync[event_id] = now
+    sync_shard_total(session, event_id)
+
+def reserve_capacity(session, event, quantity):
+    """
+    Kurangi stok event secara atomik.
+    Return True jika berhasil, False jika sisa tiket tidak cukup.
+    """
+    if quantity < 1:
+        raise ValueError("Quantity must be at least 1")
+
+    shard_count = event.inventory_shards
+    # Maksimal satu kali pindah mode: stok kurang ATAU event baru saja di-shard / digabung
+    for attempt in range(2):
+        if shard_count:
+            if _take_from_shards(session, event.id, shard_count, quantity):
+                _maybe_sync_shard_total(session, event.id)
+                return True
+        elif _take_from_events(session, event.id, quantity):
+            return True
+        current = _current_shard_count(session, event.id)
+        if current == shard_count:
+            return False
+        shard_count = current
+    return False
+
+def _current_shard_count(session, event_id):
+    return session.execute(
+        select(Event.inventory_shards).where(Event.id == event_id)
+    ).scalar() or 0
+
+def reserve_group_capacity(session, items):
+    """
+    Reservasi beberapa event sekaligus (group booking).
+    items: [(event, quantity)]. Stok dipotong berurutan menurut event.id, dan di dalam
+    satu event kuncinya juga berurutan (lihat _take_from_shards): satu shard acak di
+    jalur cepat, atau shard_no naik di jalur sebar, lalu baris events saat sync total.
+    Semua transaksi mengunci dengan urutan yang sama -> group booking yang overlap
+    tidak bisa saling deadlock. (Slot rollup penjualan dipilih acak tetapi ditulis
+    terurut per (event_id, slot), setelah semua stok, lihat app/sales.py.)
+    Return None jika semua berhasil, atau event yang stoknya tidak cukup
+    (caller WAJIB rollback supaya potongan stok event sebelumnya ikut batal).
+    """
+    for event, quantity in sorted(items, key=lambda item: item[0].id):
+        if not reserve_capacity(session, event, quantity):
+            return event
+    return None
+
+def release_capacity(session, event_id, quantity, shard_count=0):
+    """Kembalikan stok (misalnya booking dibatalkan / kadaluarsa)"""
+    for attempt in range(2):
+        if shard_count:
+            result = session.execute(
+                update(InventoryShard)
+                .where(
+                    InventoryShard.event_id == event_id,
+                    InventoryShard.shard_no == random.randrange(shard_count)
+                )
+                .values(remaining=InventoryShard.remaining + quantity)
+                .execution_options(synchronize_session=False)
+            )
+        else:
+            result = session.execute(
+                update(Event)
+                .where(Event.id == event_id, Event.inventory_shards == 0)
+                .values(capacity=Event.capacity + quantity)
+                .execution_options(synchronize_session=False)
+            )
+        if result.rowcount == 1:
+            return
+        # Mode stok berubah (shard baru dibuat / sudah digabung) -> ulangi dengan mode terbaru
+        shard_count = _current_shard_count(session, event_id)
+
+def remaining_capacity_column():
+    """Ekspresi SQL sisa stok per baris events (event yang di-shard: SUM shard, bukan kolom yang disinkron berkala)"""
+    return case(
+        (Event.inventory_shards > 0, select(func.coalesce(func.sum(InventoryShard.remaining), 0))
+            .where(InventoryShard.event_id == Event.id).scalar_subquery()),
+        else_=Event.capacity
+    )
+
+def remaining_capacity(session, event):
+    if event.inventory_shards:
+        return session.execute(
+            select(func.coalesce(func.sum(InventoryShard.remaining), 0))
+            .where(InventoryShard.event_id == event.id)
+        ).scalar()
+    return session.execute(
+        select(Event.capacity).where(Event.id == event.id)
+    ).scalar()
+
+# --- PENGELOLAAN SHARD ---
+
+def sync_shard_total(session, event_id):
+    """Tulis total sisa semua shard ke events.capacity (untuk ditampilkan di katalog)"""
+    total = (
+        select(func.coalesce(func.sum(InventoryShard.remaining), 0))
+        .where(InventoryShard.event_id == event_id)
+        .scalar_subquery()
+    )
+    session.execute(
+        update(Event)
+        .where(Event.id == event_id, Event.inventory_shards > 0)
+        .values(capacity=total)
+        .execution_options(synchronize_session=False)
+    )
+
+def shard_inventory(session, event, shard_count):
+    """Pecah sisa stok event ke `shard_count` shard (dipanggil sebelum flash sale)"""
+    if event.inventory_shards:
+        merge_inventory(session, event)
+    if shard_count < 2:
+        return
+
+    # Kunci baris event selama stok dipindahkan (hanya sekali, bukan per pembeli)
+    total = session.execute(
+        select(Event.capacity).where(Event.id == event.id).with_for_update()
+    ).scalar()
+    base, extra = divmod(total, shard_count)
+    session.add_all([
+        InventoryShard(event_id=event.id, shard_no=i, remaining=base + (1 if i < extra else 0))
+        for i in range(shard_count)
+    ])
+    event.inventory_shards = shard_count
+    session.flush()
+
+def merge_inventory(session, event):
+    """Gabungkan kembali semua shard ke events.capacity dan hapus shard-nya"""
+    if not event.inventory_shards:
+        return
+    remaining = session.execute(
+        select(InventoryShard.remaining)
+        .where(InventoryShard.event_id == event.id)
+        .with_for_update()
+    ).scalars().all()
+    total = sum(remaining)
+    session.execute(delete(InventoryShard).where(InventoryShard.event_id == event.id))
+    event.capacity = total
+    event.inventory_shards = 0
+    session.flush()
+    with _last_sync_lock:
+        _last_sync.pop(event.id, None)
+
+def set_total_capacity(session, event, new_capacity):
+    """Ubah sisa stok (dari form edit event) tanpa merusak shard yang aktif"""
+    shard_count = event.inventory_shards
+    merge_inventory(session, event)
+    event.capacity = new_capacity
+    session.flush()
+    if shard_count:
+        shard_inventory(session, event, shard_count)
@@ -0,0 +1,164 @@
+import random
+import sys
+from collections import defaultdict
+from sqlalchemy import select, delete, insert, func, case, literal
+from app.models import Event, Booking, EventSales, EventSalesHourly
+
+# --- ROLLUP PENJUALAN PER EVENT (DASHBOARD ORGANIZER) ---
+# events.capacity berisi SISA stok (dipotong saat booking), jadi angka penjualan tidak
+# bisa dibaca dari tabel events dan menghitungnya dari bookings berarti scan semua booking.
+# Karena itu setiap perubahan status booking langsung menambah / mengurangi counter di:
+#   - event_sales        : total per event
+#   - event_sales_hourly : per jam booking dibuat (booking_date)
+# dalam transaksi yang sama dengan perubahan bookingnya (INSERT ... ON CONFLICT DO UPDATE
+# dengan nilai delta). Dashboard cukup membaca O(jumlah event), bukan O(jumlah booking).
+#
+#   created   : pending +1 booking / +quantity tiket
+#   confirmed : pending -1 / -quantity, confirmed +1, sold +quantity, revenue +total_price
+#   expired   : pending -1 / -quantity, expired +quantity
+#
+# Kapasitas awal event = sisa stok + tiket pending + tiket terjual.
+# Jika rollup tidak sinkron (misal data booking diubah manual): `rebuild_sales development.ini`.
+
+COUNTERS = ('bookings_pending', 'tickets_pending', 'bookings_confirmed',
+            'tickets_sold', 'revenue', 'tickets_expired')
+
+SALE_CHANGES = ('created', 'confirmed', 'expired')
+
+def hour_bucket(value):
+    return value.replace(minute=0, second=0, microsecond=0)
+
+def _deltas(change, quantity, total_price):
+    if change == 'created':
+        return {'bookings_pending': 1, 'tickets_pending': quantity}
+    if change == 'confirmed':
+        return {'bookings_pending': -1, 'tickets_pending': -quantity, 'bookings_confirmed': 1,
+                'tickets_sold': quantity, 'revenue': total_price}
+    if change == 'expired':
+        return {'bookings_pending': -1, 'tickets_pending': -quantity, 'tickets_expired': quantity}
+    raise ValueError(f"Unknown sales change {change!r}, expected one of {SALE_CHANGES}")
+
+def _upsert(session, model, keys, rows):
+    # INSERT ... ON CONFLICT DO UPDATE (sintaks sama di Postgres & SQLite, lihat storage.py)
+    if session.get_bind().dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert as upsert
+    else:
+        from sqlalchemy.dialects.sqlite import insert as upsert
+    statement = upsert(model)
+    table = model.__table__
+    statement = statement.on_conflict_do_update(
+        index_elements=list(keys),
+        set_={name: table.c[name] + statement.excluded[name] for name in COUNTERS}
+    )
+    session.execute(statement, rows)
+
+def _rows(keys, totals):
+    # Urut per key: baris rollup selalu dikunci dengan urutan yang sama (tidak deadlock)
+    return [
+        {**dict(zip(keys, key)), **{name: counters.get(name, 0) for name in COUNTERS}}
+        for key, counters in sorted(totals.items())
+    ]
+
+def record_sales(session, change, bookings, shard_counts=None):
+    """
+    Terapkan perubahan status booking ke rollup. Caller yang commit.
+    change      : 'created' | 'confirmed' | 'expired'
+    bookings    : [(event_id, booking_date, quantity, total_price)]
+    shard_counts: {event_id: inventory_shards} -> event flash sale ditulis ke slot acak
+    """
+    shard_counts = shard_counts or {}
+    totals = defaultdict(lambda: defaultdict(int))
+    hourly = defaultdict(lambda: defaultdict(int))
+    for event_id, booking_date, quantity, total_price in bookings:
+        shards = shard_counts.get(event_id) or 0
+        slot = random.randrange(shards) if shards else 0
+        for name, value in _deltas(change, quantity, total_price).items():
+            totals[(event_id, slot)][name] += value
+            hourly[(event_id, hour_bucket(booking_date), slot)][name] += value
+    if not totals:
+        return
+    _upsert(session, EventSales, ('event_id', 'slot'), _rows(('event_id', 'slot'), totals))
+    _upsert(session, EventSalesHourly, ('event_id', 'bucket_start', 'slot'),
+            _rows(('event_id', 'bucket_start', 'slot'), hourly))
+
+# --- QUERY UNTUK DASHBOARD ---
+
+def _summed(model):
+    return [func.sum(getattr(model, name)).label(name) for name in COUNTERS]
+
+def event_sales_columns():
+    """SUM counter semua slot, untuk query events OUTER JOIN event_sales GROUP BY event"""
+    return _summed(EventSales)
+
+def hourly_sales(event_id):
+    return select(EventSalesHourly.bucket_start, *_summed(EventSalesHourly))\
+        .where(EventSalesHourly.event_id == event_id)\
+        .group_by(EventSalesHourly.bucket_start)\
+        .order_by(EventSalesHourly.bucket_start)
+
+# --- HITUNG ULANG DARI TABEL BOOKINGS ---
+
+def _hour_expression(dialect_name):
+    if dialect_name == 'postgresql':
+        return func.date_trunc('hour', Booking.booking_date)
+    # Format sama dengan cara SQLAlchemy menyimpan DateTime di SQLite (dengan mikrodetik),
+    # supaya bucket hasil rebuild dan hasil record_sales() adalah baris yang sama
+    return func.strftime('%Y-%m-%d %H:00:00.000000', Booking.booking_date)
+
+def _count_if(condition, value=1):
+    return func.coalesce(func.sum(case((condition, value), else_=0)), 0)
+
+def rebuild_sales(connection):
+    """Kosongkan kedua tabel rollup lalu isi ulang dari bookings (satu transaksi)"""
+    if connection.dialect.name == 'postgresql':
+        # Tahan penulis rollup lain sampai rebuild commit: delta mereka diterapkan setelah
+        # rebuild, dan booking yang sudah commit pasti terbaca oleh SELECT di bawah
+        connection.exec_driver_sql(
+            "LOCK TABLE event_sales, event_sales_hourly IN SHARE ROW EXCLUSIVE MODE"
+        )
+    connection.execute(delete(EventSalesHourly))
+    connection.execute(delete(EventSales))
+
+    hour = _hour_expression(connection.dialect.name)
+    pending = Booking.status == 'pending'
+    confirmed = Booking.status == 'confirmed'
+    expired = Booking.status == 'expired'
+    bookings = select(
+            Booking.event_id, hour, literal(0),
+            _count_if(pending), _count_if(pending, Booking.quantity),
+            _count_if(confirmed), _count_if(confirmed, Booking.quantity),
+            _count_if(confirmed, Booking.total_price), _count_if(expired, Booking.quantity)
+        )\
+        .join(Event, Event.id == Booking.event_id)\
+        .group_by(Booking.event_id, hour)
+    connection.execute(insert(EventSalesHourly).from_select(
+        ['event_id', 'bucket_start', 'slot', *COUNTERS], bookings
+    ))
+    connection.execute(insert(EventSales).from_select(
+        ['event_id', 'slot', *COUNTERS],
+        select(EventSalesHourly.event_id, literal(0), *_summed(EventSalesHourly))
+        .group_by(EventSalesHourly.event_id)
+    ))
+    return connection.execute(select(func.count()).select_from(EventSales)).scalar()
+
+# --- CONSOLE SCRIPT ---
+# Contoh: rebuild_sales development.ini
+
+def main(argv=sys.argv):
+    from pyramid.paster import get_appsettings, setup_logging
+    from app import _apply_database_url
+    from app.db_pool import create_engine_with_metrics
+
+    if len(argv) < 2:
+        print(f'usage: {argv[0]} <config_uri>')
+        return 1
+    config_uri = argv[1]
+    setup_logging(config_uri)
+    settings = dict(get_appsettings(config_uri))
+    _apply_database_url(settings)
+    engine, _ = create_engine_with_metrics(settings)
+
+    with engine.begin() as conn:
+        events = rebuild_sales(conn)
+    print(f'Sales rollups rebuilt: {events} events')
+    return 0
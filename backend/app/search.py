@@ -0,0 +1,196 @@
+import re
+import sys
+from sqlalchemy import inspect, text, func, table, column
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from app.models import Event
+
+# --- FULL-TEXT SEARCH EVENT (title, description, location) ---
+# Index disimpan di tabel terpisah "event_search" (bukan bagian dari models.py,
+# karena bentuknya beda per database):
+#   - SQLite  : virtual table FTS5, ranking bm25()
+#   - Postgres: kolom tsvector + index GIN, ranking ts_rank_cd()
+# Index di-update per event dari view create / update / delete / import
+# (reindex / remove setelah flush, dalam transaksi yang sama dengan perubahan event).
+# Jika index perlu dibangun ulang: `rebuild_search_index development.ini`.
+
+SEARCH_TABLE = 'event_search'
+
+# Kata yang dipakai dari query pencarian (sisanya diabaikan)
+MAX_QUERY_TERMS = 8
+
+_WORD = re.compile(r'\w+', re.UNICODE)
+
+def query_terms(raw_query):
+    """'Konser  Jazz, Jakarta!' -> ['konser', 'jazz', 'jakarta'] (hanya huruf/angka, aman untuk MATCH / tsquery)"""
+    return _WORD.findall((raw_query or '').lower())[:MAX_QUERY_TERMS]
+
+class SQLiteSearchIndex:
+    # Bobot bm25 per kolom (urutan kolom tabel): event_id tidak ikut ranking
+    RANK = f'bm25({SEARCH_TABLE}, 0.0, 10.0, 2.0, 5.0)'
+
+    fts = table(SEARCH_TABLE, column('event_id'))
+
+    def ddl(self):
+        return [
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+            f"event_id, title, description, location, tokenize='unicode61 remove_diacritics 2')"
+        ]
+
+    def _id_match(self, event_id):
+        # Filter kolom event_id lewat index FTS (kolom UNINDEXED harus di-scan penuh)
+        return 'event_id : "' + event_id.replace('"', '""') + '"'
+
+    def remove(self, session, event_ids):
+        if event_ids:
+            session.execute(
+                text(f"DELETE FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :match"),
+                [{'match': self._id_match(event_id)} for event_id in event_ids]
+            )
+
+    def add(self, session, event_ids):
+        """Index event baru dari isi tabel events (panggil setelah flush / insert)"""
+        if event_ids:
+            session.execute(
+                text(f"INSERT INTO {SEARCH_TABLE} (event_id, title, description, location) "
+                     f"SELECT id, title, coalesce(description, ''), location FROM events WHERE id = :event_id"),
+                [{'event_id': event_id} for event_id in event_ids]
+            )
+
+    def reindex(self, session, event_ids):
+        """Tulis ulang dokumen event yang sudah ada (FTS5 tidak punya UPSERT)"""
+        self.remove(session, event_ids)
+        self.add(session, event_ids)
+
+    def rebuild(self, connection):
+        connection.execute(text(f"DELETE FROM {SEARCH_TABLE}"))
+        connection.execute(text(
+            f"INSERT INTO {SEARCH_TABLE} (event_id, title, description, location) "
+            f"SELECT id, title, coalesce(description, ''), location FROM events"
+        ))
+
+    def apply(self, query, terms):
+        """Batasi & urutkan query (yang memilih kolom Event) berdasarkan relevansi"""
+        match = '{title description location} : (' + ' '.join(f'"{term}"*' for term in terms) + ')'
+        return query\
+            .join(self.fts, self.fts.c.event_id == Event.id)\
+            .filter(text(f'{SEARCH_TABLE} MATCH :search_match').bindparams(search_match=match))\
+            .order_by(text(self.RANK), Event.id)
+
+class PostgresSearchIndex:
+    def __init__(self, config='simple'):
+        # Konfigurasi text search Postgres ('simple' = tanpa stemming, cocok untuk teks campuran)
+        self.config = config
+        self.documents = table(SEARCH_TABLE, column('event_id'), column('document', TSVECTOR))
+
+    def _document_sql(self):
+        config = f"'{self.config}'::regconfig"
+        return (
+            f"setweight(to_tsvector({config}, coalesce(title, '')), 'A') || "
+            f"setweight(to_tsvector({config}, coalesce(location, '')), 'B') || "
+            f"setweight(to_tsvector({config}, coalesce(description, '')), 'C')"
+        )
+
+    def ddl(self):
+        return [
+            f"CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ("
+            f"event_id VARCHAR(16) PRIMARY KEY REFERENCES events (id) ON DELETE CASCADE, "
+            f"document TSVECTOR NOT NULL)",
+            f"CREATE INDEX IF NOT EXISTS ix_{SEARCH_TABLE}_document ON {SEARCH_TABLE} USING GIN (document)",
+        ]
+
+    def remove(self, session, event_ids):
+        # Sebenarnya sudah ikut terhapus lewat ON DELETE CASCADE
+        if event_ids:
+            session.execute(
+                text(f"DELETE FROM {SEARCH_TABLE} WHERE event_id = :event_id"),
+                [{'event_id': event_id} for event_id in event_ids]
+            )
+
+    def add(self, session, event_ids):
+        self.reindex(session, event_ids)
+
+    def reindex(self, session, event_ids):
+        if not event_ids:
+            return
+        session.execute(
+            text(f"INSERT INTO {SEARCH_TABLE} (event_id, document) "
+                 f"SELECT id, {self._document_sql()} FROM events WHERE id = :event_id "
+                 f"ON CONFLICT (event_id) DO UPDATE SET document = EXCLUDED.document"),
+            [{'event_id': event_id} for event_id in event_ids]
+        )
+
+    def rebuild(self, connection):
+        connection.execute(text(f"TRUNCATE {SEARCH_TABLE}"))
+        connection.execute(text(
+            f"INSERT INTO {SEARCH_TABLE} (event_id, document) SELECT id, {self._document_sql()} FROM events"
+        ))
+
+    def apply(self, query, terms):
+        tsquery = func.to_tsquery(self.config, ' & '.join(f'{term}:*' for term in terms))
+        document = self.documents.c.document
+        return query\
+            .join(self.documents, self.documents.c.event_id == Event.id)\
+            .filter(document.op('@@')(tsquery))\
+            .order_by(func.ts_rank_cd(document, tsquery).desc(), Event.id)
+
+def build_search_index(engine, settings):
+    """Return index sesuai dialect database, atau None jika tidak didukung"""
+    if engine.dialect.name == 'sqlite':
+        return SQLiteSearchIndex()
+    if engine.dialect.name == 'postgresql':
+        return PostgresSearchIndex(settings.get('search.postgres_config', 'simple'))
+    return None
+
+# --- DIPANGGIL DARI VIEW (tidak melakukan apa-apa jika database tidak didukung) ---
+
+def index_events(request, event_ids, new=False):
+    index = request.registry.search_index
+    if index is not None:
+        (index.add if new else index.reindex)(request.dbsession, list(event_ids))
+
+def unindex_events(request, event_ids):
+    index = request.registry.search_index
+    if index is not None:
+        index.remove(request.dbsession, list(event_ids))
+
+def ensure_search_index(engine, index):
+    """
+    Dipanggil dari main(): buat tabel index jika belum ada (misal database dev
+    yang dibuat dengan create_all, bukan alembic) lalu isi dari tabel events.
+    """
+    if index is None:
+        return False
+    with engine.begin() as conn:
+        if inspect(conn).has_table(SEARCH_TABLE):
+            return False
+        for statement in index.ddl():
+            conn.exec_driver_sql(statement)
+        index.rebuild(conn)
+    return True
+
+def main(argv=sys.argv):
+    from pyramid.paster import get_appsettings, setup_logging
+    from app import _apply_database_url
+    from app.db_pool import create_engine_with_metrics
+
+    if len(argv) < 2:
+        print(f'usage: {argv[0]} <config_uri>')
+        return 1
+    config_uri = argv[1]
+    setup_logging(config_uri)
+    settings = dict(get_appsettings(config_uri))
+    _apply_database_url(settings)
+    # Bukan engine_from_config langsung: key sqlalchemy.replica.* bukan argumen create_engine
+    engine, _ = create_engine_with_metrics(settings)
+
+    index = build_search_index(engine, settings)
+    if index is None:
+        print(f'Full-text search is not supported on {engine.dialect.name}')
+        return 1
+    with engine.begin() as conn:
+        for statement in index.ddl():
+            conn.exec_driver_sql(statement)
+        index.rebuild(conn)
+        count = conn.execute(text(f"SELECT count(*) FROM {SEARCH_TABLE}")).scalar()
+    print(f'Search index rebuilt: {count} events')
+    return 0
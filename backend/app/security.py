@@ -1,18 +1,31 @@
 import bcrypt
 import jwt
 import datetime
+import hashlib
+import time
+from app.cache import TTLCache
 
 # KUNCI RAHASIA (Jangan disebar! Idealnya taruh di environment variable)
 SECRET_KEY = "ini_rahasia_banget_jangan_kasih_tau_siapapun"
 
-def hash_password(pw):
-    pwhash = bcrypt.hashpw(pw.encode('utf8'), bcrypt.gensalt())
+# Cost default bcrypt; di app diatur lewat auth.bcrypt_rounds (lihat app/hashing.py)
+DEFAULT_BCRYPT_ROUNDS = 12
+
+def hash_password(pw, rounds=DEFAULT_BCRYPT_ROUNDS):
+    pwhash = bcrypt.hashpw(pw.encode('utf8'), bcrypt.gensalt(rounds))
     return pwhash.decode('utf8')
 
 def check_password(pw, hashed_pw):
     expected_hash = hashed_pw.encode('utf8')
     return bcrypt.checkpw(pw.encode('utf8'), expected_hash)
 
+def get_bcrypt_rounds(hashed_pw):
+    # Format hash bcrypt: $2b$<cost>$<salt+hash>
+    try:
+        return int(hashed_pw.split('$')[2])
+    except (IndexError, ValueError):
+        return None
+
 # --- FUNGSI BARU UNTUK JWT ---
 
 def create_token(user_id, role):
@@ -26,15 +39,44 @@ def create_token(user_id, role):
     token = jwt.encode(payload, SECRET_KEY, algorithm='HS256')
     return token
 
-def verify_token(token):
+# --- CACHE TOKEN TERVERIFIKASI ---
+# Token yang sama dikirim berkali-kali per menit; decode + cek signature HS256
+# cukup sekali, lalu payload disimpan sampai token itu sendiri expired (exp).
+# Key = SHA-256 token, jadi token asli tidak tersimpan di memori cache.
+token_cache = TTLCache(max_entries=10000, ttl=900)
+
+def configure_token_cache(settings):
+    global token_cache
+    token_cache = TTLCache(
+        max_entries=int(settings.get('auth.token_cache.max_entries', 10000)),
+        ttl=float(settings.get('auth.token_cache.ttl', 900))
+    )
+    return token_cache
+
+def _decode_token(token):
     try:
-        # Hapus prefix 'Bearer ' jika ada
-        if token.startswith('Bearer '):
-            token = token.split(' ')[1]
-            
-        payload = jwt.decode(token, SECRET_KEY, algorithms=['HS256'])
-        return payload # Mengembalikan {'sub': '...', 'role': '...'}
+        return jwt.decode(token, SECRET_KEY, algorithms=['HS256'])
     except jwt.ExpiredSignatureError:
         return None # Token kadaluarsa
     except jwt.InvalidTokenError:
-        return None # Token palsu
\ No newline at end of file
+        return None # Token palsu
+
+def verify_token(token):
+    # Hapus prefix 'Bearer ' jika ada
+    if token.startswith('Bearer '):
+        token = token.split(' ')[1]
+
+    key = hashlib.sha256(token.encode('utf8')).digest()
+    payload = token_cache.get(key)
+    if payload is not None:
+        return dict(payload) # Mengembalikan {'sub': '...', 'role': '...'}
+
+    payload = _decode_token(token)
+    if payload is None:
+        return None
+
+    # Entry cache ikut kadaluarsa bersama token
+    remaining = payload['exp'] - time.time()
+    if remaining > 0:
+        token_cache.set(key, dict(payload), ttl=remaining)
+    return payload
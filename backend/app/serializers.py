@@ -0,0 +1,112 @@
+import json
+from json.encoder import encode_basestring_ascii
+from pyramid.response import Response
+from sqlalchemy import Integer, Numeric, Float, DateTime, Date, String, Text
+
+# --- PROYEKSI KOLOM + ENCODER JSON PER ENDPOINT ---
+# Endpoint list cukup butuh beberapa kolom. Daripada load entity ORM lengkap
+# (termasuk hash password / deskripsi panjang, identity map, instrumentasi atribut)
+# lalu menyalinnya ke dict, setiap endpoint mendeklarasikan kolom yang dipakai:
+#
+#     USER_LIST = Projection('user_list', [
+#         ('id', User.id), ('name', User.name), ('created_at', User.created_at),
+#     ])
+#     rows = USER_LIST.query(request.dbsession).all()    # Row tuple, bukan entity
+#     return USER_LIST.response(rows)
+#
+# Encoder JSON untuk bentuk (shape) itu disiapkan sekali saat import: tuple berisi
+# (prefix '"key":', encoder tipe kolom, JSON jika NULL) per field, dipasangkan dengan
+# nilai Row tuple sesuai urutan kolom. Tidak ada dict perantara per baris dan tidak ada
+# json.dumps generik untuk kolom yang tipenya diketahui.
+# Field computed (misal image_url yang butuh request) diisi lewat keyword saat encode.
+
+_NULL = 'null'
+
+def _encode_datetime(value):
+    return encode_basestring_ascii(value.isoformat())
+
+def _encode_number(value):
+    # Numeric bisa berupa Decimal -> float supaya JSON tetap angka
+    return json.dumps(value if isinstance(value, (int, float)) else float(value))
+
+def _encoder_for(column):
+    column_type = getattr(column, 'type', None)
+    if isinstance(column_type, (String, Text)):
+        return encode_basestring_ascii
+    if isinstance(column_type, Integer):
+        return int.__repr__
+    if isinstance(column_type, (DateTime, Date)):
+        return _encode_datetime
+    if isinstance(column_type, (Numeric, Float)):
+        return _encode_number
+    return json.dumps
+
+def _computed_item(prefix, fn):
+    # Fungsi computed -> hasilnya bebas (str / None / dict), di-encode json.dumps.
+    # Kolom NULL -> hasil fn(None), dihitung sekali per encode()
+    def encode_value(value):
+        return json.dumps(fn(value))
+    return prefix, encode_value, json.dumps(fn(None))
+
+def _row_encoder(items):
+    def encode_row(row):
+        return '{' + ','.join([
+            prefix + (fallback if value is None else encoder(value))
+            for (prefix, encoder, fallback), value in zip(items, row)
+        ]) + '}'
+    return encode_row
+
+class Projection:
+    def __init__(self, name, fields, computed=()):
+        """
+        fields  : [(key, column)] atau [(key, column, default)] -- default dipakai jika nilai NULL
+                  (misal hasil outer join yang tidak ketemu)
+        computed: nama key yang nilainya dihitung dari kolom dengan fungsi yang diberikan
+                  saat encode, misal computed=('image_url',) + encode(rows, image_url=fn)
+        """
+        self.name = name
+        self.keys = []
+        self.columns = []
+        items = []
+        for field in fields:
+            key, column = field[0], field[1]
+            self.keys.append(key)
+            self.columns.append(column.label(key))
+            prefix = encode_basestring_ascii(key) + ':'
+            if key in computed:
+                items.append((prefix, None, None))  # encoder diisi saat encode()
+            else:
+                items.append((prefix, _encoder_for(column), json.dumps(field[2]) if len(field) > 2 else _NULL))
+        unknown = set(computed) - set(self.keys)
+        if unknown:
+            raise ValueError(f"Computed field(s) not declared in projection {name}: {sorted(unknown)}")
+        self.computed = tuple(computed)
+        self._items = tuple(items)
+        self._encode_row = _row_encoder(self._items) if not self.computed else None
+
+    def _encoder(self, computed):
+        if not self.computed:
+            return self._encode_row
+        if set(computed) != set(self.computed):
+            raise TypeError(f"Projection {self.name} needs computed field(s) {sorted(self.computed)}, "
+                            f"got {sorted(computed)}")
+        return _row_encoder(tuple(
+            _computed_item(item[0], computed[key]) if key in computed else item
+            for key, item in zip(self.keys, self._items)
+        ))
+
+    def query(self, session):
+        """session.query(kolom...) -> hasilnya Row tuple sesuai urutan field"""
+        return session.query(*self.columns)
+
+    def encode(self, rows, **computed):
+        """Return string JSON array untuk rows"""
+        encode_row = self._encoder(computed)
+        return '[' + ','.join([encode_row(row) for row in rows]) + ']'
+
+    def response(self, rows, **computed):
+        return json_response(self.encode(rows, **computed))
+
+def json_response(body):
+    """Response JSON dari string yang sudah di-encode (renderer 'json' dilewati)"""
+    return Response(body=body.encode('utf8'), content_type='application/json')
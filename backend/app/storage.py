@@ -0,0 +1,121 @@
+import logging
+import os
+import uuid
+from datetime import datetime
+from sqlalchemy import update, delete
+from app.models import StoredFile
+
+log = logging.getLogger(__name__)
+
+# --- PENYIMPANAN UPLOAD BERDASARKAN ISI (CONTENT-ADDRESSED) ---
+# Nama file = sha256 isi file, disebar ke subfolder 2 level:
+#   uploads/ab/cd/abcd1234....jpg
+# Gambar yang sama di-upload berkali-kali hanya disimpan sekali.
+# Jumlah pemakainya dicatat di tabel stored_files (ref_count). Keduanya menunggu commit:
+#   - file upload baru dipindah dari .tmp ke lokasi final setelah referensinya commit
+#     (rollback -> file sementara dibuang, tidak ada file yatim di folder uploads)
+#   - file fisik dihapus setelah referensi terakhirnya hilang dan transaksinya commit
+
+TEMP_DIR = '.tmp'
+
+def content_path(digest, ext):
+    return f"{digest[:2]}/{digest[2:4]}/{digest}{ext}"
+
+def open_temp_file(upload_dir):
+    """File sementara di filesystem yang sama supaya os.replace() atomik"""
+    temp_dir = os.path.join(upload_dir, TEMP_DIR)
+    os.makedirs(temp_dir, exist_ok=True)
+    temp_path = os.path.join(temp_dir, f"{uuid.uuid4().hex}.part")
+    return temp_path, open(temp_path, 'wb')
+
+def _add_reference(session, path, size):
+    # INSERT ... ON CONFLICT DO UPDATE (sintaks sama di Postgres & SQLite)
+    if session.get_bind().dialect.name == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+    session.execute(
+        insert(StoredFile).values(
+            path=path, ref_count=1, size=size, created_at=datetime.utcnow()
+        ).on_conflict_do_update(
+            index_elements=['path'],
+            set_={'ref_count': StoredFile.ref_count + 1}
+        )
+    )
+
+def commit_file(session, digest, ext, size):
+    """
+    Tambah ref_count untuk isi file ini dan return path-nya. File belum dipindah:
+    panggil publish_file() SETELAH transaksi session commit.
+    """
+    path = content_path(digest, ext)
+    # Baris stored_files terkunci sampai request commit, jadi purge_unreferenced()
+    # di request lain menunggu dan tidak menghapus file yang baru saja dipakai lagi.
+    _add_reference(session, path, size)
+    return path
+
+def publish_file(upload_dir, temp_path, path):
+    """
+    Pindahkan file sementara ke lokasi final (setelah commit).
+    Return True jika file baru, False jika isi yang sama sudah ada (dedup).
+    """
+    final_path = os.path.join(upload_dir, path)
+    if os.path.exists(final_path):
+        os.remove(temp_path)
+        return False
+    os.makedirs(os.path.dirname(final_path), exist_ok=True)
+    os.replace(temp_path, final_path)
+    return True
+
+def discard_temp_file(temp_path):
+    if os.path.exists(temp_path):
+        os.remove(temp_path)
+
+def release_file(session, path):
+    """
+    Kurangi ref_count. Return True jika tidak ada lagi yang memakai file ini
+    (file lama tanpa baris stored_files juga dianggap tidak terpakai).
+    """
+    remaining = session.execute(
+        update(StoredFile)
+        .where(StoredFile.path == path)
+        .values(ref_count=StoredFile.ref_count - 1)
+        .returning(StoredFile.ref_count)
+        .execution_options(synchronize_session=False)
+    ).scalar()
+    return remaining is None or remaining <= 0
+
+def purge_unreferenced(dbmaker, upload_dir, path, filenames):
+    """
+    Dipanggil setelah commit: hapus file fisik (+ variannya) jika ref_count masih 0.
+    Baris dikunci selama unlink supaya upload isi yang sama menunggu lalu menulis ulang file.
+    """
+    session = dbmaker()
+    try:
+        # Kunci lewat UPDATE tanpa perubahan, bukan SELECT ... FOR UPDATE: SQLite mengabaikan
+        # FOR UPDATE, sedangkan UPDATE di SQLite mengambil write lock database (upload lain
+        # menunggu sampai purge commit) dan di Postgres mengunci barisnya.
+        ref_count = session.execute(
+            update(StoredFile)
+            .where(StoredFile.path == path)
+            .values(ref_count=StoredFile.ref_count)
+            .returning(StoredFile.ref_count)
+            .execution_options(synchronize_session=False)
+        ).scalar()
+        if ref_count is not None and ref_count > 0:
+            session.rollback()
+            return False
+        for name in filenames:
+            file_path = os.path.join(upload_dir, name)
+            if os.path.exists(file_path):
+                os.remove(file_path)
+        if ref_count is not None:
+            session.execute(delete(StoredFile).where(StoredFile.path == path, StoredFile.ref_count <= 0))
+        session.commit()
+        return True
+    except Exception:
+        session.rollback()
+        log.exception('Failed to purge stored file %s', path)
+        return False
+    finally:
+        session.close()
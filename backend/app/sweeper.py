@@ -0,0 +1,183 @@
+import logging
+import sys
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pyramid.settings import asbool
+from sqlalchemy import update, select, bindparam
+from app.models import Event, Booking
+from app.reservations import release_capacity
+from app.sales import record_sales
+from app.cache import discard_event_entries
+
+log = logging.getLogger(__name__)
+
+# --- PEMBERSIH BOOKING PENDING YANG TIDAK DIBAYAR ---
+# Booking berstatus "pending" yang melewati batas waktu bayar (payment hold)
+# diubah jadi "expired" dan jumlah tiketnya dikembalikan ke stok event.
+
+def get_payment_hold(settings):
+    return timedelta(minutes=float(settings.get('bookings.payment_hold_minutes', 15)))
+
+def payment_deadline(booking_date, settings):
+    return booking_date + get_payment_hold(settings)
+
+def _release_plain(session, plain, shard_counts):
+    if not plain:
+        return
+    # Bersyarat inventory_shards = 0 (lihat reservations.py): event yang baru saja
+    # di-shard tidak boleh menerima stok di events.capacity
+    result = session.connection().execute(
+        update(Event.__table__)
+        .where(Event.__table__.c.id == bindparam('eid'), Event.__table__.c.inventory_shards == 0)
+        .values(capacity=Event.__table__.c.capacity + bindparam('qty')),
+        plain
+    )
+    if result.rowcount != len(plain):
+        # Baris event yang sudah di-UPDATE terkunci sampai commit, jadi event yang
+        # sekarang ber-shard adalah yang terlewat -> kembalikan ke shard-nya
+        for event_id, shard_count in session.execute(
+            select(Event.id, Event.inventory_shards)
+            .where(Event.id.in_([row['eid'] for row in plain]), Event.inventory_shards > 0)
+        ).all():
+            shard_counts[event_id] = shard_count
+            quantity = next(row['qty'] for row in plain if row['eid'] == event_id)
+            release_capacity(session, event_id, quantity, shard_count)
+
+def expire_pending_bookings(session, hold, batch_size=500, now=None):
+    """
+    Expire satu batch booking pending yang kadaluarsa dan kembalikan stoknya.
+    Return dict {event_id: jumlah_tiket_dikembalikan}. Caller yang commit.
+    """
+    cutoff = (now or datetime.utcnow()) - hold
+
+    # Pakai index (status, booking_date). SKIP LOCKED (Postgres) supaya beberapa
+    # sweeper bisa jalan bersamaan tanpa saling menunggu.
+    expired_ids = (
+        select(Booking.id)
+        .where(Booking.status == 'pending', Booking.booking_date < cutoff)
+        .order_by(Booking.booking_date)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    # Syarat status='pending' diulang + RETURNING: hanya booking yang benar-benar
+    # kita ubah yang stoknya dikembalikan (aman jika user membayar bersamaan)
+    rows = session.execute(
+        update(Booking)
+        .where(Booking.id.in_(expired_ids), Booking.status == 'pending')
+        .values(status='expired')
+        .returning(Booking.event_id, Booking.quantity, Booking.booking_date, Booking.total_price)
+        .execution_options(synchronize_session=False)
+    ).all()
+
+    released = defaultdict(int)
+    for event_id, quantity, _, _ in rows:
+        released[event_id] += quantity
+    if not released:
+        return {}
+    # Urut per event_id: urutan kunci baris sama dengan group booking (reserve_group_capacity)
+    released = dict(sorted(released.items()))
+
+    shard_counts = dict(session.execute(
+        select(Event.id, Event.inventory_shards).where(Event.id.in_(list(released)))
+    ).all())
+
+    # Event biasa: UPDATE massal (executemany) per deretan event tanpa shard. Event ber-shard
+    # di antaranya dikembalikan di tempatnya, jadi urutan kunci tetap menurut event_id.
+    plain = []
+    for event_id, quantity in released.items():
+        if shard_counts.get(event_id):
+            _release_plain(session, plain, shard_counts)
+            plain = []
+            release_capacity(session, event_id, quantity, shard_counts[event_id])
+        else:
+            plain.append({'eid': event_id, 'qty': quantity})
+    _release_plain(session, plain, shard_counts)
+
+    # Rollup penjualan (app/sales.py): tiket pending -> expired
+    record_sales(session, 'expired', [
+        (event_id, booking_date, quantity, total_price)
+        for event_id, quantity, booking_date, total_price in rows
+    ], shard_counts)
+
+    return dict(released)
+
+def sweep(dbmaker, settings, on_released=None):
+    """Jalankan batch berulang sampai tidak ada lagi booking yang kadaluarsa"""
+    hold = get_payment_hold(settings)
+    batch_size = int(settings.get('bookings.sweeper.batch_size', 500))
+    total = 0
+    while True:
+        session = dbmaker()
+        try:
+            released = expire_pending_bookings(session, hold, batch_size)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+        if not released:
+            return total
+        total += sum(released.values())
+        if on_released:
+            on_released(released)
+
+class BookingSweeper(threading.Thread):
+    """Thread background yang menjalankan sweep() setiap `interval` detik"""
+
+    def __init__(self, dbmaker, settings, on_released=None):
+        super().__init__(name='booking-sweeper', daemon=True)
+        self.dbmaker = dbmaker
+        self.settings = settings
+        self.on_released = on_released
+        self.interval = float(settings.get('bookings.sweeper.interval', 60))
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                released = sweep(self.dbmaker, self.settings, self.on_released)
+                if released:
+                    log.info('Released %s tickets from expired bookings', released)
+            except Exception:
+                log.exception('Booking sweeper failed')
+
+    def stop(self):
+        self._stop_event.set()
+
+def start_sweeper_thread(registry):
+    settings = registry.settings
+    if not asbool(settings.get('bookings.sweeper.enabled', False)):
+        return None
+
+    def on_released(released):
+        # Sisa kapasitas berubah -> aturan invalidasi sama dengan booking dari view
+        discard_event_entries(registry.event_cache, released)
+
+    sweeper = BookingSweeper(registry.dbmaker, settings, on_released)
+    sweeper.start()
+    return sweeper
+
+# --- CONSOLE SCRIPT ---
+# Contoh (cron): expire_bookings development.ini
+
+def main(argv=sys.argv):
+    from pyramid.paster import get_appsettings, setup_logging
+    from sqlalchemy import engine_from_config
+    from sqlalchemy.orm import sessionmaker
+    from app import _apply_database_url
+
+    if len(argv) < 2:
+        print(f'usage: {argv[0]} <config_uri>')
+        return 1
+    config_uri = argv[1]
+    setup_logging(config_uri)
+    settings = dict(get_appsettings(config_uri))
+    _apply_database_url(settings)
+    engine = engine_from_config(settings, 'sqlalchemy.')
+
+    released = sweep(sessionmaker(bind=engine), settings)
+    print(f'Expired bookings processed. Tickets released: {released}')
+    return 0
@@ -1,6 +1,8 @@
 from pyramid.view import view_config
 from app.models import User
-from app.security import check_password, hash_password, create_token, verify_token
+from app.security import create_token, verify_token
+from app.hashing import HashingBusy
+from app.serializers import Projection
 from datetime import datetime, timedelta
 import random
 import string
@@ -52,7 +54,7 @@ def register(request):
         new_user = User(
             name=data['name'],
             email=email_input,
-            password=hash_password(data['password']),
+            password=request.registry.password_hasher.hash(data['password']),
             role=default_role # Selalu 'user'
         )
         
@@ -65,6 +67,10 @@ def register(request):
             'role': default_role
         }
 
+    except HashingBusy:
+        request.response.status = 503
+        request.response.headers['Retry-After'] = '2'
+        return {'message': 'Server is busy, please try again in a moment'}
     except Exception as e:
         request.response.status = 500
         return {'error': str(e)}
@@ -90,7 +96,11 @@ def login(request):
             )
         ).first()
         
-        if user and check_password(data['password'], user.password):
+        hasher = request.registry.password_hasher
+        if user and hasher.check(data['password'], user.password):
+            # Cost bcrypt di DB beda dengan setting sekarang -> hash ulang diam-diam
+            if hasher.needs_rehash(user.password):
+                user.password = hasher.hash(data['password'])
             token = create_token(user.id, user.role)
             return {
                 'message': 'Login success',
@@ -102,6 +112,10 @@ def login(request):
         
         request.response.status = 401
         return {'message': 'Invalid username/email or password'}
+    except HashingBusy:
+        request.response.status = 503
+        request.response.headers['Retry-After'] = '2'
+        return {'message': 'Server is busy, please try again in a moment'}
     except Exception as e:
         request.response.status = 500
         return {'error': str(e)}
@@ -160,7 +174,7 @@ def reset_password(request):
             request.response.status = 400
             return {'message': 'Token has expired. Please request a new one.'}
             
-        user.password = hash_password(new_password)
+        user.password = request.registry.password_hasher.hash(new_password)
         user.reset_token = None
         user.reset_token_expiry = None
         
@@ -168,12 +182,25 @@ def reset_password(request):
         
         return {'message': 'Password has been reset successfully. Please login.'}
 
+    except HashingBusy:
+        request.response.status = 503
+        request.response.headers['Retry-After'] = '2'
+        return {'message': 'Server is busy, please try again in a moment'}
     except Exception as e:
         request.response.status = 500
         return {'error': str(e)}
 
 # --- ADMIN USER LIST ---
 
+# Dipakai juga oleh superadmin.py. Hanya kolom ini yang di-SELECT (tanpa hash password).
+USER_LIST = Projection('user_list', [
+    ('id', User.id),
+    ('name', User.name),
+    ('email', User.email),
+    ('role', User.role),
+    ('created_at', User.created_at),
+])
+
 @view_config(route_name='users_list', renderer='json', request_method='GET')
 def get_all_users(request):
     try:
@@ -188,14 +215,8 @@ def get_all_users(request):
             request.response.status = 403
             return {'message': 'Access Denied: Only Admins can view user list'}
 
-        users = request.dbsession.query(User).all()
-        return [{
-            'id': u.id,
-            'name': u.name,
-            'email': u.email,
-            'role': u.role,
-            'created_at': u.created_at.isoformat() if u.created_at else None
-        } for u in users]
+        users = USER_LIST.query(request.dbsession).all()
+        return USER_LIST.response(users)
 
     except Exception as e:
         request.response.status = 500
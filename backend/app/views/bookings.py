@@ -2,9 +2,38 @@ from pyramid.view import view_config
 from app.models import User, Event, Booking 
 from app.views.auth import get_user_from_request
 from app.email_utils import send_booking_confirmation
+from app.cache import invalidate_event_cache
+from app.reservations import reserve_capacity, remaining_capacity, reserve_group_capacity
+from app.ids import generate_id, generate_booking_code
+from app.sweeper import get_payment_hold, payment_deadline
+from app.exports import EXPORT_FORMATS, stream_query
+from app.serializers import Projection
+from app.sales import record_sales
 from datetime import datetime
+from sqlalchemy import update, select, insert
+from pyramid.response import Response
+from sqlalchemy.orm import joinedload
 import random
 
+# Kolom list booking admin (Event / User dari outer join -> "Unknown" jika sudah dihapus)
+ADMIN_BOOKING_LIST = Projection('admin_booking_list', [
+    ('booking_id', Booking.id),
+    ('booking_code', Booking.booking_code),
+    ('event_title', Event.title, 'Unknown'),
+    ('attendee_name', User.name, 'Unknown'),
+    ('status', Booking.status),
+    ('total_price', Booking.total_price),
+    ('payment_method', Booking.payment_method),
+])
+
+def _generate_payment_details(payment_method):
+    if payment_method == 'qris':
+        # Link QR Code Dummy
+        return "https://upload.wikimedia.org/wikipedia/commons/d/d0/QR_code_for_mobile_English_Wikipedia.svg"
+    # Generate Virtual Account Palsu (8801 + Angka Acak)
+    random_digits = ''.join(["{}".format(random.randint(0, 9)) for num in range(0, 10)])
+    return f"8801{random_digits}"
+
 # --- TAHAP 1: BOOKING AWAL (STATUS PENDING) ---
 # Di sini kita CUMA simpan data & generate info pembayaran.
 # JANGAN kirim email tiket di sini.
@@ -22,28 +51,26 @@ def create_booking(request):
         whatsapp = data.get('whatsapp', '-') 
         payment_method = data.get('payment_method', 'qris') 
 
+        if quantity < 1:
+            request.response.status = 400
+            return {'message': 'Quantity must be at least 1'}
+
         # 1. Validasi Event & Stok
         event = request.dbsession.query(Event).get(event_id)
         if not event:
             request.response.status = 404
             return {'message': 'Event not found'}
 
-        if event.capacity < quantity:
+        # Potong stok secara atomik (UPDATE bersyarat) -> aman dari oversell saat war tiket
+        if not reserve_capacity(request.dbsession, event, quantity):
             request.response.status = 400
-            return {'message': f'Not enough tickets. Only {event.capacity} left.'}
+            left = remaining_capacity(request.dbsession, event)
+            return {'message': f'Not enough tickets. Only {left} left.'}
 
         total_price = event.ticket_price * quantity
 
         # 2. GENERATE INFO PEMBAYARAN DUMMY
-        payment_details = ""
-        
-        if payment_method == 'qris':
-            # Link QR Code Dummy
-            payment_details = "https://upload.wikimedia.org/wikipedia/commons/d/d0/QR_code_for_mobile_English_Wikipedia.svg"
-        else:
-            # Generate Virtual Account Palsu (8801 + Angka Acak)
-            random_digits = ''.join(["{}".format(random.randint(0, 9)) for num in range(0, 10)])
-            payment_details = f"8801{random_digits}"
+        payment_details = _generate_payment_details(payment_method)
 
         # 3. SIMPAN KE DB (STATUS: PENDING)
         new_booking = Booking(
@@ -57,15 +84,20 @@ def create_booking(request):
             payment_details=payment_details
         )
 
-        event.capacity -= quantity
         request.dbsession.add(new_booking)
         request.dbsession.flush()
+        record_sales(request.dbsession, 'created',
+                     [(event.id, new_booking.booking_date, quantity, total_price)],
+                     {event.id: event.inventory_shards})
+        # Sisa kapasitas berubah -> detail event di cache sudah basi
+        invalidate_event_cache(request, event.id)
 
         # 4. RETURN INFO KE FRONTEND (Agar Frontend bisa redirect ke Page Pembayaran)
         return {
             'message': 'Booking created. Waiting for payment.',
             'booking_id': new_booking.id,
             'status': 'pending',
+            'pay_before': payment_deadline(new_booking.booking_date, request.registry.settings).isoformat(),
             'payment_info': {
                 'method': payment_method,
                 'details': payment_details, # Frontend akan menampilkan Gambar QR atau Nomor VA ini
@@ -89,7 +121,10 @@ def pay_booking(request):
 
         # Ambil ID Booking dari URL
         booking_id = request.matchdict['id']
-        booking = request.dbsession.query(Booking).get(booking_id)
+        # Event & attendee dibutuhkan untuk email -> load sekaligus (1 query)
+        booking = request.dbsession.query(Booking)\
+            .options(joinedload(Booking.event), joinedload(Booking.attendee))\
+            .filter(Booking.id == booking_id).first()
 
         if not booking:
             request.response.status = 404
@@ -105,8 +140,21 @@ def pay_booking(request):
             return {'message': 'Booking already paid'}
 
         # 1. UPDATE STATUS JADI CONFIRMED
-        booking.status = 'confirmed'
-        request.dbsession.flush()
+        # Bersyarat: hanya jika masih pending & belum lewat batas bayar,
+        # supaya tidak bentrok dengan sweeper yang sudah mengembalikan stoknya.
+        cutoff = datetime.utcnow() - get_payment_hold(request.registry.settings)
+        result = request.dbsession.execute(
+            update(Booking)
+            .where(Booking.id == booking.id, Booking.status == 'pending', Booking.booking_date >= cutoff)
+            .values(status='confirmed')
+            .execution_options(synchronize_session='fetch')
+        )
+        if result.rowcount != 1:
+            request.response.status = 410
+            return {'message': 'Booking has expired. Please book again.'}
+        record_sales(request.dbsession, 'confirmed',
+                     [(booking.event_id, booking.booking_date, booking.quantity, booking.total_price)],
+                     {booking.event_id: booking.event.inventory_shards if booking.event else 0})
 
         # 2. BARU KIRIM EMAIL TIKET DI SINI!
         attendee = booking.attendee
@@ -133,6 +181,186 @@ def pay_booking(request):
         return {'error': str(e)}
 
 
+# --- GROUP BOOKING (PAKET FESTIVAL: BEBERAPA EVENT SEKALIGUS) ---
+# Semua event dipesan dalam satu transaksi: stok dipotong per event (urut event_id),
+# jika salah satu kurang -> seluruh transaksi di-rollback (tidak ada booking setengah jadi).
+# Semua booking masuk dengan satu INSERT batch dan dibayar sekali lewat group_id.
+
+def _parse_group_items(data, max_events):
+    """Return {event_id: quantity}; event yang sama digabung"""
+    items = data.get('items')
+    if not isinstance(items, list) or not items:
+        raise ValueError("items must be a non-empty list of {event_id, quantity}")
+    quantities = {}
+    for item in items:
+        if not isinstance(item, dict) or not item.get('event_id'):
+            raise ValueError("Each item needs an event_id")
+        quantity = int(item.get('quantity', 1))
+        if quantity < 1:
+            raise ValueError("Quantity must be at least 1")
+        event_id = str(item['event_id'])
+        quantities[event_id] = quantities.get(event_id, 0) + quantity
+    if len(quantities) > max_events:
+        raise ValueError(f"A group booking can contain at most {max_events} events")
+    return quantities
+
+@view_config(route_name='group_bookings', renderer='json', request_method='POST')
+def create_group_booking(request):
+    try:
+        user_data, error = get_user_from_request(request)
+        if error: return {'message': error}
+
+        data = request.json_body
+        max_events = int(request.registry.settings.get('bookings.group.max_events', 10))
+        try:
+            quantities = _parse_group_items(data, max_events)
+        except (ValueError, TypeError) as e:
+            request.response.status = 400
+            return {'message': str(e)}
+        whatsapp = data.get('whatsapp', '-')
+        payment_method = data.get('payment_method', 'qris')
+
+        # 1. Semua event diambil dengan satu query
+        events = request.dbsession.query(Event)\
+            .filter(Event.id.in_(list(quantities)))\
+            .order_by(Event.id).all()
+        missing = sorted(set(quantities) - {e.id for e in events})
+        if missing:
+            request.response.status = 404
+            return {'message': 'Event not found', 'event_ids': missing}
+
+        # 2. Potong stok semua event (urut event_id) -> semua atau tidak sama sekali
+        items = [(event, quantities[event.id]) for event in events]
+        short = reserve_group_capacity(request.dbsession, items)
+        if short is not None:
+            request.dbsession.rollback()
+            request.response.status = 400
+            left = remaining_capacity(request.dbsession, short)
+            return {
+                'message': f'Not enough tickets for {short.title}. Only {left} left.',
+                'event_id': short.id
+            }
+
+        # 3. Semua booking dalam satu INSERT batch, info pembayaran satu untuk total
+        group_id = generate_id()
+        booking_date = datetime.utcnow()
+        payment_details = _generate_payment_details(payment_method)
+        rows = [{
+            'id': generate_id(),
+            'booking_code': generate_booking_code(),
+            'group_id': group_id,
+            'event_id': event.id,
+            'attendee_id': user_data['sub'],
+            'quantity': quantity,
+            'total_price': event.ticket_price * quantity,
+            'status': 'pending',
+            'whatsapp': whatsapp,
+            'payment_method': payment_method,
+            'payment_details': payment_details,
+            'booking_date': booking_date
+        } for event, quantity in items]
+        request.dbsession.execute(insert(Booking.__table__), rows)
+        record_sales(request.dbsession, 'created',
+                     [(row['event_id'], booking_date, row['quantity'], row['total_price']) for row in rows],
+                     {event.id: event.inventory_shards for event, _ in items})
+
+        for event, _ in items:
+            invalidate_event_cache(request, event.id)
+
+        titles = {event.id: event.title for event, _ in items}
+        total_price = sum(row['total_price'] for row in rows)
+        return {
+            'message': 'Group booking created. Waiting for payment.',
+            'group_id': group_id,
+            'status': 'pending',
+            'pay_before': payment_deadline(booking_date, request.registry.settings).isoformat(),
+            'bookings': [{
+                'booking_id': row['id'],
+                'booking_code': row['booking_code'],
+                'event_id': row['event_id'],
+                'event_title': titles[row['event_id']],
+                'quantity': row['quantity'],
+                'total_price': row['total_price']
+            } for row in rows],
+            'payment_info': {
+                'method': payment_method,
+                'details': payment_details,
+                'total_price': total_price
+            }
+        }
+
+    except Exception as e:
+        request.dbsession.rollback()
+        request.response.status = 500
+        return {'error': str(e)}
+
+@view_config(route_name='pay_group_booking', renderer='json', request_method='POST')
+def pay_group_booking(request):
+    try:
+        user_data, error = get_user_from_request(request)
+        if error: return {'message': error}
+
+        group_id = request.matchdict['group_id']
+        bookings = request.dbsession.query(Booking)\
+            .options(joinedload(Booking.event), joinedload(Booking.attendee))\
+            .filter(Booking.group_id == group_id)\
+            .order_by(Booking.event_id).all()
+
+        if not bookings:
+            request.response.status = 404
+            return {'message': 'Group booking not found'}
+        if any(b.attendee_id != user_data['sub'] for b in bookings):
+            request.response.status = 403
+            return {'message': 'Forbidden'}
+
+        pending = [b for b in bookings if b.status == 'pending']
+        if not pending:
+            return {'message': 'Group booking already paid'}
+        if any(b.status == 'expired' for b in bookings):
+            request.response.status = 410
+            return {'message': 'Group booking has expired. Please book again.'}
+
+        # Semua booking pending di group harus terkonfirmasi bersamaan
+        cutoff = datetime.utcnow() - get_payment_hold(request.registry.settings)
+        result = request.dbsession.execute(
+            update(Booking)
+            .where(Booking.group_id == group_id, Booking.status == 'pending', Booking.booking_date >= cutoff)
+            .values(status='confirmed')
+            .execution_options(synchronize_session='fetch')
+        )
+        if result.rowcount != len(pending):
+            request.dbsession.rollback()
+            request.response.status = 410
+            return {'message': 'Group booking has expired. Please book again.'}
+        record_sales(request.dbsession, 'confirmed',
+                     [(b.event_id, b.booking_date, b.quantity, b.total_price) for b in pending],
+                     {b.event_id: b.event.inventory_shards for b in pending if b.event})
+
+        for booking in pending:
+            attendee = booking.attendee
+            if attendee and attendee.email:
+                send_booking_confirmation(
+                    to_email=attendee.email,
+                    user_name=attendee.name,
+                    event_title=booking.event.title,
+                    booking_code=booking.booking_code,
+                    quantity=booking.quantity,
+                    total_price=booking.total_price
+                )
+
+        return {
+            'message': 'Payment confirmed! Tickets sent to email.',
+            'status': 'confirmed',
+            'group_id': group_id,
+            'booking_codes': [b.booking_code for b in bookings]
+        }
+
+    except Exception as e:
+        request.dbsession.rollback()
+        request.response.status = 500
+        return {'error': str(e)}
+
+
 # --- HISTORY (VIEW BOOKINGS) ---
 @view_config(route_name='my_bookings', renderer='json', request_method='GET')
 def get_my_bookings(request):
@@ -140,8 +368,14 @@ def get_my_bookings(request):
         user_data, error = get_user_from_request(request)
         if error: return {'message': error}
 
-        my_bookings = request.dbsession.query(Booking)\
-            .filter_by(attendee_id=user_data['sub'])\
+        # Satu query JOIN (bukan lazy-load b.event per booking -> N+1)
+        my_bookings = request.dbsession.query(
+                Booking.id, Booking.booking_code, Booking.quantity, Booking.total_price,
+                Booking.status, Booking.booking_date, Booking.payment_method, Booking.payment_details,
+                Event.title.label('event_title'), Event.date.label('event_date')
+            )\
+            .outerjoin(Event, Booking.event_id == Event.id)\
+            .filter(Booking.attendee_id == user_data['sub'])\
             .order_by(Booking.booking_date.desc()).all()
 
         results = []
@@ -149,8 +383,8 @@ def get_my_bookings(request):
             results.append({
                 'id': b.id,
                 'booking_code': b.booking_code,
-                'event_title': b.event.title if b.event else "Unknown",
-                'event_date': b.event.date.isoformat() if b.event else None,
+                'event_title': b.event_title if b.event_title is not None else "Unknown",
+                'event_date': b.event_date.isoformat() if b.event_date else None,
                 'quantity': b.quantity,
                 'total_price': b.total_price,
                 'status': b.status,   # Frontend pakai ini untuk bedakan warna (Kuning/Hijau)
@@ -174,20 +408,59 @@ def get_all_bookings(request):
         if error: return {'message': error}
         if user_data['role'] != 'admin': return {'message': 'Forbidden'}
 
-        bookings = request.dbsession.query(Booking).order_by(Booking.booking_date.desc()).all()
-        results = []
-        for b in bookings:
-            results.append({
-                'booking_id': b.id,
-                'booking_code': b.booking_code,
-                'event_title': b.event.title if b.event else "Unknown",
-                'attendee_name': b.attendee.name if b.attendee else "Unknown",
-                'status': b.status,
-                'total_price': b.total_price,
-                'payment_method': b.payment_method
-            })
-        return results
+        # Ambil kolom yang dibutuhkan saja lewat JOIN -> jumlah query tetap 1
+        bookings = ADMIN_BOOKING_LIST.query(request.dbsession)\
+            .outerjoin(Event, Booking.event_id == Event.id)\
+            .outerjoin(User, Booking.attendee_id == User.id)\
+            .order_by(Booking.booking_date.desc()).all()
+        return ADMIN_BOOKING_LIST.response(bookings)
+
+    except Exception as e:
+        request.response.status = 500
+        return {'error': str(e)}
+
+# --- ADMIN EXPORT (CSV / NDJSON, STREAMING) ---
+# Contoh: GET /api/admin/bookings/export?format=csv&event_id=AB12&status=confirmed
+@view_config(route_name='export_bookings', renderer='json', request_method='GET')
+def export_bookings(request):
+    try:
+        user_data, error = get_user_from_request(request)
+        if error: return {'message': error}
+        if user_data['role'] not in ['admin', 'superadmin']: return {'message': 'Forbidden'}
+
+        fmt = request.params.get('format', 'csv')
+        if fmt not in EXPORT_FORMATS:
+            request.response.status = 400
+            return {'message': 'Invalid format. Use "csv" or "ndjson".'}
+
+        columns = [
+            'booking_id', 'booking_code', 'event_id', 'event_title',
+            'attendee_id', 'attendee_name', 'attendee_email', 'whatsapp',
+            'quantity', 'total_price', 'status', 'payment_method', 'booking_date'
+        ]
+        statement = select(
+                Booking.id, Booking.booking_code, Booking.event_id, Event.title,
+                Booking.attendee_id, User.name, User.email, Booking.whatsapp,
+                Booking.quantity, Booking.total_price, Booking.status,
+                Booking.payment_method, Booking.booking_date
+            )\
+            .outerjoin(Event, Booking.event_id == Event.id)\
+            .outerjoin(User, Booking.attendee_id == User.id)\
+            .order_by(Booking.booking_date, Booking.id)
+
+        if request.params.get('event_id'):
+            statement = statement.where(Booking.event_id == request.params['event_id'])
+        if request.params.get('status'):
+            statement = statement.where(Booking.status == request.params['status'])
+
+        filename = f"bookings-{request.params.get('event_id', 'all')}.{fmt}"
+        return Response(
+            app_iter=stream_query(request.registry.db_router.read_session, statement, columns, fmt),
+            content_type=EXPORT_FORMATS[fmt],
+            charset='utf-8',
+            content_disposition=f'attachment; filename="{filename}"'
+        )
 
     except Exception as e:
         request.response.status = 500
-        return {'error': str(e)}
\ No newline at end of file
+        return {'error': str(e)}
@@ -0,0 +1,64 @@
+from pyramid.view import view_config
+from sqlalchemy import select
+from app.models import User, Event, Booking
+from app.views.auth import get_user_from_request
+from app.email_utils import broadcast_to_attendees, get_broadcast_job
+
+# --- BROADCAST EMAIL KE SEMUA ATTENDEE EVENT (ADMIN) ---
+# POST /api/events/{id}/broadcast -> 202 + job_id, email dikirim di background
+# GET  /api/admin/broadcasts/{job_id} -> progress pengiriman
+
+@view_config(route_name='event_broadcast', renderer='json', request_method='POST')
+def create_broadcast(request):
+    try:
+        user_data, error = get_user_from_request(request)
+        if error: return {'message': error}
+        if user_data['role'] not in ['admin', 'superadmin']: return {'message': 'Forbidden'}
+
+        event = request.dbsession.get(Event, request.matchdict['id'])
+        if not event:
+            request.response.status = 404
+            return {'message': 'Event not found'}
+
+        data = request.json_body
+        subject = (data.get('subject') or '').strip()
+        message = (data.get('message') or '').strip()
+        if not subject or not message:
+            request.response.status = 400
+            return {'message': 'Subject and message are required'}
+
+        # Satu email per attendee walaupun dia punya beberapa booking di event ini
+        recipients = request.dbsession.execute(
+            select(User.email, User.name)
+            .join(Booking, Booking.attendee_id == User.id)
+            .where(Booking.event_id == event.id, Booking.status == 'confirmed')
+            .distinct()
+        ).all()
+        recipients = [(email, name) for email, name in recipients]
+
+        batch_size = int(request.registry.settings.get('mail.broadcast_batch_size', 50))
+        job = broadcast_to_attendees(event.id, event.title, recipients, subject, message, batch_size)
+
+        request.response.status = 202
+        return {'message': 'Broadcast queued', **job.to_dict()}
+
+    except Exception as e:
+        request.response.status = 500
+        return {'error': str(e)}
+
+@view_config(route_name='broadcast_status', renderer='json', request_method='GET')
+def get_broadcast_status(request):
+    try:
+        user_data, error = get_user_from_request(request)
+        if error: return {'message': error}
+        if user_data['role'] not in ['admin', 'superadmin']: return {'message': 'Forbidden'}
+
+        job = get_broadcast_job(request.matchdict['job_id'])
+        if not job:
+            request.response.status = 404
+            return {'message': 'Broadcast job not found'}
+        return job.to_dict()
+
+    except Exception as e:
+        request.response.status = 500
+        return {'error': str(e)}
@@ -1,30 +1,152 @@
 from pyramid.view import view_config
 from datetime import datetime
+import json
 from app.models import User, Event
 from app.views.auth import get_user_from_request
 
 # --- IMPORT BARU (Mengambil fungsi dari file_utils.py) ---
-from app.file_utils import save_uploaded_file, delete_image_file, get_image_url
+from app.file_utils import save_uploaded_file, delete_image_file, get_image_url, UploadError
+from app.pagination import parse_limit, apply_keyset, encode_cursor
+from app.reservations import set_total_capacity, shard_inventory, remaining_capacity, remaining_capacity_column
+from app.cache import invalidate_event_cache, build_json_entry, conditional_json_response
+from app.serializers import Projection
+from app.imports import EventImporter, ImportFormatError, open_import_records, parse_event_date
+from app.search import query_terms, index_events, unindex_events
 # --------------------------------------------------------
 
+# --- HELPER ---
+
+def serialize_event(request, e, image_variant='card', capacity=None):
+    # capacity: sisa stok pasti (remaining_capacity), events.capacity event yang di-shard
+    # hanya disinkron berkala
+    return {
+        'id': e.id,
+        'title': e.title,
+        # Fungsi get_image_url sekarang diambil dari file_utils.py
+        # List pakai varian 'card', detail pakai 'full' (bukan file asli)
+        'image_url': get_image_url(request, e.image_filename, image_variant),
+        'description': e.description,
+        'date': e.date.isoformat(),
+        'location': e.location,
+        'capacity': e.capacity if capacity is None else capacity,
+        'ticket_price': e.ticket_price,
+        'organizer_id': e.organizer_id
+    }
+
+# Kolom untuk list katalog (tanpa description: hanya ditampilkan di halaman detail)
+EVENT_LIST = Projection('event_list', [
+    ('id', Event.id),
+    ('title', Event.title),
+    ('image_url', Event.image_filename),
+    ('date', Event.date),
+    ('location', Event.location),
+    # Event yang di-shard: jumlah shard (events.capacity hanya disinkron berkala)
+    ('capacity', remaining_capacity_column()),
+    ('ticket_price', Event.ticket_price),
+    ('organizer_id', Event.organizer_id),
+], computed=('image_url',))
+
+def _parse_date_param(raw_date):
+    # Terima "YYYY-MM-DD" maupun ISO lengkap "YYYY-MM-DDTHH:MM:SS"
+    return datetime.fromisoformat(raw_date.strip().replace(' ', 'T'))
+
+def _apply_event_filters(query, params):
+    # ?upcoming=1 -> hanya event yang belum lewat
+    if params.get('upcoming') in ('1', 'true', 'yes'):
+        query = query.filter(Event.date >= datetime.utcnow())
+    if params.get('date_from'):
+        query = query.filter(Event.date >= _parse_date_param(params['date_from']))
+    if params.get('date_to'):
+        query = query.filter(Event.date <= _parse_date_param(params['date_to']))
+    if params.get('location'):
+        query = query.filter(Event.location.ilike(f"%{params['location']}%"))
+    if params.get('min_price'):
+        query = query.filter(Event.ticket_price >= int(params['min_price']))
+    if params.get('max_price'):
+        query = query.filter(Event.ticket_price <= int(params['max_price']))
+    return query
+
 # --- PUBLIC ROUTES (GET) ---
 
 @view_config(route_name='events', renderer='json', request_method='GET')
 def get_events(request):
     try:
-        events = request.dbsession.query(Event).all()
-        return [{
-            'id': e.id,
-            'title': e.title,
-            # Fungsi get_image_url sekarang diambil dari file_utils.py
-            'image_url': get_image_url(request, e.image_filename),
-            'description': e.description,
-            'date': e.date.isoformat(),
-            'location': e.location,
-            'capacity': e.capacity,
-            'ticket_price': e.ticket_price,
-            'organizer_id': e.organizer_id
-        } for e in events]
+        params = request.params
+        cache = request.registry.event_cache
+        cache_key = ('list', request.application_url, tuple(sorted(params.items())))
+        entry = cache.get(cache_key)
+        if entry is not None:
+            return conditional_json_response(request, entry)
+
+        try:
+            limit = parse_limit(params.get('limit'))
+            query = _apply_event_filters(EVENT_LIST.query(request.dbsession), params)
+            query = apply_keyset(query, Event.date, Event.id, params.get('cursor'))
+        except ValueError as e:
+            request.response.status = 400
+            return {'message': f'Invalid query parameter: {e}'}
+
+        # Ambil 1 baris ekstra untuk tahu apakah masih ada halaman berikutnya
+        rows = query.order_by(Event.date.asc(), Event.id.asc()).limit(limit + 1).all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+
+        next_cursor = None
+        if has_more:
+            last = rows[-1]
+            next_cursor = encode_cursor(last.date, last.id)
+
+        # List pakai varian gambar 'card'
+        events_json = EVENT_LIST.encode(rows, image_url=lambda filename: get_image_url(request, filename, 'card'))
+        entry = build_json_entry('{"events":' + events_json + ',"next_cursor":' + json.dumps(next_cursor) + '}')
+        cache.set(cache_key, entry)
+        return conditional_json_response(request, entry)
+    except Exception as e:
+        request.response.status = 500
+        return {'error': str(e)}
+
+# --- PENCARIAN FULL-TEXT (title, description, location; lihat app/search.py) ---
+# ?q=konser jazz -> semua kata harus ada (awalan kata juga cocok: "jaz" -> "jazz"),
+# diurutkan berdasarkan relevansi. Paging pakai offset karena urutannya skor, bukan tanggal.
+# Filter katalog (upcoming, date_from, location, min_price, ...) tetap bisa dipakai.
+@view_config(route_name='event_search', renderer='json', request_method='GET')
+def search_events(request):
+    try:
+        params = request.params
+        terms = query_terms(params.get('q'))
+        if not terms:
+            request.response.status = 400
+            return {'message': 'Query parameter q is required'}
+
+        index = request.registry.search_index
+        if index is None:
+            request.response.status = 501
+            return {'message': 'Full-text search is not available on this database'}
+
+        cache = request.registry.event_cache
+        cache_key = ('search', request.application_url, tuple(sorted(params.items())))
+        entry = cache.get(cache_key)
+        if entry is not None:
+            return conditional_json_response(request, entry)
+
+        try:
+            limit = parse_limit(params.get('limit'))
+            offset = int(params.get('offset') or 0)
+            if offset < 0:
+                raise ValueError("offset must be >= 0")
+            query = _apply_event_filters(EVENT_LIST.query(request.dbsession), params)
+        except ValueError as e:
+            request.response.status = 400
+            return {'message': f'Invalid query parameter: {e}'}
+
+        rows = index.apply(query, terms).offset(offset).limit(limit + 1).all()
+        next_offset = offset + limit if len(rows) > limit else None
+        rows = rows[:limit]
+
+        events_json = EVENT_LIST.encode(rows, image_url=lambda filename: get_image_url(request, filename, 'card'))
+        entry = build_json_entry('{"events":' + events_json + ',"next_offset":' + json.dumps(next_offset) + '}')
+        cache.set(cache_key, entry)
+        return conditional_json_response(request, entry)
     except Exception as e:
         request.response.status = 500
         return {'error': str(e)}
@@ -33,23 +155,22 @@ def get_events(request):
 def get_event_detail(request):
     try:
         event_id = request.matchdict['id']
+        cache = request.registry.event_cache
+        cache_key = ('detail', request.application_url, event_id)
+        entry = cache.get(cache_key)
+        if entry is not None:
+            return conditional_json_response(request, entry)
+
         event = request.dbsession.query(Event).get(event_id)
         
         if not event:
             request.response.status = 404
             return {'message': 'Event not found'}
 
-        return {
-            'id': event.id,
-            'title': event.title,
-            'image_url': get_image_url(request, event.image_filename),
-            'description': event.description,
-            'date': event.date.isoformat(),
-            'location': event.location,
-            'capacity': event.capacity,
-            'ticket_price': event.ticket_price,
-            'organizer_id': event.organizer_id
-        }
+        capacity = remaining_capacity(request.dbsession, event)
+        entry = build_json_entry(serialize_event(request, event, 'full', capacity))
+        cache.set(cache_key, entry)
+        return conditional_json_response(request, entry)
     except Exception as e:
         request.response.status = 500
         return {'error': str(e)}
@@ -68,10 +189,7 @@ def create_event(request):
         data = request.POST 
 
         # --- LOGIKA TANGGAL ---
-        raw_date = data['date']
-        clean_date = raw_date.replace('T', ' ').split('.')[0]
-        if len(clean_date) > 16: clean_date = clean_date[:16]
-        event_date = datetime.strptime(clean_date, '%Y-%m-%d %H:%M')
+        event_date = parse_event_date(data['date'])
 
         # --- LOGIKA UPLOAD GAMBAR ---
         image_filename = None
@@ -94,13 +212,18 @@ def create_event(request):
         
         request.dbsession.add(new_event)
         request.dbsession.flush()
+        index_events(request, [new_event.id], new=True)
+        invalidate_event_cache(request)
         
         return {
             'message': 'Event created successfully', 
             'id': new_event.id,
-            'image_url': get_image_url(request, image_filename)
+            'image_url': get_image_url(request, image_filename, 'full')
         }
 
+    except UploadError as e:
+        request.response.status = e.status
+        return {'message': str(e)}
     except Exception as e:
         # Hapus file jika gagal simpan DB (Fungsi dari file_utils.py)
         if 'image_filename' in locals() and image_filename:
@@ -108,6 +231,56 @@ def create_event(request):
         request.response.status = 500
         return {'error': str(e)}
 
+# --- IMPORT EVENT MASSAL (CSV / NDJSON, lihat app/imports.py) ---
+
+@view_config(route_name='event_import', renderer='json', request_method='POST')
+def import_events(request):
+    try:
+        user_data, error = get_user_from_request(request)
+        if error: return {'message': error}
+        if user_data['role'] not in ['admin', 'superadmin']: return {'message': 'Forbidden'}
+
+        # on_error=abort (default): satu baris salah -> tidak ada yang disimpan
+        # on_error=skip           : baris valid tetap disimpan, baris salah dilaporkan
+        on_error = request.GET.get('on_error', 'abort')
+        if on_error not in ('abort', 'skip'):
+            request.response.status = 400
+            return {'message': "on_error must be 'abort' or 'skip'"}
+
+        settings = request.registry.settings
+        importer = EventImporter(
+            request.dbsession,
+            organizer_id=user_data['sub'],
+            batch_size=int(settings.get('events.import.batch_size', 1000)),
+            max_rows=int(settings.get('events.import.max_rows', 50000)),
+            abort_on_error=(on_error == 'abort'),
+            search_index=request.registry.search_index
+        )
+        fmt, records = open_import_records(request)
+        report = importer.run(records)
+        report['format'] = fmt
+
+        if importer.too_many_rows:
+            request.response.status = 413
+            report['message'] = f"Too many rows. Maximum is {importer.max_rows} per import."
+        elif report['rolled_back']:
+            request.response.status = 422
+            report['message'] = 'Import cancelled: some rows are invalid. Nothing was saved.'
+        else:
+            report['message'] = f"{report['imported']} event(s) imported"
+            if report['imported']:
+                invalidate_event_cache(request)
+        return report
+
+    except ImportFormatError as e:
+        request.dbsession.rollback()
+        request.response.status = 400
+        return {'message': str(e)}
+    except Exception as e:
+        request.dbsession.rollback()
+        request.response.status = 500
+        return {'error': str(e)}
+
 @view_config(route_name='event_detail', renderer='json', request_method='PUT')
 def update_event(request):
     try:
@@ -124,33 +297,40 @@ def update_event(request):
         if 'title' in data: event.title = data['title']
         if 'description' in data: event.description = data['description']
         if 'location' in data: event.location = data['location']
-        if 'capacity' in data: event.capacity = int(data['capacity'])
+        if 'capacity' in data: set_total_capacity(request.dbsession, event, int(data['capacity']))
         if 'ticket_price' in data: event.ticket_price = int(data['ticket_price'])
         
         # --- UPDATE GAMBAR ---
         if 'image' in request.POST and hasattr(request.POST['image'], 'filename'):
              image_input = request.POST['image']
              
+             # Simpan gambar baru dulu (Fungsi dari file_utils.py),
+             # supaya gambar lama tidak hilang jika upload ditolak
+             new_filename = save_uploaded_file(request, image_input)
+
              # Hapus gambar lama (Fungsi dari file_utils.py)
              if event.image_filename:
                  delete_image_file(request, event.image_filename)
-                 
-             # Simpan gambar baru (Fungsi dari file_utils.py)
-             new_filename = save_uploaded_file(request, image_input)
              event.image_filename = new_filename
         # ---------------------
 
         if 'date' in data:
-            raw_date = data['date']
-            clean_date = raw_date.replace('T', ' ').split('.')[0]
-            if len(clean_date) > 16: clean_date = clean_date[:16]
-            event.date = datetime.strptime(clean_date, '%Y-%m-%d %H:%M')
+            event.date = parse_event_date(data['date'])
+
+        # Index pencarian dibaca dari tabel events -> flush perubahan dulu
+        if any(field in data for field in ('title', 'description', 'location')):
+            request.dbsession.flush()
+            index_events(request, [event.id])
+        invalidate_event_cache(request)
 
         return {
             'message': 'Event updated successfully',
-            'image_url': get_image_url(request, event.image_filename)
+            'image_url': get_image_url(request, event.image_filename, 'full')
         }
 
+    except UploadError as e:
+        request.response.status = e.status
+        return {'message': str(e)}
     except Exception as e:
         request.response.status = 500
         return {'error': str(e)}
@@ -173,8 +353,42 @@ def delete_event(request):
         # ------------------------
 
         request.dbsession.delete(event)
+        unindex_events(request, [event.id])
+        invalidate_event_cache(request)
         return {'message': 'Event and image deleted successfully'}
         
     except Exception as e:
         request.response.status = 500
-        return {'error': str(e)}
\ No newline at end of file
+        return {'error': str(e)}
+
+# --- FLASH SALE: PECAH STOK KE BEBERAPA SHARD ---
+# Body JSON: {"shards": 8} untuk mengaktifkan, {"shards": 0} untuk menggabungkan kembali
+@view_config(route_name='event_inventory', renderer='json', request_method='POST')
+def update_event_inventory(request):
+    try:
+        user_data, error = get_user_from_request(request)
+        if error: return {'message': error}
+        if user_data['role'] not in ['admin', 'superadmin']: return {'message': 'Forbidden'}
+
+        event_id = request.matchdict['id']
+        event = request.dbsession.query(Event).get(event_id)
+        if not event:
+            request.response.status = 404
+            return {'message': 'Event not found'}
+
+        shard_count = int(request.json_body.get('shards', 0))
+        if shard_count < 0 or shard_count > 64:
+            request.response.status = 400
+            return {'message': 'shards must be between 0 and 64'}
+
+        shard_inventory(request.dbsession, event, shard_count)
+        invalidate_event_cache(request, event.id)
+
+        return {
+            'message': 'Inventory updated',
+            'inventory_shards': event.inventory_shards,
+            'capacity': remaining_capacity(request.dbsession, event)
+        }
+    except Exception as e:
+        request.response.status = 500
+        return {'error': str(e)}
@@ -1,7 +1,7 @@
 from pyramid.view import view_config
 from app.models import User
 from app.views.auth import get_user_from_request
-from app.file_utils import save_uploaded_file, delete_image_file, get_image_url
+from app.file_utils import save_uploaded_file, delete_image_file, get_image_url, UploadError
 
 # 1. GET PROFILE (Untuk mengisi Form saat halaman dibuka)
 @view_config(route_name='profile', renderer='json', request_method='GET')
@@ -26,7 +26,7 @@ def get_profile(request):
             'bio': user.bio,
             'phone_number': user.phone_number,
             'location': user.location,
-            'profile_picture_url': get_image_url(request, user.profile_picture),
+            'profile_picture_url': get_image_url(request, user.profile_picture, 'thumb'),
             'role': user.role
         }
     except Exception as e:
@@ -72,21 +72,24 @@ def update_profile(request):
             image_input = request.POST['profile_picture']
             # Cek apakah inputnya benar-benar file
             if hasattr(image_input, 'filename'):
+                # Simpan foto baru (dulu, supaya foto lama aman jika upload ditolak)
+                new_filename = save_uploaded_file(request, image_input)
+
                 # Hapus foto lama jika ada
                 if user.profile_picture:
                     delete_image_file(request, user.profile_picture)
-                
-                # Simpan foto baru
-                new_filename = save_uploaded_file(request, image_input)
                 user.profile_picture = new_filename
 
         request.dbsession.flush()
 
         return {
             'message': 'Profile updated successfully',
-            'profile_picture_url': get_image_url(request, user.profile_picture)
+            'profile_picture_url': get_image_url(request, user.profile_picture, 'thumb')
         }
 
+    except UploadError as e:
+        request.response.status = e.status
+        return {'message': str(e)}
     except Exception as e:
         request.response.status = 500
         return {'error': str(e)}
\ No newline at end of file
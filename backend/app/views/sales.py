@@ -0,0 +1,130 @@
+from pyramid.view import view_config
+from datetime import datetime
+from sqlalchemy import select
+from app.models import Event, EventSales, EventSalesHourly
+from app.views.auth import get_user_from_request
+from app.pagination import parse_limit, apply_keyset, encode_cursor
+from app.sales import COUNTERS, event_sales_columns, hourly_sales
+from app.reservations import remaining_capacity_column
+
+# --- DASHBOARD PENJUALAN ORGANIZER (dibaca dari rollup app/sales.py, bukan dari bookings) ---
+# GET /api/admin/sales       -> penjualan per event + total, dipaginasi cursor (date, id)
+# GET /api/admin/sales/{id}  -> total satu event + per jam
+# Admin hanya melihat event miliknya; superadmin semua event (atau ?organizer_id=).
+
+def _counters(row):
+    # SUM bigint di Postgres -> Decimal, event tanpa booking -> None
+    return {name: int(getattr(row, name) or 0) for name in COUNTERS}
+
+def _event_sales(row):
+    sales = _counters(row)
+    remaining = int(row.remaining)
+    capacity_total = remaining + sales['tickets_pending'] + sales['tickets_sold']
+    return {
+        'event_id': row.id,
+        'title': row.title,
+        'date': row.date.isoformat(),
+        'ticket_price': row.ticket_price,
+        'capacity_total': capacity_total,
+        'capacity_remaining': remaining,
+        **sales,
+        'sell_through': round(sales['tickets_sold'] / capacity_total, 4) if capacity_total else 0.0
+    }
+
+# Sisa stok: event yang di-shard dijumlah dari shard-nya (events.capacity hanya disinkron berkala)
+REMAINING = remaining_capacity_column().label('remaining')
+
+# Kolom event yang ditampilkan (ikut GROUP BY karena counter dijumlahkan per slot)
+EVENT_COLUMNS = (Event.id, Event.title, Event.date, Event.ticket_price, Event.capacity, Event.inventory_shards)
+
+def _organizer_filter(request, user_data):
+    if user_data['role'] == 'superadmin':
+        return request.params.get('organizer_id')
+    return user_data['sub']
+
+@view_config(route_name='sales_dashboard', renderer='json', request_method='GET')
+def get_sales_dashboard(request):
+    try:
+        user_data, error = get_user_from_request(request)
+        if error: return {'message': error}
+        if user_data['role'] not in ['admin', 'superadmin']: return {'message': 'Forbidden'}
+
+        statement = select(*EVENT_COLUMNS, REMAINING, *event_sales_columns())\
+            .outerjoin(EventSales, EventSales.event_id == Event.id)\
+            .group_by(*EVENT_COLUMNS)
+        totals = select(*event_sales_columns())\
+            .select_from(Event).join(EventSales, EventSales.event_id == Event.id)
+
+        organizer_id = _organizer_filter(request, user_data)
+        if organizer_id:
+            statement = statement.where(Event.organizer_id == organizer_id)
+            totals = totals.where(Event.organizer_id == organizer_id)
+        if request.params.get('upcoming') in ('1', 'true', 'yes'):
+            statement = statement.where(Event.date >= datetime.utcnow())
+            totals = totals.where(Event.date >= datetime.utcnow())
+
+        try:
+            limit = parse_limit(request.params.get('limit'))
+            statement = apply_keyset(statement, Event.date, Event.id, request.params.get('cursor'))
+        except ValueError as e:
+            request.response.status = 400
+            return {'message': f'Invalid query parameter: {e}'}
+
+        rows = request.dbsession.execute(
+            statement.order_by(Event.date.asc(), Event.id.asc()).limit(limit + 1)
+        ).all()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1].date, rows[-1].id)
+
+        return {
+            'events': [_event_sales(row) for row in rows],
+            'totals': _counters(request.dbsession.execute(totals).one()),
+            'next_cursor': next_cursor
+        }
+    except Exception as e:
+        request.response.status = 500
+        return {'error': str(e)}
+
+@view_config(route_name='event_sales', renderer='json', request_method='GET')
+def get_event_sales(request):
+    try:
+        user_data, error = get_user_from_request(request)
+        if error: return {'message': error}
+        if user_data['role'] not in ['admin', 'superadmin']: return {'message': 'Forbidden'}
+
+        event_id = request.matchdict['id']
+        row = request.dbsession.execute(
+            select(*EVENT_COLUMNS, REMAINING, Event.organizer_id, *event_sales_columns())
+            .outerjoin(EventSales, EventSales.event_id == Event.id)
+            .where(Event.id == event_id)
+            .group_by(*EVENT_COLUMNS, Event.organizer_id)
+        ).first()
+        if not row:
+            request.response.status = 404
+            return {'message': 'Event not found'}
+        if user_data['role'] != 'superadmin' and row.organizer_id != user_data['sub']:
+            request.response.status = 403
+            return {'message': 'Forbidden'}
+
+        # ?date_from= / ?date_to= membatasi bucket per jam (YYYY-MM-DD atau ISO)
+        statement = hourly_sales(event_id)
+        bucket = EventSalesHourly.bucket_start
+        try:
+            if request.params.get('date_from'):
+                statement = statement.where(bucket >= datetime.fromisoformat(request.params['date_from']))
+            if request.params.get('date_to'):
+                statement = statement.where(bucket <= datetime.fromisoformat(request.params['date_to']))
+        except ValueError as e:
+            request.response.status = 400
+            return {'message': f'Invalid query parameter: {e}'}
+
+        hourly = [
+            {'hour': bucket_row.bucket_start.isoformat(), **_counters(bucket_row)}
+            for bucket_row in request.dbsession.execute(statement)
+        ]
+        return {**_event_sales(row), 'hourly': hourly}
+    except Exception as e:
+        request.response.status = 500
+        return {'error': str(e)}
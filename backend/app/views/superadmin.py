@@ -1,7 +1,8 @@
 from pyramid.view import view_config
 from app.models import User
-from app.views.auth import get_user_from_request
-from app.security import hash_password
+from app.views.auth import get_user_from_request, USER_LIST
+from app.hashing import HashingBusy
+from app.file_utils import delete_image_file
 
 # Helper untuk validasi Superadmin
 def check_superadmin(request):
@@ -20,15 +21,9 @@ def get_all_users(request):
             request.response.status = 403
             return {'message': error}
 
-        users = request.dbsession.query(User).order_by(User.role.asc(), User.name.asc()).all()
-        
-        return [{
-            'id': u.id,
-            'name': u.name,
-            'email': u.email,
-            'role': u.role, # Penting untuk tahu siapa Admin siapa User
-            'created_at': u.created_at.isoformat() if u.created_at else None
-        } for u in users]
+        # role penting untuk tahu siapa Admin siapa User
+        users = USER_LIST.query(request.dbsession).order_by(User.role.asc(), User.name.asc()).all()
+        return USER_LIST.response(users)
 
     except Exception as e:
         request.response.status = 500
@@ -58,7 +53,7 @@ def create_user_by_superadmin(request):
         new_user = User(
             name=data['name'],
             email=data['email'],
-            password=hash_password(data['password']),
+            password=request.registry.password_hasher.hash(data['password']),
             role=target_role
         )
         
@@ -67,6 +62,10 @@ def create_user_by_superadmin(request):
         
         return {'message': f'New {target_role} created successfully', 'id': new_user.id}
 
+    except HashingBusy:
+        request.response.status = 503
+        request.response.headers['Retry-After'] = '2'
+        return {'message': 'Server is busy, please try again in a moment'}
     except Exception as e:
         request.response.status = 500
         return {'error': str(e)}
@@ -128,6 +127,8 @@ def delete_user(request):
         # Hapus User (Booking & Event terkait akan error jika tidak ada cascade delete,
         # tapi asumsi kita SQLAlchemy relation sudah oke atau kita hapus manual jika perlu.
         # Untuk sekarang kita delete user-nya saja)
+        # Lepas referensi foto profil (StoredFile) supaya file-nya ikut dibersihkan
+        delete_image_file(request, user.profile_picture)
         request.dbsession.delete(user)
         
         return {'message': 'User deleted successfully'}
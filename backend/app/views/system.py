@@ -0,0 +1,108 @@
+import hmac
+from pyramid.view import view_config
+from pyramid.response import Response
+from app.views.auth import get_user_from_request
+from app.db_pool import check_database
+from app.db_routing import check_replica
+from app.metrics import render_request_metrics, render_pool_metrics, render_cache_metrics
+
+# --- ENDPOINT MONITORING (ADMIN) ---
+
+@view_config(route_name='cache_stats', renderer='json', request_method='GET')
+def get_cache_stats(request):
+    try:
+        user_data, error = get_user_from_request(request)
+        if error:
+            request.response.status = 401
+            return {'message': error}
+        if user_data['role'] not in ['admin', 'superadmin']:
+            request.response.status = 403
+            return {'message': 'Forbidden'}
+
+        return {
+            'event_cache': request.registry.event_cache.stats(),
+            'token_cache': request.registry.token_cache.stats()
+        }
+    except Exception as e:
+        request.response.status = 500
+        return {'error': str(e)}
+
+# --- READINESS PROBE (tanpa auth, untuk load balancer / orchestrator) ---
+# 503 jika DB tidak bisa dihubungi atau semua koneksi pool (size + overflow) sedang dipakai.
+
+@view_config(route_name='health_ready', renderer='json', request_method='GET')
+def health_ready(request):
+    registry = request.registry
+    engine = registry.db_engine
+    pool = registry.pool_metrics.snapshot(engine.pool)
+    max_saturation = float(registry.settings.get('health.max_pool_saturation', 1.0))
+
+    request.response.cache_control = 'no-store'
+    result = {'status': 'ready', 'pool': pool, 'db_latency_ms': None}
+    if pool.get('saturation', 0.0) >= max_saturation:
+        # Jangan ikut antre koneksi: langsung laporkan pool penuh
+        result['status'] = 'saturated'
+        request.response.status = 503
+        return result
+    try:
+        result['db_latency_ms'] = round(check_database(engine) * 1000, 3)
+    except Exception as e:
+        result['status'] = 'unavailable'
+        result['error'] = str(e)
+        request.response.status = 503
+        return result
+
+    # Replica hanya dilaporkan: jika mati, GET otomatis kembali ke primary
+    router = registry.db_router
+    if router.replica_read_maker is not None:
+        replica = {'available': router.replica_available, 'pool': registry.replica_pool_metrics.snapshot(router.replica_read_maker.kw['bind'].pool)}
+        try:
+            replica['db_latency_ms'] = round(check_replica(router) * 1000, 3)
+        except Exception as e:
+            replica['available'] = False
+            replica['error'] = str(e)
+        result['replica'] = replica
+    return result
+
+# --- METRIK PROMETHEUS ---
+# Akses: token scraper (setting metrics.token, dikirim sebagai "Authorization: Bearer <token>")
+# atau JWT admin / superadmin.
+
+def _metrics_authorized(request):
+    scrape_token = request.registry.settings.get('metrics.token')
+    header = request.headers.get('Authorization', '')
+    if scrape_token and header.startswith('Bearer '):
+        if hmac.compare_digest(header[len('Bearer '):].encode(), scrape_token.encode()):
+            return True, None
+    user_data, error = get_user_from_request(request)
+    if error:
+        return False, error
+    if user_data['role'] not in ['admin', 'superadmin']:
+        return False, 'Forbidden'
+    return True, None
+
+@view_config(route_name='metrics', request_method='GET')
+def get_metrics(request):
+    allowed, error = _metrics_authorized(request)
+    if not allowed:
+        response = Response(json_body={'message': error})
+        response.status = 403 if error == 'Forbidden' else 401
+        return response
+
+    registry = request.registry
+    lines = render_request_metrics(registry.request_metrics)
+    pools = {'primary': registry.pool_metrics.snapshot(registry.db_engine.pool)}
+    if registry.replica_pool_metrics is not None:
+        pools['replica'] = registry.replica_pool_metrics.snapshot(registry.db_router.replica_read_maker.kw['bind'].pool)
+    lines += render_pool_metrics(pools)
+    lines += render_cache_metrics({
+        'event_cache': registry.event_cache.stats(),
+        'token_cache': registry.token_cache.stats()
+    })
+    response = Response(
+        body=('\n'.join(lines) + '\n').encode('utf8'),
+        content_type='text/plain',
+        charset='utf-8'
+    )
+    response.cache_control = 'no-store'
+    return response
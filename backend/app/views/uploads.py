@@ -0,0 +1,77 @@
+import mimetypes
+import os
+import re
+import stat
+from pyramid.view import view_config
+from pyramid.httpexceptions import HTTPNotFound
+from pyramid.response import Response
+from webob.static import FileIter, BLOCK_SIZE
+
+# --- SERVE FILE UPLOAD (/static/uploads/...) ---
+# Menggantikan add_static_view untuk folder uploads:
+# - nama file hash isi (app/storage.py) tidak pernah berubah isinya -> cache 1 tahun + immutable,
+#   jadi browser tidak perlu revalidasi gambar di setiap page view
+# - ETag, If-None-Match / If-Modified-Since (304) dan Range (206) ditangani WebOb
+#   lewat conditional_response=True
+# - body dikirim lewat wsgi.file_wrapper (waitress: sendfile / tanpa copy ke Python)
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+# <sha256>.ext atau <sha256>_<varian>.ext
+_HASHED_NAME = re.compile(r'^(?P<digest>[0-9a-f]{64}(?:_[a-z]+)?)\.[a-z0-9]+$')
+
+def _resolve_upload_path(upload_dir, subpath):
+    # Tolak '..', file tersembunyi (.tmp) dan segmen aneh
+    if not subpath or any(not part or part.startswith('.') or '/' in part or '\\' in part for part in subpath):
+        return None
+    return os.path.join(upload_dir, *subpath)
+
+@view_config(route_name='uploads', request_method=('GET', 'HEAD'))
+def serve_upload(request):
+    upload_dir = request.registry.settings['upload_dir']
+    path = _resolve_upload_path(upload_dir, request.matchdict['subpath'])
+    if path is None:
+        raise HTTPNotFound()
+
+    filename = os.path.basename(path)
+    content_type, file_encoding = mimetypes.guess_type(filename)
+    if content_type is None or file_encoding:
+        # Mis. "x.svg.gz" -> kirim apa adanya sebagai file biner
+        content_type = 'application/octet-stream'
+
+    try:
+        st = os.stat(path)
+    except (OSError, ValueError):
+        raise HTTPNotFound()
+    if not stat.S_ISREG(st.st_mode):
+        raise HTTPNotFound()
+
+    f = open(path, 'rb')
+    try:
+        file_wrapper = request.environ.get('wsgi.file_wrapper')
+        if request.range is not None or file_wrapper is None:
+            # Range butuh seek -> FileIter (app_iter_range); selain itu pakai file_wrapper
+            app_iter = FileIter(f)
+        else:
+            app_iter = file_wrapper(f, BLOCK_SIZE)
+
+        # app_iter dipasang lewat constructor: set app_iter belakangan akan mereset Content-Length
+        response = Response(content_type=content_type, app_iter=app_iter, conditional_response=True)
+        response.content_length = st.st_size
+        response.last_modified = st.st_mtime
+        response.accept_ranges = 'bytes'
+
+        hashed = _HASHED_NAME.match(filename)
+        if hashed:
+            # Isi file = hash-nya, jadi ETag kuat cukup dari nama file
+            response.etag = hashed.group('digest')
+            response.cache_control = f'public, max-age={IMMUTABLE_MAX_AGE}, immutable'
+        else:
+            # File lama (nama uuid) -> ETag dari mtime + ukuran, tetap boleh di-cache sebentar
+            response.etag = f'{st.st_mtime_ns:x}-{st.st_size:x}'
+            response.cache_control = f"public, max-age={int(request.registry.settings.get('uploads.http.max_age', 3600))}"
+        return response
+    except Exception:
+        # Response tidak jadi dikirim -> tidak ada yang memanggil app_iter.close()
+        f.close()
+        raise
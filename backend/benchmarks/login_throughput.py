@@ -0,0 +1,115 @@
+"""
+Benchmark throughput login saat banyak user login bersamaan, sekaligus
+mengukur latency /api/events yang dipanggil di tengah lonjakan login.
+Membandingkan bcrypt langsung di thread request (auth.hash_workers = 0)
+dengan process pool (app/hashing.py).
+
+Contoh:
+    python benchmarks/login_throughput.py --threads 16 --duration 10
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine
+from webob import Request
+from app import main as make_app
+from app.models import Base, User
+from app.security import hash_password
+
+def build_app(db_url, hash_workers, rounds, threads):
+    settings = {
+        'sqlalchemy.url': db_url,
+        'auth.bcrypt_rounds': str(rounds),
+        'auth.hash_workers': str(hash_workers) if hash_workers is not None else '',
+        # Thread login di benchmark = thread waitress; antrean hashing maksimal threads - 1
+        'server.threads': str(threads),
+        'auth.hash_max_pending': str(max(threads - 1, 1)),
+        'bookings.sweeper.enabled': 'false',
+    }
+    return make_app({}, **settings)
+
+def call(app, method, path, body=None):
+    req = Request.blank(path, method=method)
+    if body is not None:
+        req.body = json.dumps(body).encode('utf8')
+        req.content_type = 'application/json'
+    started = time.perf_counter()
+    resp = req.get_response(app)
+    return resp.status_int, (time.perf_counter() - started) * 1000
+
+def run_mode(label, app, users, threads, duration):
+    stop = threading.Event()
+    login_latencies, catalog_latencies, statuses = [], [], {}
+    lock = threading.Lock()
+
+    def login_worker(i):
+        n = 0
+        while not stop.is_set():
+            email, password = users[(i + n) % len(users)]
+            status, ms = call(app, 'POST', '/api/login', {'email': email, 'password': password})
+            with lock:
+                login_latencies.append(ms)
+                statuses[status] = statuses.get(status, 0) + 1
+            n += 1
+
+    def catalog_worker():
+        while not stop.is_set():
+            _, ms = call(app, 'GET', '/api/events?limit=5')
+            with lock:
+                catalog_latencies.append(ms)
+            time.sleep(0.01)
+
+    workers = [threading.Thread(target=login_worker, args=(i,)) for i in range(threads)]
+    workers.append(threading.Thread(target=catalog_worker))
+    for w in workers:
+        w.start()
+    time.sleep(duration)
+    stop.set()
+    for w in workers:
+        w.join()
+
+    def pct(values, q):
+        return statistics.quantiles(values, n=100)[q - 1] if len(values) > 1 else float('nan')
+
+    ok = statuses.get(200, 0)
+    print(f"\n=== {label} ===")
+    print(f"logins/s        : {ok / duration:.1f}  (status {statuses})")
+    print(f"login p50/p95   : {pct(login_latencies, 50):.0f} / {pct(login_latencies, 95):.0f} ms")
+    print(f"/api/events p50/p95/p99 : {pct(catalog_latencies, 50):.1f} / {pct(catalog_latencies, 95):.1f} / {pct(catalog_latencies, 99):.1f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=16, help='Thread login bersamaan (mirip thread waitress)')
+    parser.add_argument('--duration', type=float, default=10)
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--rounds', type=int, default=12)
+    parser.add_argument('--workers', type=int, default=None, help='Ukuran process pool (default jumlah CPU)')
+    args = parser.parse_args()
+
+    db_url = f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'login.sqlite')}"
+    engine = create_engine(db_url)
+    Base.metadata.create_all(engine)
+    users = [(f'bench{i}@gmail.com', f'password{i}') for i in range(args.users)]
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), [
+            {'id': f'BENCH{i:04d}', 'name': f'bench{i}', 'email': email,
+             'password': hash_password(password, args.rounds), 'role': 'user'}
+            for i, (email, password) in enumerate(users)
+        ])
+
+    run_mode('bcrypt di thread request (hash_workers = 0)',
+             build_app(db_url, 0, args.rounds, args.threads), users, args.threads, args.duration)
+    pooled = build_app(db_url, args.workers, args.rounds, args.threads)
+    call(pooled, 'POST', '/api/login', {'email': users[0][0], 'password': users[0][1]})  # warm-up pool
+    run_mode('bcrypt di process pool', pooled, users, args.threads, args.duration)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Overhead pencatatan metrik per request (RequestMetrics.observe di app/metrics.py),
+dari 1 thread dan dari beberapa thread sekaligus seperti thread waitress,
+dibandingkan dengan versi yang memakai satu lock global.
+
+Contoh:
+    python benchmarks/metrics_overhead.py --iterations 500000 --threads 8
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..')))
+
+from app.metrics import RequestMetrics, render_request_metrics
+
+ROUTES = ['events', 'event_detail', 'bookings', 'pay_booking', 'my_bookings', 'login']
+
+class LockedMetrics(RequestMetrics):
+    """Pembanding: semua thread menulis ke dict yang sama di bawah satu lock"""
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+        self._shared = {}
+        self._thread_stats.append(self._shared)
+
+    def _stats_for_thread(self):
+        return self._shared
+
+    def observe(self, route, method, status, seconds):
+        with self._lock:
+            super().observe(route, method, status, seconds)
+
+def hammer(metrics, iterations, threads):
+    per_thread = iterations // threads
+
+    def worker(offset):
+        for i in range(per_thread):
+            metrics.observe(ROUTES[(i + offset) % len(ROUTES)], 'GET', 200, 0.003)
+
+    workers = [threading.Thread(target=worker, args=(n,)) for n in range(threads)]
+    started = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - started
+    return elapsed / (per_thread * threads) * 1e9
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=300000)
+    parser.add_argument('--threads', type=int, default=8)
+    args = parser.parse_args()
+
+    for threads in (1, args.threads):
+        per_thread = hammer(RequestMetrics(), args.iterations, threads)
+        locked = hammer(LockedMetrics(), args.iterations, threads)
+        print(f"{threads:>2} thread(s): per-thread buckets {per_thread:7.0f} ns/request | global lock {locked:7.0f} ns/request")
+
+    metrics = RequestMetrics()
+    hammer(metrics, args.iterations, args.threads)
+    started = time.perf_counter()
+    lines = render_request_metrics(metrics)
+    print(f"scrape (/api/metrics render): {(time.perf_counter() - started) * 1000:.2f} ms, {len(lines)} lines")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,154 @@
+"""
+Endpoint list JSON: cara lama (load entity ORM lengkap -> dict -> json.dumps)
+vs proyeksi kolom + encoder per tipe kolom (app/serializers.py).
+Mengukur baris/detik dan puncak memori (tracemalloc) untuk:
+
+  users     - /api/users & /api/superadmin/users (entity User termasuk hash password)
+  events    - /api/events (entity Event termasuk description panjang)
+  bookings  - /api/admin/bookings (JOIN Event + User; sebelumnya sudah query kolom -> selisih encoder saja)
+
+Contoh:
+    python benchmarks/serialization.py --rows 20000 --repeat 5
+"""
+import argparse
+import gc
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.models import Base, User, Event, Booking
+from app.views.auth import USER_LIST
+from app.views.bookings import ADMIN_BOOKING_LIST
+from app.views.events import EVENT_LIST
+
+def seed(engine, rows):
+    Base.metadata.create_all(engine)
+    rng = random.Random(7)
+    now = datetime.utcnow()
+    # Hash bcrypt asli panjangnya 60 karakter
+    password = '$2b$12$' + 'x' * 53
+    description = 'Deskripsi event yang cukup panjang. ' * 60
+    users = [{'id': f'U{i:015d}', 'name': f'User {i}', 'email': f'user{i}@example.com', 'password': password,
+              'role': 'admin' if i % 50 == 0 else 'user', 'created_at': now, 'bio': 'Bio singkat ' * 10}
+             for i in range(rows)]
+    events = [{'id': f'E{i:015d}', 'organizer_id': users[0]['id'], 'title': f'Event {i}', 'description': description,
+               'date': now + timedelta(hours=i), 'location': 'Jakarta', 'capacity': 500, 'ticket_price': 50000,
+               'image_filename': None, 'inventory_shards': 0, 'created_at': now}
+              for i in range(rows)]
+    bookings = [{'id': f'B{i:015d}', 'booking_code': f'BK{i:010d}', 'event_id': events[rng.randrange(rows)]['id'],
+                 'attendee_id': users[rng.randrange(rows)]['id'], 'quantity': 1, 'total_price': 50000,
+                 'status': 'confirmed', 'payment_method': 'qris', 'payment_details': 'https://example.com/qr.svg',
+                 'whatsapp': '081234567890', 'booking_date': now - timedelta(minutes=i)}
+                for i in range(rows)]
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), users)
+        conn.execute(Event.__table__.insert(), events)
+        conn.execute(Booking.__table__.insert(), bookings)
+
+# --- CARA LAMA (sama seperti view sebelum app/serializers.py) ---
+
+def users_entities(session):
+    users = session.query(User).all()
+    return json.dumps([{
+        'id': u.id, 'name': u.name, 'email': u.email, 'role': u.role,
+        'created_at': u.created_at.isoformat() if u.created_at else None
+    } for u in users])
+
+def events_entities(session):
+    events = session.query(Event).order_by(Event.date.asc(), Event.id.asc()).all()
+    return json.dumps({'events': [{
+        'id': e.id, 'title': e.title, 'image_url': None, 'description': e.description,
+        'date': e.date.isoformat(), 'location': e.location, 'capacity': e.capacity,
+        'ticket_price': e.ticket_price, 'organizer_id': e.organizer_id
+    } for e in events], 'next_cursor': None})
+
+def bookings_entities(session):
+    # View ini sebelumnya sudah memakai JOIN kolom; yang diukur hanya dict + json.dumps
+    bookings = session.query(
+            Booking.id, Booking.booking_code, Booking.status,
+            Booking.total_price, Booking.payment_method,
+            Event.title.label('event_title'), User.name.label('attendee_name')
+        )\
+        .outerjoin(Event, Booking.event_id == Event.id)\
+        .outerjoin(User, Booking.attendee_id == User.id)\
+        .order_by(Booking.booking_date.desc()).all()
+    return json.dumps([{
+        'booking_id': b.id, 'booking_code': b.booking_code,
+        'event_title': b.event_title if b.event_title is not None else 'Unknown',
+        'attendee_name': b.attendee_name if b.attendee_name is not None else 'Unknown',
+        'status': b.status, 'total_price': b.total_price, 'payment_method': b.payment_method
+    } for b in bookings])
+
+# --- PROYEKSI ---
+
+def users_projection(session):
+    return USER_LIST.encode(USER_LIST.query(session).all())
+
+def events_projection(session):
+    rows = EVENT_LIST.query(session).order_by(Event.date.asc(), Event.id.asc()).all()
+    return '{"events":' + EVENT_LIST.encode(rows, image_url=lambda filename: None) + ',"next_cursor":null}'
+
+def bookings_projection(session):
+    rows = ADMIN_BOOKING_LIST.query(session)\
+        .outerjoin(Event, Booking.event_id == Event.id)\
+        .outerjoin(User, Booking.attendee_id == User.id)\
+        .order_by(Booking.booking_date.desc()).all()
+    return ADMIN_BOOKING_LIST.encode(rows)
+
+CASES = {
+    'users': (users_entities, users_projection),
+    'events': (events_entities, events_projection),
+    'bookings': (bookings_entities, bookings_projection),
+}
+
+def measure(Session, func, rows, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        session = Session()
+        gc.collect()
+        started = time.perf_counter()
+        body = func(session)
+        best = min(best, time.perf_counter() - started)
+        session.close()
+
+    session = Session()
+    gc.collect()
+    tracemalloc.start()
+    func(session)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    session.close()
+    return rows / best, peak / (1024 * 1024), len(body)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--cases', default=','.join(CASES))
+    args = parser.parse_args()
+
+    engine = create_engine(f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'serialization.sqlite')}")
+    seed(engine, args.rows)
+    Session = sessionmaker(bind=engine)
+
+    print(f"{args.rows} rows per endpoint, best of {args.repeat}")
+    print(f"{'endpoint':<10} {'mode':<12} {'rows/s':>10} {'peak MB':>9} {'body KB':>9}")
+    for name in args.cases.split(','):
+        old, new = CASES[name]
+        old_rps, old_peak, old_size = measure(Session, old, args.rows, args.repeat)
+        new_rps, new_peak, new_size = measure(Session, new, args.rows, args.repeat)
+        print(f"{name:<10} {'before':<12} {old_rps:10.0f} {old_peak:9.1f} {old_size / 1024:9.0f}")
+        print(f"{name:<10} {'projection':<12} {new_rps:10.0f} {new_peak:9.1f} {new_size / 1024:9.0f}"
+              f"   ({new_rps / old_rps:.1f}x rows/s, {new_peak / old_peak:.0%} memory)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""
+Benchmark serve file upload: static view bawaan Pyramid (cara lama) vs
+app/views/uploads.py (file_wrapper, ETag, cache immutable).
+
+Kedua app dijalankan di waitress sungguhan (port acak di localhost) dan
+di-request oleh beberapa thread client dengan koneksi keep-alive.
+Skenario:
+  full     - GET biasa (cache browser kosong)
+  revisit  - page view berikutnya: cara lama harus revalidasi (304) setiap gambar,
+             cara baru tidak mengirim request sama sekali selama max-age (immutable)
+  range    - GET dengan header Range (hanya cara baru)
+
+Contoh:
+    python benchmarks/static_serving.py --size-kb 512 --requests 2000 --clients 4
+"""
+import argparse
+import hashlib
+import http.client
+import logging
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pyramid.config import Configurator
+from waitress import create_server
+
+def build_old_app(static_dir):
+    with Configurator() as config:
+        config.add_static_view(name='static', path=static_dir)
+        return config.make_wsgi_app()
+
+def build_new_app(upload_dir):
+    with Configurator(settings={'upload_dir': upload_dir}) as config:
+        config.add_route('uploads', '/static/uploads/*subpath')
+        config.scan('app.views.uploads')
+        return config.make_wsgi_app()
+
+def start_server(app, threads):
+    server = create_server(app, host='127.0.0.1', port=0, threads=threads)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    return server, server.effective_port
+
+def run_clients(port, path, total, clients, headers=None):
+    per_client = total // clients
+    statuses = {}
+    received = [0]
+    lock = threading.Lock()
+
+    def client():
+        conn = http.client.HTTPConnection('127.0.0.1', port)
+        local_bytes = 0
+        local_status = {}
+        for _ in range(per_client):
+            conn.request('GET', path, headers=headers or {})
+            response = conn.getresponse()
+            local_bytes += len(response.read())
+            local_status[response.status] = local_status.get(response.status, 0) + 1
+        conn.close()
+        with lock:
+            received[0] += local_bytes
+            for status, count in local_status.items():
+                statuses[status] = statuses.get(status, 0) + count
+
+    workers = [threading.Thread(target=client) for _ in range(clients)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    elapsed = time.perf_counter() - started
+    return per_client * clients / elapsed, received[0] / elapsed / (1024 * 1024), statuses
+
+def first_response_headers(port, path):
+    conn = http.client.HTTPConnection('127.0.0.1', port)
+    conn.request('GET', path)
+    response = conn.getresponse()
+    response.read()
+    conn.close()
+    return response.headers  # HTTPMessage: nama header case-insensitive
+
+def report(label, result):
+    rps, mbps, statuses = result
+    print(f"{label:<22} {rps:9.0f} req/s  {mbps:8.1f} MB/s  status {statuses}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size-kb', type=int, default=256, help='Ukuran file gambar uji')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--clients', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=4, help='Thread waitress')
+    args = parser.parse_args()
+    # Sembunyikan log "Task queue depth" dari waitress
+    logging.getLogger('waitress.queue').setLevel(logging.ERROR)
+
+    workdir = tempfile.mkdtemp(prefix='static-bench-')
+    try:
+        # Struktur sama seperti app/static: <static>/uploads/ab/cd/<sha256>.jpg
+        data = os.urandom(args.size_kb * 1024)
+        digest = hashlib.sha256(data).hexdigest()
+        relative = f"{digest[:2]}/{digest[2:4]}/{digest}.jpg"
+        upload_dir = os.path.join(workdir, 'uploads')
+        os.makedirs(os.path.join(upload_dir, os.path.dirname(relative)))
+        with open(os.path.join(upload_dir, relative), 'wb') as f:
+            f.write(data)
+        path = f"/static/uploads/{relative}"
+
+        old_server, old_port = start_server(build_old_app(workdir), args.threads)
+        new_server, new_port = start_server(build_new_app(upload_dir), args.threads)
+
+        old_headers = first_response_headers(old_port, path)
+        new_headers = first_response_headers(new_port, path)
+        print(f"file: {args.size_kb} KB, {args.requests} requests, {args.clients} clients, {args.threads} waitress threads")
+        print(f"old headers: Cache-Control={old_headers.get('Cache-Control')!r} ETag={old_headers.get('ETag')!r}")
+        print(f"new headers: Cache-Control={new_headers.get('Cache-Control')!r} ETag={new_headers.get('ETag')!r}")
+        print()
+
+        report('old  full', run_clients(old_port, path, args.requests, args.clients))
+        report('new  full', run_clients(new_port, path, args.requests, args.clients))
+
+        revalidate = {'If-Modified-Since': old_headers['Last-Modified']}
+        report('old  revisit (304)', run_clients(old_port, path, args.requests, args.clients, revalidate))
+        print(f"{'new  revisit':<22} {'-':>9} req/s  (immutable: browser tidak mengirim request)")
+
+        report('new  range 64KB', run_clients(new_port, path, args.requests, args.clients, {'Range': 'bytes=0-65535'}))
+
+        old_server.close()
+        new_server.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
@@ -6,6 +6,7 @@ from sqlalchemy.orm import sessionmaker
 
 from app.models import User, Event
 from app.security import hash_password
+from app.ids import configure_id_allocator
 
 def _get_database_url():
     db_url = os.getenv('DATABASE_URL', '')
@@ -19,6 +20,7 @@ def seed():
         raise RuntimeError('DATABASE_URL is not set')
 
     engine = create_engine(db_url)
+    configure_id_allocator(engine)
     Session = sessionmaker(bind=engine)
     session = Session()
 
@@ -3,6 +3,7 @@ from sqlalchemy import engine_from_config
 from sqlalchemy.orm import sessionmaker
 from app.models import User
 from app.security import hash_password
+from app.ids import configure_id_allocator
 import sys
 
 def seed():
@@ -10,6 +11,7 @@ def seed():
     setup_logging(config_uri)
     settings = get_appsettings(config_uri)
     engine = engine_from_config(settings, 'sqlalchemy.')
+    configure_id_allocator(engine)
     Session = sessionmaker(bind=engine)
     session = Session()
 
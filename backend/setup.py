@@ -22,6 +22,7 @@ runtime_requires = [
     'psycopg2-binary',
     'bcrypt',
     'PyJWT',
+    'Pillow',
 ]
 
 tests_require = [
@@ -62,5 +63,10 @@ setup(
         'paste.app_factory': [
             'main = app:main',
         ],
+        'console_scripts': [
+            'expire_bookings = app.sweeper:main',
+            'rebuild_search_index = app.search:main',
+            'rebuild_sales = app.sales:main',
+        ],
     },
 )
@@ -0,0 +1,31 @@
+import pytest
+import webtest
+from sqlalchemy import create_engine
+from app import main
+from app.models import Base
+from app.security import create_token
+
+# App test memakai file SQLite sementara (tabel dibuat dengan create_all, bukan alembic)
+
+@pytest.fixture
+def db_url(tmp_path):
+    url = f"sqlite:///{tmp_path / 'test.sqlite'}"
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    engine.dispose()
+    return url
+
+@pytest.fixture
+def db_engine(db_url):
+    engine = create_engine(db_url)
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def testapp(db_url):
+    # debug.sql_stats -> header X-SQL-Count di setiap response (app/query_stats.py)
+    app = main({}, **{'sqlalchemy.url': db_url, 'debug.sql_stats': 'true'})
+    return webtest.TestApp(app)
+
+def auth_headers(user_id, role):
+    return {'Authorization': 'Bearer ' + create_token(user_id, role)}
@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta
+import pytest
+from app.models import User, Event, Booking
+from tests.conftest import auth_headers
+
+# Regression N+1: jumlah query list booking harus tetap, berapa pun jumlah booking-nya
+
+def seed_bookings(engine, count):
+    now = datetime.utcnow()
+    users = [{'id': 'ADMIN1', 'name': 'Admin', 'email': 'admin@example.com', 'password': 'x', 'role': 'admin'}]
+    users += [{'id': f'U{i:05d}', 'name': f'User {i}', 'email': f'user{i}@example.com', 'password': 'x', 'role': 'user'}
+              for i in range(count)]
+    # Setiap booking punya event & attendee sendiri -> lazy load per baris akan terlihat
+    events = [{'id': f'E{i:05d}', 'organizer_id': 'ADMIN1', 'title': f'Event {i}', 'description': '',
+               'date': now + timedelta(days=i), 'location': 'Jakarta', 'capacity': 100, 'ticket_price': 1000,
+               'inventory_shards': 0}
+              for i in range(count)]
+    bookings = [{'id': f'B{i:05d}', 'booking_code': f'BK{i:08d}', 'event_id': f'E{i:05d}',
+                 'attendee_id': 'U00000' if i % 2 == 0 else f'U{i:05d}', 'quantity': 1, 'total_price': 1000,
+                 'status': 'confirmed', 'payment_method': 'qris', 'booking_date': now - timedelta(minutes=i)}
+                for i in range(count)]
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert(), users)
+        conn.execute(Event.__table__.insert(), events)
+        conn.execute(Booking.__table__.insert(), bookings)
+
+def sql_count(response):
+    return int(response.headers['X-SQL-Count'])
+
+@pytest.mark.parametrize('url, user_id, role', [
+    ('/api/my-bookings', 'U00000', 'user'),
+    ('/api/admin/bookings', 'ADMIN1', 'admin'),
+])
+def test_booking_lists_do_not_grow_queries_with_bookings(testapp, db_engine, url, user_id, role):
+    headers = auth_headers(user_id, role)
+    seed_bookings(db_engine, 2)
+    small = testapp.get(url, headers=headers)
+
+    # Tambah booking (event & attendee baru) lalu panggil lagi
+    with db_engine.begin() as conn:
+        conn.execute(Booking.__table__.delete())
+        conn.execute(Event.__table__.delete())
+        conn.execute(User.__table__.delete())
+    seed_bookings(db_engine, 40)
+    large = testapp.get(url, headers=headers)
+
+    assert len(large.json) > len(small.json)
+    assert sql_count(large) == sql_count(small)
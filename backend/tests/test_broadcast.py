@@ -0,0 +1,121 @@
+import email
+import socketserver
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from app import email_utils
+
+# Broadcast ke attendee (app/email_utils.py) lewat server SMTP lokal
+
+class _SinkHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        server = self.server
+        with server.lock:
+            server.connections += 1
+        self.wfile.write(b'220 test ESMTP\r\n')
+        rcpt, data = None, None
+        for line in self.rfile:
+            if data is not None:
+                if line.rstrip(b'\r\n') == b'.':
+                    with server.lock:
+                        server.messages.append((rcpt, b''.join(data)))
+                    data = None
+                    self.wfile.write(b'250 OK\r\n')
+                else:
+                    data.append(line[1:] if line.startswith(b'..') else line)
+                continue
+            command = line[:4].upper()
+            if command == b'RCPT':
+                rcpt = line.split(b'<', 1)[1].split(b'>', 1)[0].decode()
+                if rcpt in server.refused:
+                    self.wfile.write(b'550 No such user\r\n')
+                    continue
+                self.wfile.write(b'250 OK\r\n')
+            elif command == b'DATA':
+                data = []
+                self.wfile.write(b'354 End data with <CR><LF>.<CR><LF>\r\n')
+            elif command == b'QUIT':
+                self.wfile.write(b'221 Bye\r\n')
+                return
+            else:
+                self.wfile.write(b'250 OK\r\n')
+
+class SMTPSink(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), _SinkHandler)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.messages = []
+        self.refused = set()
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    def bodies(self):
+        with self.lock:
+            return {
+                rcpt: email.message_from_bytes(raw).get_payload()[0].get_payload(decode=True).decode()
+                for rcpt, raw in self.messages
+            }
+
+POOL_SIZE = 2
+
+@pytest.fixture
+def smtp_sink(monkeypatch):
+    sink = SMTPSink()
+    pool = email_utils.SMTPConnectionPool(POOL_SIZE)
+    executor = ThreadPoolExecutor(max_workers=POOL_SIZE, thread_name_prefix='mail-test')
+    for name, value in {
+        'SMTP_SERVER': '127.0.0.1', 'SMTP_PORT': sink.server_address[1], 'SMTP_STARTTLS': False,
+        'SENDER_EMAIL': 'noreply@test.local', 'SENDER_PASSWORD': '',
+        'SMTP_POOL_SIZE': POOL_SIZE, 'smtp_pool': pool, 'mail_executor': executor
+    }.items():
+        monkeypatch.setattr(email_utils, name, value)
+    yield sink
+    pool.close_all()
+    executor.shutdown()
+    sink.shutdown()
+    sink.server_close()
+
+def wait_for(job, timeout=10):
+    deadline = time.monotonic() + timeout
+    while job.finished_at is None:
+        assert time.monotonic() < deadline, job.to_dict()
+        time.sleep(0.01)
+    return job.to_dict()
+
+def test_broadcast_reuses_pooled_connections_and_substitutes_name(smtp_sink):
+    recipients = [(f'user{i}@test.local', f'User {i}') for i in range(7)]
+    recipients.append(('budi@test.local', 'Budi <b>'))
+
+    job = email_utils.broadcast_to_attendees(
+        'E1', 'Konser $10', recipients, 'Info', 'Halo $name, harga naik', batch_size=2
+    )
+    result = wait_for(job)
+
+    assert result['status'] == 'completed'
+    assert (result['sent'], result['failed']) == (8, 0)
+    # 4 batch, tetapi koneksi SMTP dipakai ulang dari pool
+    assert smtp_sink.connections <= POOL_SIZE
+    bodies = smtp_sink.bodies()
+    assert sorted(bodies) == sorted(email for email, _ in recipients)
+    assert 'Halo, User 3!' in bodies['user3@test.local']
+    assert 'Halo, Budi &lt;b&gt;!' in bodies['budi@test.local']
+    # "$" dari judul / pesan organizer tidak ikut disubstitusi
+    assert 'Konser $10' in bodies['user0@test.local']
+    assert 'Halo $name, harga naik' in bodies['user0@test.local']
+
+def test_broadcast_status_reflects_failed_recipients(smtp_sink):
+    smtp_sink.refused = {'a@test.local'}
+    job = email_utils.broadcast_to_attendees('E1', 'Konser', [('a@test.local', 'A'), ('b@test.local', 'B')], 'Info', 'x')
+    result = wait_for(job)
+    assert result['status'] == 'completed_with_errors'
+    assert result['failed_recipients'] == ['a@test.local']
+
+    smtp_sink.refused = {'b@test.local'}
+    job = email_utils.broadcast_to_attendees('E1', 'Konser', [('b@test.local', 'B')], 'Info', 'x')
+    result = wait_for(job)
+    assert result['status'] == 'failed'
+    assert result['sent'] == 0
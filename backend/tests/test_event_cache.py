@@ -0,0 +1,58 @@
+from app import cache as cache_module
+from app.cache import EventCache, discard_event_entries
+
+# Cache katalog event (app/cache.py)
+
+LIST_KEY = ('list', 'http://localhost', ())
+
+def detail_key(event_id):
+    return ('detail', 'http://localhost', event_id)
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def make_cache(monkeypatch, **kwargs):
+    clock = FakeClock()
+    monkeypatch.setattr(cache_module.time, 'monotonic', clock)
+    return EventCache(max_entries=16, ttl=30, list_ttl=5, **kwargs), clock
+
+def test_booking_only_drops_detail_of_that_event(monkeypatch):
+    cache, clock = make_cache(monkeypatch)
+    cache.set(LIST_KEY, 'list')
+    cache.set(detail_key('E1'), 'e1')
+    cache.set(detail_key('E2'), 'e2')
+
+    discard_event_entries(cache, ['E1'])
+
+    assert cache.get(detail_key('E1')) is None
+    assert cache.get(detail_key('E2')) == 'e2'
+    assert cache.get(LIST_KEY) == 'list'
+    # Halaman list tetap kadaluarsa setelah list_ttl
+    clock.now += 5
+    assert cache.get(LIST_KEY) is None
+    assert cache.get(detail_key('E2')) == 'e2'
+
+def test_no_refill_from_lagging_replica_after_invalidation(monkeypatch):
+    cache, clock = make_cache(monkeypatch, fill_delay=2)
+    cache.set(detail_key('E1'), 'old')
+
+    discard_event_entries(cache, ['E1'])
+    cache.set(detail_key('E1'), 'stale from replica')
+    cache.set(detail_key('E2'), 'e2')
+
+    assert cache.get(detail_key('E1')) is None
+    assert cache.get(detail_key('E2')) == 'e2'
+    clock.now += 2
+    cache.set(detail_key('E1'), 'fresh')
+    assert cache.get(detail_key('E1')) == 'fresh'
+
+    cache.clear()
+    cache.set(LIST_KEY, 'stale from replica')
+    assert cache.get(LIST_KEY) is None
+    clock.now += 2
+    cache.set(LIST_KEY, 'fresh')
+    assert cache.get(LIST_KEY) == 'fresh'
@@ -12,6 +12,8 @@ const seedAdmins = [];
 
 // events will be fetched from API
 const dummyEvents = []; // keep variable name for backward compat
+// jumlah event per halaman (GET /api/events?limit=...)
+const EVENTS_PAGE_SIZE = 50;
 
 
 
@@ -156,13 +158,16 @@ export default function DashboardSuperAdmin({ initialTab = 'users' }) {
   const [bookings, setBookings] = useState(dummyBookings);
   const [loadingEvents, setLoadingEvents] = useState(false);
   const [eventsError, setEventsError] = useState(null);
+  // next_cursor dari API: null = semua event sudah dimuat
+  const [eventsCursor, setEventsCursor] = useState(null);
 
-  const fetchEvents = async () => {
+  // Tanpa cursor: muat ulang halaman pertama. Dengan cursor: tambahkan halaman berikutnya ("Muat lebih banyak")
+  const fetchEvents = async (cursor = null) => {
     setLoadingEvents(true); setEventsError(null);
     try {
-      const list = await eventService.getEvents();
+      const { events: list, next_cursor } = await eventService.getEvents(cursor ? { limit: EVENTS_PAGE_SIZE, cursor } : { limit: EVENTS_PAGE_SIZE });
       // map backend shape to our table shape and include formatted date/time (keep rawDate for editing)
-      setEvents(list.map(ev => ({
+      const mapped = list.map(ev => ({
         id: ev.id,
         title: ev.title,
         date: ev.date ? new Date(ev.date).toLocaleDateString('id-ID', { day: 'numeric', month: 'long', year: 'numeric' }) : ev.date,
@@ -172,7 +177,9 @@ export default function DashboardSuperAdmin({ initialTab = 'users' }) {
         price: ev.ticket_price,
         capacity: ev.capacity,
         img: ev.image_url
-      })));
+      }));
+      setEvents((prev) => (cursor ? [...prev, ...mapped] : mapped));
+      setEventsCursor(next_cursor);
     } catch (err) {
       setEventsError(err?.message || 'Gagal memuat event');
     } finally { setLoadingEvents(false); }
@@ -183,10 +190,11 @@ export default function DashboardSuperAdmin({ initialTab = 'users' }) {
   const totals = useMemo(() => ({
     users: users.length,
     admins: admins.length,
-    totalEvents: events.length,
+    // "+" = masih ada event yang belum dimuat
+    totalEvents: `${events.length}${eventsCursor ? '+' : ''}`,
     totalBookings: bookings.length,
     totalRevenue: events.reduce((s, e) => s + e.price, 0),
-  }), [users, admins, events, bookings]);
+  }), [users, admins, events, eventsCursor, bookings]);
 
   // modal & form for events
   const [isEventModalOpen, setIsEventModalOpen] = useState(false);
@@ -501,12 +509,12 @@ export default function DashboardSuperAdmin({ initialTab = 'users' }) {
             <div className="panel-controls">
               <div style={{ display: 'flex', gap: 12, alignItems: 'center' }}>
                 <input value={search} onChange={(e) => setSearch(e.target.value)} placeholder={'Cari event (judul, venue, ID)...'} className="input-search" />
-                <div className="text-sm text-count">Menampilkan {events.length} events</div>
+                <div className="text-sm text-count">Menampilkan {events.length}{eventsCursor ? '+' : ''} events</div>
                 {loadingEvents && <div className="text-sm text-blue-600">Memuat...</div>}
                 {eventsError && <div className="text-sm text-red-600">{eventsError}</div>}
               </div>
               <div style={{ display: 'flex', gap: 8, alignItems: 'center' }}>
-                <button className="btn" onClick={fetchEvents} disabled={loadingEvents}>Refresh</button>
+                <button className="btn" onClick={() => fetchEvents()} disabled={loadingEvents}>Refresh</button>
                 <button className="btn-add" onClick={openAddEventModal}><Plus size={14} /> <span style={{ fontWeight: 800 }}>Tambah Event</span></button>
               </div>
             </div>
@@ -541,6 +549,13 @@ export default function DashboardSuperAdmin({ initialTab = 'users' }) {
                 ))}
               </tbody>
             </table>
+            {eventsCursor && (
+              <div style={{ display: 'flex', justifyContent: 'center', marginTop: 16 }}>
+                <button className="btn" onClick={() => fetchEvents(eventsCursor)} disabled={loadingEvents}>
+                  {loadingEvents ? 'Memuat...' : 'Muat lebih banyak'}
+                </button>
+              </div>
+            )}
           </section>
         )}
 
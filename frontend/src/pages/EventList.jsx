@@ -3,14 +3,18 @@ import { Calendar, MapPin, Ticket, ArrowRight } from 'lucide-react';
 import { Link } from 'react-router-dom';
 import { getEvents } from '../services/eventService';
 
+// jumlah event per halaman dari API (kelipatan 3 kolom grid)
+const PAGE_SIZE = 24;
+
 const EventList = () => {
   const [events, setEvents] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
+  // next_cursor dari API: null = semua event sudah dimuat
+  const [nextCursor, setNextCursor] = useState(null);
   const [query, setQuery] = useState('');
-  const [page, setPage] = useState(1);
-  const itemsPerPage = 15;
 
-  // derived values
+  // pencarian hanya menyaring event yang sudah dimuat
   const filtered = events.filter((e) => {
     const q = (query || '').trim().toLowerCase();
     if (!q) return true;
@@ -21,17 +25,12 @@ const EventList = () => {
     );
   });
 
-  const totalPages = Math.max(1, Math.ceil(filtered.length / itemsPerPage));
-  const paged = filtered.slice((page - 1) * itemsPerPage, page * itemsPerPage);
-
-  // reset page when query changes
-  useEffect(() => setPage(1), [query]);
-
   useEffect(() => {
     const fetchEvents = async () => {
       try {
-        const data = await getEvents();
-        setEvents(data);
+        const data = await getEvents({ upcoming: 1, limit: PAGE_SIZE });
+        setEvents(data.events);
+        setNextCursor(data.next_cursor);
       } catch (err) {
         console.error("Gagal ambil event:", err);
       } finally {
@@ -42,6 +41,19 @@ const EventList = () => {
     fetchEvents();
   }, []);
 
+  const loadMore = async () => {
+    setLoadingMore(true);
+    try {
+      const data = await getEvents({ upcoming: 1, limit: PAGE_SIZE, cursor: nextCursor });
+      setEvents((prev) => [...prev, ...data.events]);
+      setNextCursor(data.next_cursor);
+    } catch (err) {
+      console.error("Gagal ambil event:", err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
 
   if (loading) {
     return (
@@ -84,7 +96,7 @@ const EventList = () => {
           <> {/* ✅ FIX: Tambahkan Fragment Pembuka Disini */}
           
             <div className="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-8">
-              {paged.map((event) => (
+              {filtered.map((event) => (
                 <Link to={`/events/${event.id}`} key={event.id} className="group bg-white rounded-3xl overflow-hidden shadow-lg hover:shadow-2xl transition-all duration-300 border border-slate-100 flex flex-col h-full transform hover:-translate-y-1" style={{ textDecoration: 'none' }}>
                   
                   {/* Gambar Thumbnail */}
@@ -135,15 +147,9 @@ const EventList = () => {
               ))}
             </div>
 
-            {totalPages > 1 && (
-              <div className="mt-8 flex items-center justify-center gap-3">
-                <button className="px-4 py-2 bg-white border rounded-lg hover:bg-slate-50 disabled:opacity-50" onClick={() => setPage((p) => Math.max(1, p - 1))} disabled={page === 1}>Prev</button>
-                <div className="text-sm text-slate-600">Halaman {page} / {totalPages}</div>
-                <button className="px-4 py-2 bg-white border rounded-lg hover:bg-slate-50 disabled:opacity-50" onClick={() => setPage((p) => Math.min(totalPages, p + 1))} disabled={page === totalPages}>Next</button>
-              </div>
-            )}
-
           </> /* ✅ FIX: Tambahkan Fragment Penutup Disini */
+        ) : nextCursor ? (
+          <div className="text-center py-20 text-slate-500">Tidak ada event yang cocok di daftar yang sudah dimuat.</div>
         ) : (
           <div className="text-center py-20 bg-white rounded-3xl border border-dashed border-slate-300">
             <Ticket size={48} className="mx-auto text-slate-300 mb-4" />
@@ -151,6 +157,14 @@ const EventList = () => {
             <p className="text-slate-500">Coba refresh halaman atau cek kembali nanti.</p>
           </div>
         )}
+
+        {nextCursor && (
+          <div className="mt-8 flex items-center justify-center">
+            <button className="px-4 py-2 bg-white border rounded-lg hover:bg-slate-50 disabled:opacity-50" onClick={loadMore} disabled={loadingMore}>
+              {loadingMore ? 'Memuat...' : 'Muat lebih banyak'}
+            </button>
+          </div>
+        )}
       </div>
     </div>
   );
@@ -9,9 +9,11 @@ function getAuthHeader() {
   return token ? { Authorization: `Bearer ${token}` } : {};
 }
 
-export async function getEvents() {
+// Response: { events: [...], next_cursor: "..." | null }
+// Kirim next_cursor sebagai params.cursor untuk ambil halaman berikutnya
+export async function getEvents(params = {}) {
   try {
-    const res = await api.get('/api/events');
+    const res = await api.get('/api/events', { params });
     return res.data;
   } catch (err) {
     throw err;